@@ -0,0 +1,22 @@
+"""
+Benchmark suite
+
+    $ python -m benchmarks                 # compare with benchmarks/baseline.json
+    $ python -m benchmarks --save          # store new baselines
+    $ python -m benchmarks -k construct    # run a subset
+
+Every benchmark is a function returning the zero-argument callable to time.
+"""
+from typing import Callable, Dict
+
+BENCHMARKS: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def bench(name: str) -> Callable:
+    def register(setup: Callable[[], Callable[[], object]]) -> Callable:
+        if name in BENCHMARKS:
+            raise ValueError(f"benchmark {name!r} is already registered")
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
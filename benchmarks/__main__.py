@@ -0,0 +1,78 @@
+import argparse
+import importlib
+import json
+import pkgutil
+import sys
+import timeit
+
+from pathlib import Path
+from typing import Callable, Dict
+
+from . import BENCHMARKS
+
+BASELINE = Path(__file__).with_name('baseline.json')
+
+
+def calibrate() -> None:
+    total = 0
+    for x in range(1000):
+        total += x * x
+
+
+def measure(func: Callable[[], object], repeat: int) -> float:
+    """
+    Best time of a single call, in seconds
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def load() -> None:
+    for module in pkgutil.iter_modules([str(Path(__file__).parent)]):
+        if module.name.startswith('bench_'):
+            importlib.import_module(f"{__package__}.{module.name}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    parser.add_argument('-k', dest='select', default='', help='run benchmarks containing this substring')
+    parser.add_argument('--save', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--baseline', type=Path, default=BASELINE)
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown, 0.25 = 25%%')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    load()
+    baseline: Dict[str, float] = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    # results are compared in units of the calibration loop to hide the machine speed
+    unit = measure(calibrate, args.repeat)
+    scale = unit / baseline['_calibrate'] if '_calibrate' in baseline else 1.0
+
+    # new results are stored in the scale of the existing baseline
+    results, regressions = {'_calibrate': baseline.get('_calibrate', unit)}, []
+    for name, setup in BENCHMARKS.items():
+        if args.select not in name:
+            continue
+        elapsed = measure(setup(), args.repeat)
+        results[name] = elapsed / scale
+        line = f"{name:<40} {elapsed * 1e6:>12.3f}us"
+        if name in baseline:
+            change = elapsed / (baseline[name] * scale) - 1
+            line += f"  {change:+7.1%}"
+            if change > args.threshold:
+                regressions.append(name)
+                line += '  REGRESSION'
+        print(line)
+
+    if args.save:
+        baseline.update(results)
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + '\n')
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,217 @@
+"""
+Construction and call paths of the README pipelines, each call is paired with a hand-written lambda
+"""
+import re
+import statistics
+
+from array import array
+from operator import itemgetter
+
+import compose
+
+from compose import (
+    Aggregate, And, C, Compose, ComposeError, Dict, Filter, Fork, IG, Id, Int, List, Map, Opt, P, PG,
+    Record, Set, SlidingWindow, SortBy, Str, Sum, ToArray, ToBuffer, TopK, Window,
+)
+
+from . import bench
+
+DEEP = {'a': {'b': {'c': {'d': '42'}}}}
+ITEM = {'item': {'id': '75', 'v': 1, 'x': ['742', '153', '98']}}
+MILLION = [str(x % 10) for x in range(10 ** 6)]
+LINES = [f"{x % 7} user{x}@example.org {x}" for x in range(10 ** 4)]
+
+
+@bench('construct/lshift')
+def construct_lshift():
+    return lambda: Sum << Map(int) << List << Str << P(max, 721) << Int << IG('item.id')
+
+
+@bench('construct/lshift/interned')
+def construct_lshift_interned():
+    def run():
+        compose.set_interning(True)
+        try:
+            return Sum << Map(int) << List << Str << P(max, 721) << Int << IG('item.id')
+        finally:
+            compose.set_interning(False)
+
+    return run
+
+
+@bench('construct/compose')
+def construct_compose():
+    stack = (Sum, Map(int), List, Str, P(max, 721), Int, IG('id'), IG('item'))
+    return lambda: Compose(*stack)
+
+
+@bench('construct/incremental')
+def construct_incremental():
+    stages = [Map(int), Filter(bool)] * 500
+
+    def run():
+        f = Id
+        for stage in stages:
+            f = f << stage
+        return f.stack
+
+    return run
+
+
+@bench('construct/deep_getter')
+def construct_deep_getter():
+    return lambda: IG('a.b.c.d')
+
+
+def pair(name, pipeline, func, arg):
+    assert pipeline(arg) == func(arg)
+    bench(f"call/{name}")(lambda: lambda: pipeline(arg))
+    bench(f"call/{name}/lambda")(lambda: lambda: func(arg))
+
+
+pair('int_ig', Int << IG('item.id'), lambda x: int(x['item']['id']), ITEM)
+pair('list_map', List << Map(int), lambda x: list(map(int, x)), '653')
+pair('sum_map', Sum << Map(int), lambda x: sum(map(int, x)), '471')
+pair(
+    'sum_map_ig',
+    Sum << Map(int) << IG(1) << IG('item.x'),
+    lambda x: sum(map(int, x['item']['x'][1])),
+    ITEM,
+)
+pair(
+    'dict_map_ig',
+    Dict << Map(IG(0, 2)),
+    lambda x: dict(map(itemgetter(0, 2), x)),
+    [('a', 17, 71), ('b', 26, 62), ('c', 39, 93)],
+)
+pair('compose_list_map_str', Compose(List, Map(int), Str), lambda x: list(map(int, str(x))), 763)
+# half of the records miss the field
+SPARSE = [{'item': {'id': str(x)}} if x % 2 else {'item': {}} for x in range(10 ** 4)]
+INT_IG = Int << IG('item.id')
+
+
+def caught(rows):
+    result = []
+    for row in rows:
+        try:
+            result.append(INT_IG(row))
+        except ComposeError:
+            result.append(None)
+    return result
+
+
+def optional_ids(rows):
+    result = []
+    for row in rows:
+        value = row['item'].get('id')
+        result.append(None if value is None else int(value))
+    return result
+
+
+pair('optional', List << Map(Opt(INT_IG)), optional_ids, SPARSE)
+bench('call/optional/except')(lambda: lambda: caught(SPARSE))
+pair('deep_getter', IG('a.b.c.d'), lambda x: x['a']['b']['c']['d'], DEEP)
+pair('deep_getter/compiled', IG('a.b.c.d').compile(), lambda x: x['a']['b']['c']['d'], DEEP)
+pair('deep_getter/path', PG('a.b.c.d'), lambda x: x['a']['b']['c']['d'], DEEP)
+pair('path_wildcard', PG('item.x.*.0'), lambda x: [y[0] for y in x['item']['x']], ITEM)
+RECORD = {'a': {'b': {f"x{i}": str(i) for i in range(20)}}}
+FIELDS = {f"x{i}": Int << IG(f"a.b.x{i}") for i in range(20)}
+pair('record', Record(FIELDS), lambda x: {k: int(x['a']['b'][k]) for k in FIELDS}, RECORD)
+bench('call/record/separate')(lambda: lambda: {k: f(RECORD) for k, f in FIELDS.items()})
+INTS = {'a': {'b': {'c': {'d': 42}}}}
+SPECIALIZED = (Int << IG('a.b.c.d')).specialize(warmup=1)
+pair('specialized', SPECIALIZED, lambda x: int(x['a']['b']['c']['d']), INTS)
+pair('specialized/function', SPECIALIZED.compile(), lambda x: int(x['a']['b']['c']['d']), INTS)
+pair('specialized/compiled', (Int << IG('a.b.c.d')).compile(), lambda x: int(x['a']['b']['c']['d']), INTS)
+pair('map_million', Sum << Map(int), lambda x: sum(map(int, x)), MILLION)
+pair('filter_million', List << Filter(C(int)), lambda x: list(filter(int, x)), MILLION)
+pair('map_million/skip', Sum << Map(int, on_error='skip'), lambda x: sum(map(int, x)), MILLION)
+bench('call/fork')(lambda: lambda: Fork(Sum << Map(int), Set << Map(len))(iter(MILLION)))
+bench('call/fork/list')(lambda: lambda: (lambda x: (sum(map(int, x)), set(map(len, x))))(list(iter(MILLION))))
+pair('to_array', ToArray('q') << Map(int), lambda x: array('q', map(int, x)), MILLION)
+pair('to_buffer', ToBuffer('q') << Map(int), lambda x: memoryview(array('q', map(int, x))), MILLION)
+
+SCORES = [{'id': x, 'score': str(x * 7919 % 10 ** 4)} for x in range(10 ** 4)]
+pair(
+    'top_k',
+    TopK(10, key=Int << IG('score')),
+    lambda x: sorted(x, key=lambda y: int(y['score']), reverse=True)[:10],
+    SCORES,
+)
+pair('sort_by', SortBy(Int << IG('score')), lambda x: sorted(x, key=lambda y: int(y['score'])), SCORES)
+
+SERIES = [x * 7919 % 1000 for x in range(10 ** 4)]
+for size in (10, 100, 1000):
+    pair(
+        f'sliding_max/{size}',
+        List << SlidingWindow(size, 'max'),
+        lambda x, size=size: [max(x[i - size + 1:i + 1]) for i in range(size - 1, len(x))],
+        SERIES,
+    )
+    bench(f'call/sliding_max/{size}/window')(lambda size=size: lambda: list(map(max, Window(size)(SERIES))))
+
+# the expensive regex is written first, the cheap check rejects 6 of 7 lines
+EMAIL = C(re.compile(r'\w+@\w+\.(org|com)').search)
+ZERO = C(lambda x: x[0] == '0')
+pair(
+    'filter_static',
+    List << Filter(EMAIL & ZERO),
+    lambda x: [y for y in x if y[0] == '0' and EMAIL.func(y)],
+    LINES,
+)
+bench('call/filter_adaptive')(
+    lambda: lambda: list(filter(And(EMAIL, ZERO, adaptive=True, sample=100), LINES)),
+)
+
+
+ROWS = [{'g': x % 7, 'x': x % 100} for x in range(1000)]
+
+
+def stats(rows):
+    count, total, mean, m2, top = 0, 0, 0.0, 0.0, None
+    for row in rows:
+        x = row['x']
+        total += x
+        count += 1
+        d = x - mean
+        mean += d / count
+        m2 += d * (x - mean)
+        if top is None or x > top:
+            top = x
+    return {'sum': total, 'mean': mean, 'var': m2 / (count - 1), 'max': top}
+
+
+pair('aggregate', Aggregate(sum=IG('x'), mean=IG('x'), var=IG('x'), max=IG('x')), stats, ROWS)
+bench('call/aggregate/separate')(lambda: lambda: {
+    'sum': sum(x['x'] for x in ROWS),
+    'mean': statistics.mean(x['x'] for x in ROWS),
+    'var': statistics.variance(x['x'] for x in ROWS),
+    'max': max(x['x'] for x in ROWS),
+})
+
+
+@bench('call/error')
+def call_error():
+    f = Int << IG('item.id')
+
+    def run():
+        try:
+            f({'item': {}})
+        except ComposeError:
+            pass
+
+    return run
+
+
+@bench('call/error/lambda')
+def call_error_lambda():
+    def f(x):
+        return int(x['item']['id'])
+
+    def run():
+        try:
+            f({'item': {}})
+        except KeyError:
+            pass
+
+    return run
@@ -0,0 +1,105 @@
+"""
+Memory used by many equal pipelines, with and without interning,
+peak memory of streaming pipelines over growing inputs, of reading a CSV file
+of collecting numbers into lists and typed sinks and of selecting the top items
+
+    $ python -m benchmarks.memory
+"""
+import os
+import tempfile
+import tracemalloc
+
+import compose
+
+from compose import io
+
+
+def build(count: int) -> list:
+    return [compose.Sum << compose.Map(int) << compose.IG(1) << compose.IG('item.x') for _ in range(count)]
+
+
+def measure(count: int) -> int:
+    tracemalloc.start()
+    pipelines = build(count)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del pipelines
+    return size
+
+
+def stream_peak(length: int) -> int:
+    pipeline = (
+        compose.Sum <<
+        compose.Map(compose.Sum) <<
+        compose.Window(16, 8) <<
+        compose.FlatMap(iter) <<
+        compose.Chunk(64) <<
+        compose.Map(int)
+    )
+    items = (str(x) for x in range(length))
+    tracemalloc.start()
+    pipeline(items)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def csv_peak(path: str, mapped: bool) -> int:
+    if mapped:
+        field = compose.Int << io.Decode() << compose.IG(1) << io.Split()
+        pipeline = compose.Sum << compose.Map(field) << io.Lines()
+    else:
+        def pipeline(path):
+            with open(path) as f:
+                return sum(int(line.split(',')[1]) for line in f.read().splitlines())
+    tracemalloc.start()
+    pipeline(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def sink_size(sink: compose.C, length: int) -> int:
+    tracemalloc.start()
+    result = (sink << compose.Map(int))(str(x) for x in range(length))
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def top_peak(length: int, heap: bool) -> int:
+    key = compose.Int << compose.IG('score')
+    rows = ({'score': str(x * 7919 % length)} for x in range(length))
+    tracemalloc.start()
+    compose.TopK(10, key=key)(rows) if heap else sorted(rows, key=key, reverse=True)[:10]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main(count: int = 10000) -> None:
+    for interning in (False, True):
+        compose.set_interning(interning)
+        size = measure(count)
+        print(f"interning={interning!s:<5}: {size / count:8.1f} bytes per pipeline")
+    compose.set_interning(False)
+    for length in (10 ** 4, 10 ** 5, 10 ** 6):
+        print(f"stream of {length:>7} items: {stream_peak(length):8d} bytes peak")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'data.csv')
+        with open(path, 'w') as f:
+            f.writelines(f"user{x},{x % 100},{x * 7}\n" for x in range(10 ** 6))
+        for mapped in (False, True):
+            size, peak = os.path.getsize(path), csv_peak(path, mapped)
+            print(f"csv of {size} bytes, mapped={mapped!s:<5}: {peak:8d} bytes peak")
+
+    for sink in (compose.List, compose.ToArray('q'), compose.ToBuffer('q')):
+        print(f"{sink!r:<16}: {sink_size(sink, 10 ** 6) / 10 ** 6:5.1f} bytes per item")
+
+    for heap in (False, True):
+        print(f"top 10 of {10 ** 5} rows, heap={heap!s:<5}: {top_peak(10 ** 5, heap):8d} bytes peak")
+
+
+if __name__ == '__main__':
+    main()
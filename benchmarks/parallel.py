@@ -0,0 +1,42 @@
+"""
+ParallelMap scaling with the number of workers
+
+    $ python -m benchmarks.parallel
+"""
+import os
+import time
+import hashlib
+
+from compose import Sum
+from compose.parallel import ParallelMap
+
+
+def work(data: bytes) -> int:
+    for _ in range(20):
+        data = hashlib.sha256(data).digest() * 64
+    return data[0]
+
+
+def main(items: int = 2000, size: int = 1 << 14) -> None:
+    data = [os.urandom(size) for _ in range(items)]
+
+    start = time.perf_counter()
+    expected = sum(map(work, data))
+    baseline = time.perf_counter() - start
+    print(f"{'map':>12}: {baseline:.3f}s")
+
+    for workers in sorted({1, 2, 4, 8, os.cpu_count() or 1}):
+        if workers > (os.cpu_count() or 1):
+            continue
+        stage = ParallelMap(work, workers=workers, chunksize=32)
+        f = Sum << stage
+        f(data[:workers])  # start the pool
+        start = time.perf_counter()
+        assert f(data) == expected
+        elapsed = time.perf_counter() - start
+        stage.close()
+        print(f"{workers:>4} workers: {elapsed:.3f}s  x{baseline / elapsed:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Cold start of a worker loading pipelines from specs, with and without the code cache
+
+    $ python -m benchmarks.startup
+"""
+import json
+import subprocess
+import sys
+import tempfile
+
+from compose import IG, Int, List, Map, PG, Record, Str, Sum
+from compose.spec import dumps
+
+WORKER = """
+import json, sys
+from time import perf_counter
+start = perf_counter()
+from compose.spec import CodeCache, loads
+texts = json.load(open(sys.argv[1]))
+if len(sys.argv) > 2:
+    pipelines = CodeCache(sys.argv[2]).load(*texts)
+else:
+    pipelines = [loads(text) for text in texts]
+    pipelines = [x.compile() if hasattr(x, 'compile') else x for x in pipelines]
+print(perf_counter() - start)
+"""
+
+
+def specs(count: int) -> list:
+    result = []
+    for i in range(count):
+        fields = {f"f{j}": Int << IG(f"item.x{i}.y{j}") for j in range(i % 7 + 1)}
+        result.append(dumps(Record(fields)))
+        result.append(dumps(Sum << Map(int) << List << Str << PG(f"item.{i}.*.v{i % 13}", default=0)))
+        result.append(dumps(Int << IG('.'.join(f"k{j}" for j in range(i % 9 + 1)))))
+    return result
+
+
+def run(*args: str, repeat: int = 5) -> float:
+    return min(float(subprocess.check_output([sys.executable, '-c', WORKER, *args])) for _ in range(repeat))
+
+
+def main(count: int = 100) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = f"{tmp}/specs.json"
+        with open(path, 'w') as f:
+            json.dump(specs(count), f)
+        print(f"{3 * count} pipelines")
+        print(f"without cache: {run(path) * 1e3:8.1f}ms")
+        print(f"cold cache   : {run(path, f'{tmp}/cache', repeat=1) * 1e3:8.1f}ms")
+        print(f"warm cache   : {run(path, f'{tmp}/cache') * 1e3:8.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
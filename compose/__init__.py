@@ -1,6 +1,7 @@
 from operator import itemgetter, attrgetter
-from functools import partial, wraps, reduce
-from typing import Callable, Any, TypeVar, Sequence, Union, Mapping
+from weakref import WeakValueDictionary
+from functools import partial, wraps, reduce, lru_cache
+from typing import Callable, Any, TypeVar, Sequence, Union, Mapping, Iterable, Optional, Tuple
 
 
 __version__ = '0.3.4'
@@ -17,10 +18,26 @@ CType = Callable[[CArg], Any]
 Pipeline = Union[CType, ComposeT, CT]
 
 
+# inspect.CO_COROUTINE, inspect itself is not imported to keep the import time low
+CO_COROUTINE = 0x80
+
+
 def _name(obj: Any) -> str:
     return obj.__class__.__name__
 
 
+def is_async(func: Any) -> bool:
+    """
+    Coroutine function or async stage
+    """
+    if getattr(func, 'is_async', False) is True:
+        return True
+    while isinstance(func, partial):
+        func = func.func
+    func = getattr(func, '__func__', func)
+    return bool(getattr(getattr(func, '__code__', None), 'co_flags', 0) & CO_COROUTINE)
+
+
 class ComposeError(Exception):
 
     def __init__(self, func: CType, arg: CArg) -> None:
@@ -33,11 +50,26 @@ class ComposeError(Exception):
     def __repr__(self) -> str:
         return f"{_name(self)}(func={self.func!r}, arg={self.arg!r})"
 
+    def __reduce__(self):
+        return self.__class__, (self.func, self.arg), {'__cause__': self.__cause__}
+
     @property
     def origin(self):
         return self.__cause__
 
 
+def identity(arg: CArg) -> CArg:
+    return arg
+
+
+def list_map(func: CType, iterable: Iterable) -> list:
+    return list(map(func, iterable))
+
+
+def set_map(func: CType, iterable: Iterable) -> set:
+    return set(map(func, iterable))
+
+
 def flip(func: CType) -> CType:
 
     @wraps(func)
@@ -47,14 +79,157 @@ def flip(func: CType) -> CType:
     return wrapper
 
 
+def stage_error(stage: CType, arg: CArg, exc: Exception) -> ComposeError:
+    """
+    Error of `stage` failing for `arg`, stages merged by rewrite report their own failing stage
+    """
+    if isinstance(exc, ComposeError) and getattr(stage, 'merged', False):
+        return exc
+    error = ComposeError(stage, arg)
+    error.__cause__ = exc
+    return error
+
+
 def safe_apply(func: CType, arg: CArg) -> Any:
     try:
         return func(arg)
     except Exception as exc:
-        raise ComposeError(func, arg) from exc
+        raise stage_error(func, arg, exc)
+
+
+# code objects of generated sources and the sources executed while a CodeCache
+# is loading pipelines, see compose.spec.CodeCache; None otherwise, factories
+# generating sources are cached by their own bounded caches
+_codes = None
+_used = None
+
+
+def _exec(source: str, filename: str, namespace: Optional[dict] = None) -> dict:
+    """
+    Execute generated source, with the code object of a CodeCache if it has one
+    """
+    codes = _codes
+    code = None if codes is None else codes.get(source)
+    if code is None:
+        code = compile(source, filename, 'exec')
+        if codes is not None:
+            codes[source] = code
+    if _used is not None:
+        _used.add(source)
+    namespace = {} if namespace is None else namespace
+    exec(code, namespace)
+    return namespace
+
+
+@lru_cache(maxsize=None)
+def _factory(size: int) -> Callable:
+    """
+    Generate a closure factory for a straight-line composition of `size` functions:
+
+        def factory(error, stages, f0, f1):
+            s0, s1 = stages
+            def compiled(arg):
+                try:
+                    _f1 = f1(arg)
+                    _f0 = f0(_f1)
+                except Exception as exc:
+                    bound = locals()
+                    if '_f1' not in bound:
+                        raise error(s1, arg, exc)
+                    raise error(s0, _f1, exc)
+                return _f0
+            return compiled
+
+    `f*` are the functions to call, `s*` are the stages reported by ComposeError, see stage_error.
+    There is a single try block: the failing stage is the first one whose result
+    is not bound yet, so stages are never called twice.
+    """
+    names = [f"f{i}" for i in range(size)]
+    lines = [
+        f"def factory(error, stages, {', '.join(names)}):",
+        f"    {''.join(f's{i}, ' for i in range(size))}= stages",
+        "    def compiled(arg):",
+        "        try:",
+    ]
+    handler = ["        except Exception as exc:", "            bound = locals()"]
+    value = 'arg'
+    for i, name in reversed(list(enumerate(names))):
+        lines.append(f"            _{name} = {name}({value})")
+        if i:
+            handler += [
+                f"            if '_{name}' not in bound:",
+                f"                raise error(s{i}, {value}, exc)",
+            ]
+        else:
+            handler.append(f"            raise error(s{i}, {value}, exc)")
+        value = f"_{name}"
+    lines += [*handler, f"        return {value}", "    return compiled"]
+    return _exec('\n'.join(lines), f"<compose:{size}>")['factory']
+
+
+def _unwrap(func: CType) -> CType:
+    """
+    Fastest callable with the same behaviour as `func`
+    """
+    if isinstance(func, Compose) and not is_async(func):
+        return func.compile()
+    if isinstance(func, C) and type(func).__call__ is C.__call__:
+        return func.func
+    return func
+
+
+_setattr = object.__setattr__
+
+# canonical instances of equal pipelines, see intern()
+_interned = WeakValueDictionary()
+_interning = False
+
+
+def set_interning(enabled: bool) -> None:
+    """
+    Make `<<` and dotted getters return shared instances for equal pipelines
+    """
+    global _interning
+    _interning = enabled
+
+
+def intern(obj: ShiftT) -> ShiftT:
+    """
+    Shared instance equal to `obj`, `obj` itself if it is the first one or unhashable
+    """
+    try:
+        return _interned.setdefault((obj.__class__, obj._key()), obj)
+    except TypeError:
+        return obj
+
+
+class _Pair(tuple):
+    """
+    Not yet flattened stack: a pair of stacks or pairs
+    """
+    __slots__ = ()
+
+
+def _part(composition: ComposeT) -> tuple:
+    # the flat stack once it is built, the not yet flattened operands before
+    return composition._parts if composition._stack is None else composition._stack
 
 
 class Shift:
+    """
+    Base class of immutable pipeline objects
+    """
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{_name(self)} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{_name(self)} is immutable")
+
+    def _set(self, **attrs: Any) -> None:
+        for name, value in attrs.items():
+            _setattr(self, name, value)
 
     def __lshift__(self, other: ShiftT) -> ComposeT:
         """ << operator """
@@ -62,11 +237,32 @@ class Shift:
             return Compose.pipeline(self, other)
         return NotImplemented
 
+    def __and__(self, other: ShiftT) -> CT:
+        """ & operator, see And """
+        if isinstance(other, Shift):
+            return And(self, other)
+        return NotImplemented
+
+    def __or__(self, other: ShiftT) -> CT:
+        """ | operator, see Or """
+        if isinstance(other, Shift):
+            return Or(self, other)
+        return NotImplemented
+
+    def __invert__(self) -> CT:
+        """ ~ operator, see Not """
+        return Not(self)
+
 
 class Compose(Shift):
     """
-    Container for function compositions
+    Container for function compositions.
+
+    `<<` does not copy the operand stacks: the result keeps both operands and
+    the flat stack is built on first access, so growing a pipeline stage by
+    stage costs O(1) per stage
     """
+    __slots__ = ('_stack', '_parts', '_hash', '__weakref__')
 
     def __init__(self, *items: Sequence[CT]) -> None:
         if not items:
@@ -74,36 +270,179 @@ class Compose(Shift):
         for x in items:
             if not callable(x):
                 raise ValueError(f"All passed items must be callable, got {x!r} instead")
-        self.stack = tuple(items)
+        _setattr(self, '_stack', items)
+        _setattr(self, '_parts', None)
+        _setattr(self, '_hash', None)
+
+    @classmethod
+    def _join(cls, f: tuple, g: tuple) -> ComposeT:
+        """
+        Composition of two validated stacks or pairs, see _part
+        """
+        result = cls.__new__(cls)
+        _setattr(result, '_stack', None)
+        _setattr(result, '_parts', _Pair((f, g)))
+        _setattr(result, '_hash', None)
+        return result
+
+    @property
+    def stack(self) -> tuple:
+        if self._stack is None:
+            items, todo = [], [self._parts]
+            while todo:
+                part = todo.pop()
+                if part.__class__ is _Pair:
+                    todo += part[1], part[0]
+                else:
+                    items += part
+            _setattr(self, '_stack', tuple(items))
+            _setattr(self, '_parts', None)
+        return self._stack
 
     @classmethod
     def pipeline(cls, f: Pipeline, g: Pipeline) -> ComposeT:
-        g_compose = isinstance(g, cls)
-        if isinstance(f, cls):
-            return cls(*f.stack, *g.stack) if g_compose else cls(*f.stack, g)
-        return cls(f, *g.stack) if g_compose else cls(f, g)
+        f_compose, g_compose = isinstance(f, cls), isinstance(g, cls)
+        # keep the most specific composition class, e.g. FastCompose
+        for x in (f, g):
+            if isinstance(x, cls) and issubclass(x.__class__, cls):
+                cls = x.__class__
+        if not getattr(cls, 'is_async', False) and any(is_async(x) for x in (f, g)):
+            from .aio import AsyncCompose
+            cls = AsyncCompose
+        if cls.__init__ is not Compose.__init__:
+            # subclasses may prepare the stack in __init__
+            if f_compose:
+                result = cls(*f.stack, *g.stack) if g_compose else cls(*f.stack, g)
+            else:
+                result = cls(f, *g.stack) if g_compose else cls(f, g)
+        else:
+            if not (f_compose or callable(f)):
+                raise ValueError(f"All passed items must be callable, got {f!r} instead")
+            if not (g_compose or callable(g)):
+                raise ValueError(f"All passed items must be callable, got {g!r} instead")
+            result = cls._join(_part(f) if f_compose else (f,), _part(g) if g_compose else (g,))
+        return intern(result) if _interning else result
+
+    @property
+    def __name__(self) -> str:
+        return repr(self)
 
     def __repr__(self) -> str:
         return f"<{_name(self)}: {','.join(map(repr, self.stack))}>"
 
+    def __reduce__(self):
+        return self.__class__, self.stack
+
+    def _key(self) -> Any:
+        return self.stack
+
     def __eq__(self, other) -> bool:
         if isinstance(other, self.__class__):
             return self.stack == other.stack
         return NotImplemented
 
+    def __hash__(self) -> int:
+        if self._hash is None:
+            _setattr(self, '_hash', hash(self._key()))
+        return self._hash
+
     def __call__(self, arg: CArg) -> Any:
         return reduce(flip(safe_apply), reversed(self.stack), arg)
 
+    def compile(self) -> CType:
+        """
+        Flat function with the same results and errors as the composition.
+        Not supported for async stages, they would not be awaited
+        """
+        if any(map(is_async, self.stack)):
+            raise TypeError(f"{self!r} has async stages and cannot be compiled")
+        compiled = _factory(len(self.stack))(stage_error, self.stack, *map(_unwrap, self.stack))
+        compiled.__name__ = compiled.__qualname__ = repr(self)
+        return compiled
+
+    def apply_batch(
+        self, batch: Iterable[CArg], on_error: str = 'raise', default: Any = None, dead_letters=None,
+    ) -> Any:
+        """
+        Results for every argument of the batch, computed stage by stage.
+        NumPy arrays are processed with vectorized kernels where available.
+        With an error policy, failed arguments are dropped or their results are `default`, see OnError
+        """
+        return apply_batch(self.stack, batch, on_error=on_error, default=default, dead_letters=dead_letters)
+
+    def profile(self, profile: Optional['Profile'] = None) -> Tuple[ComposeT, 'Profile']:
+        """
+        Copy of the composition recording per-stage timings into `profile` (a new Profile by default),
+        and the profile. The composition itself is left untouched
+        """
+        profile = profile or Profile()
+        return profile.attach(self), profile
+
+    def cached(
+        self, maxsize: Optional[int] = 128, ttl: Optional[float] = None, key: Optional[CType] = None,
+    ) -> CT:
+        """
+        Memoized composition, see Cached
+        """
+        return Cached(self, maxsize=maxsize, ttl=ttl, key=key)
+
+    def specialize(self, warmup: int = 100) -> CT:
+        """
+        Composition specialized for the argument types of its first calls, see Specialized
+        """
+        return Specialized(self, warmup=warmup)
+
+    def on_error(self, on_error: str = 'skip', default: Any = None, dead_letters=None) -> CT:
+        """
+        Composition returning `default` instead of raising, see OnError
+        """
+        return OnError(self, on_error, default=default, dead_letters=dead_letters)
+
+    def optional(self, default: Any = None) -> CT:
+        """
+        Composition returning `default` for missing keys, attributes and None values, see Opt
+        """
+        return Opt(self, default=default)
+
+    def optimize(self, verbose: bool = False) -> ComposeT:
+        """
+        Equivalent composition with merged and removed stages
+        """
+        optimized = self.__class__(*rewrite(self.stack))
+        if verbose:
+            print(f"{self!r} => {optimized!r}")
+        return optimized
+
+
+class FastCompose(Compose):
+    """
+    Composition without per-stage error handling.
+
+    On failure the stage and its argument are taken from the intermediate results
+    recorded so far, the composition is never replayed: stages with side effects
+    are called exactly once, as in Compose
+    """
+    __slots__ = ('compiled',)
+
+    def __init__(self, *items: Sequence[CT]) -> None:
+        super().__init__(*items)
+        self._set(compiled=self.compile())
+
+    def __call__(self, arg: CArg) -> Any:
+        return self.compiled(arg)
+
 
 class C(Shift):
     """
     Function wrapper for compositions
     """
+    __slots__ = ('func', '_hash', '__weakref__')
 
     def __init__(self, func: CType) -> None:
         if not callable(func):
             raise ValueError(f"{func!r} must be callable")
-        self.func = func
+        _setattr(self, 'func', func)
+        _setattr(self, '_hash', None)
 
     @property
     def __name__(self) -> str:
@@ -112,11 +451,26 @@ class C(Shift):
     def __repr__(self) -> str:
         return self.__name__
 
+    def __reduce__(self):
+        return self.__class__, (self.func,)
+
+    def _key(self) -> Any:
+        return self.func
+
     def __eq__(self, other) -> bool:
         if isinstance(other, self.__class__):
-            return self.func == other.func
+            return self._key() == other._key()
         return NotImplemented
 
+    def __hash__(self) -> int:
+        if self._hash is None:
+            _setattr(self, '_hash', hash(self._key()))
+        return self._hash
+
+    @property
+    def is_async(self) -> bool:
+        return is_async(self.func)
+
     def __call__(self, arg: CArg) -> Any:
         return self.func(arg)
 
@@ -125,10 +479,17 @@ class BaseGetter(C):
     """
     Base class for getters
     """
+    __slots__ = ('args',)
 
     def __init__(self, *args: Sequence[Any]) -> None:
         super().__init__(self.getter(*args))
-        self.args = args
+        _setattr(self, 'args', args)
+
+    def __reduce__(self):
+        return self.__class__, self.args
+
+    def _key(self) -> Any:
+        return self.args
 
     @property
     def __name__(self) -> str:
@@ -139,6 +500,7 @@ class AG(BaseGetter):
     """
     Attribute getter
     """
+    __slots__ = ()
     getter = attrgetter
 
 
@@ -146,6 +508,7 @@ class IG(BaseGetter):
     """
     Item getter
     """
+    __slots__ = ()
     getter = itemgetter
 
     def __new__(cls, *args: Sequence[Any]) -> None:
@@ -158,7 +521,8 @@ class IG(BaseGetter):
             # support dot-format, e.g. itemgetter('item.menu.id')
             names = arg.split('.')
             if len(names) > 1:
-                return Compose(*map(cls, reversed(names)))
+                result = Compose(*map(cls, reversed(names)))
+                return intern(result) if _interning else result
 
         # itemgetter(0), itemgetter(1, 2), itemgetter('item', 'date')
         return super().__new__(cls)
@@ -168,10 +532,17 @@ class P(C):
     """
     Partial function
     """
+    __slots__ = ()
 
     def __init__(self, func: Callable, *args: Sequence[Any], **kwargs: Mapping[str, Any]) -> None:
         super().__init__(partial(func, *args, **kwargs))
 
+    def __reduce__(self):
+        return partial(self.__class__, **self.func.keywords), (self.func.func, *self.func.args)
+
+    def _key(self) -> Any:
+        return self.func.func, self.func.args, tuple(sorted(self.func.keywords.items()))
+
     @property
     def __name__(self) -> str:
         return f"partial({self.func.func.__name__})"
@@ -181,24 +552,58 @@ class IterCompose(P):
     """
     Base class for iterators
     """
+    __slots__ = ()
     f = None
 
     def __init__(self, func: Callable) -> None:
         super().__init__(self.f, func)
 
+    def __reduce__(self):
+        return self.__class__, self.func.args
+
     @property
     def __name__(self) -> str:
-        return f"{self.f.__name__}({self.func.args[0].__name__})"
+        func = self.func.args[0]
+        return f"{self.f.__name__}({getattr(func, '__name__', None) or repr(func)})"
+
+
+class ItemCompose(IterCompose):
+    """
+    Base class for iterators accepting an error policy for their items, see OnError
+    """
+    __slots__ = ()
 
+    def __new__(cls, func: Callable, on_error: str = 'raise', default: Any = None, dead_letters=None):
+        if on_error == 'raise':
+            return super().__new__(cls)
+        return OnError(cls(func), on_error, default=default, dead_letters=dead_letters)
 
-class Map(IterCompose):
+    def __init__(
+        self, func: Callable, on_error: str = 'raise', default: Any = None, dead_letters=None,
+    ) -> None:
+        super().__init__(func)
+
+
+class Map(ItemCompose):
+    __slots__ = ()
     f = map
 
 
-class Filter(IterCompose):
+class Filter(ItemCompose):
+    __slots__ = ()
     f = filter
 
 
+class ListMap(IterCompose):
+    __slots__ = ()
+    f = staticmethod(list_map)
+
+
+class SetMap(IterCompose):
+    __slots__ = ()
+    f = staticmethod(set_map)
+
+
 Int = C(int)
 Str = C(str)
 Set = C(set)
@@ -206,3 +611,22 @@ List = C(list)
 Dict = C(dict)
 
 Sum = C(sum)
+Id = C(identity)
+
+
+from .rewrite import rewrite  # noqa: E402
+from .batch import apply_batch  # noqa: E402
+from .cache import Cached  # noqa: E402
+from .aggregate import Aggregate, GroupBy  # noqa: E402,F401
+from .errors import DeadLetters, OnError  # noqa: E402,F401
+from .optional import Opt  # noqa: E402,F401
+from .profiling import Profile  # noqa: E402
+from .path import PG, PathError  # noqa: E402,F401
+from .predicate import And, Not, Or  # noqa: E402
+from .record import Record  # noqa: E402,F401
+from .specialize import Specialized  # noqa: E402
+from .stream import Chunk, DropWhile, FlatMap, Scan, Skip, Take, TakeWhile, Window  # noqa: E402,F401
+from .fork import Fork  # noqa: E402,F401
+from .ordering import BottomK, MergeSorted, SortBy, TopK  # noqa: E402,F401
+from .sinks import ToArray, ToBuffer, ToNumpy  # noqa: E402,F401
+from .windows import SlidingTimeWindow, SlidingWindow, TumblingTimeWindow, TumblingWindow  # noqa: E402,F401
@@ -0,0 +1,201 @@
+"""
+Single-pass aggregation sinks
+"""
+from typing import Any, Dict, List, Mapping, Tuple, Union
+
+from . import C, CType, ComposeError, _exec, _setattr, _unwrap
+
+# kind: (accumulators with their initial values, per item statements, result)
+# `{a0}`, `{a1}`... are the accumulators, `{v}` is the extracted value
+KINDS = {
+    'count': (('0',), ("{a0} += 1",), "{a0}"),
+    'sum': (('0',), ("{a0} += {v}",), "{a0}"),
+    'min': (('None',), ("if {a0} is None or {v} < {a0}: {a0} = {v}",), "{a0}"),
+    'max': (('None',), ("if {a0} is None or {v} > {a0}: {a0} = {v}",), "{a0}"),
+    # Welford: count, mean, sum of squared deviations
+    'mean': (('0', '0.0', '0.0'), (
+        "{a0} += 1",
+        "d = {v} - {a1}",
+        "{a1} += d / {a0}",
+        "{a2} += d * ({v} - {a1})",
+    ), "{a1} if {a0} else None"),
+    'var': (('0', '0.0', '0.0'), (), "{a2} / ({a0} - 1) if {a0} > 1 else None"),
+    'distinct': (('set()',), ("{a0}.add({v})",), "len({a0})"),
+}
+
+Extractor = Union[CType, bool]
+
+
+def _plan(
+    aggregates: Tuple[Tuple[str, Extractor], ...],
+) -> Tuple[List[str], List[str], List[str], List[CType]]:
+    """
+    Accumulator initial values, per item statements, results and extractors of the aggregates
+    """
+    inits, body, results, extractors = [], [], [], []
+    values: Dict[Any, str] = {}
+    # accumulators of the Welford state per extracted value, shared by mean and var
+    welford: Dict[str, List[str]] = {}
+    for kind, extractor in aggregates:
+        if extractor is True:
+            value = 'item'
+        else:
+            key = extractor
+            try:
+                hash(key)
+            except TypeError:
+                key = id(extractor)
+            if key not in values:
+                values[key] = f"v{len(extractors)}"
+                extractors.append(extractor)
+                body.append(f"{values[key]} = e{len(extractors) - 1}(item)")
+            value = values[key]
+        initial, statements, result = KINDS[kind]
+        if kind == 'count' and value != 'item':
+            # like SQL COUNT(x), missing values are not counted
+            statements = ("if {v} is not None: {a0} += 1",)
+        if kind in ('mean', 'var') and value in welford:
+            names = welford[value]
+        else:
+            names = []
+            for init in initial:
+                names.append(f"{{acc{len(inits)}}}")
+                inits.append(init)
+            if kind in ('mean', 'var'):
+                welford[value] = names
+                statements = KINDS['mean'][1]
+            body += [x.format(v=value, **{f"a{i}": name for i, name in enumerate(names)}) for x in statements]
+        results.append(result.format(**{f"a{i}": name for i, name in enumerate(names)}))
+    return inits, body, results, extractors
+
+
+def _factory(
+    aggregates: Tuple[Tuple[str, Extractor], ...], grouped: bool,
+) -> Tuple[CType, List[CType]]:
+    """
+    Generate the aggregation loop, e.g. for Aggregate(sum=IG('x'), mean=IG('x')):
+
+        def factory(ComposeError, stage, e0):
+            def aggregate(iterable):
+                acc0 = 0
+                acc1 = 0
+                acc2 = 0.0
+                acc3 = 0.0
+                for item in iterable:
+                    try:
+                        v0 = e0(item)
+                        acc0 += v0
+                        acc1 += 1
+                        d = v0 - acc2
+                        acc2 += d / acc1
+                        acc3 += d * (v0 - acc2)
+                    except Exception as exc:
+                        raise ComposeError(stage, item) from exc
+                return {'sum': acc0, 'mean': acc2 if acc1 else None}
+            return aggregate
+
+    Only the updates are guarded, errors of the iterable itself are raised as they are.
+    With `grouped`, accumulators are kept in a list per group: `acc0` is `state[0]`
+    """
+    inits, body, results, extractors = _plan(aggregates)
+    if grouped:
+        names = {f"acc{i}": f"state[{i}]" for i in range(len(inits))}
+        setup = ["groups = {}"]
+        body = [
+            "group = key(item)",
+            "state = groups.get(group)",
+            "if state is None:",
+            f"    state = groups[group] = [{', '.join(inits)}]",
+            *body,
+        ]
+    else:
+        names = {f"acc{i}": f"acc{i}" for i in range(len(inits))}
+        setup = [f"acc{i} = {init}" for i, init in enumerate(inits)]
+    body = [x.format(**names) for x in body]
+    items = (f"{kind!r}: {x.format(**names)}" for (kind, _), x in zip(aggregates, results))
+    result = '{' + ', '.join(items) + '}'
+    if grouped:
+        ret = f"{{group: {result} for group, state in groups.items()}}"
+    else:
+        ret = result
+    lines = [
+        f"def factory(ComposeError, stage, key{''.join(f', e{i}' for i in range(len(extractors)))}):",
+        "    def aggregate(iterable):",
+        *(f"        {x}" for x in setup),
+        "        for item in iterable:",
+        "            try:",
+        *(f"                {x}" for x in body),
+        "            except Exception as exc:",
+        "                raise ComposeError(stage, item) from exc",
+        f"        return {ret}",
+        "    return aggregate",
+    ]
+    return _exec('\n'.join(lines), f"<aggregate:{len(aggregates)}>")['factory'], extractors
+
+
+class Aggregate(C):
+    """
+    Aggregates of an iterable computed in one pass: Aggregate(sum=IG('x'), count=True).
+
+    Each aggregate takes a key extractor, or True for the items themselves;
+    `count` with an extractor counts the values which are not None.
+    Values extracted by equal extractors are computed once per item.
+    `var` is the sample variance (Welford), `distinct` keeps a set of the values.
+    Returns a dict, empty iterables give 0 counts and sums and None otherwise.
+    Errors are reported as ComposeError with the stage and the failing item
+    """
+    __slots__ = ('aggregates',)
+
+    def __init__(self, **aggregates: Mapping[str, Extractor]) -> None:
+        if not aggregates:
+            raise TypeError(f"{self.__class__.__name__} expected at least 1 aggregate, got 0")
+        for kind, extractor in aggregates.items():
+            if kind not in KINDS:
+                raise ValueError(f"Unknown aggregate {kind!r}, expected one of {', '.join(KINDS)}")
+            if extractor is not True and not callable(extractor):
+                raise ValueError(f"{kind} expected a callable or True, got {extractor!r}")
+        _setattr(self, 'aggregates', tuple(aggregates.items()))
+        factory, extractors = _factory(self.aggregates, grouped=False)
+        super().__init__(factory(ComposeError, self, None, *map(_unwrap, extractors)))
+
+    @property
+    def __name__(self) -> str:
+        return f"aggregate({','.join(kind if x is True else f'{kind}={x!r}' for kind, x in self.aggregates)})"
+
+    def __reduce__(self):
+        # keyword arguments would lose their order in specs
+        return _restore, (self.__class__, self.aggregates)
+
+    def _key(self) -> Any:
+        return self.aggregates
+
+
+def _restore(cls: type, aggregates: Tuple[Tuple[str, Extractor], ...]) -> Aggregate:
+    return cls(**dict(aggregates))
+
+
+class GroupBy(C):
+    """
+    Aggregates per group: {key(item): aggregate(items of the group)}, one accumulator per group
+    """
+    __slots__ = ('key', 'aggregate')
+
+    def __init__(self, key: CType, aggregate: Aggregate) -> None:
+        if not callable(key):
+            raise ValueError(f"{key!r} must be callable")
+        if not isinstance(aggregate, Aggregate):
+            raise ValueError(f"Aggregate expected, got {aggregate!r}")
+        _setattr(self, 'key', key)
+        _setattr(self, 'aggregate', aggregate)
+        factory, extractors = _factory(aggregate.aggregates, grouped=True)
+        super().__init__(factory(ComposeError, self, _unwrap(key), *map(_unwrap, extractors)))
+
+    @property
+    def __name__(self) -> str:
+        return f"group_by({self.key!r},{self.aggregate!r})"
+
+    def __reduce__(self):
+        return self.__class__, (self.key, self.aggregate)
+
+    def _key(self) -> Any:
+        return self.key, self.aggregate
@@ -0,0 +1,118 @@
+"""
+Compositions with coroutine stages
+"""
+import asyncio
+
+from collections import deque
+from typing import Any, AsyncIterator, Iterable, Optional, Sequence, Union
+
+from . import C, CArg, Compose, ComposeError, CT, CType, is_async
+
+
+async def _collect(iterable: AsyncIterator) -> list:
+    return [x async for x in iterable]
+
+
+class AsyncCompose(Compose):
+    """
+    Composition with coroutine stages.
+
+    Calling it returns a coroutine: async stages are awaited, sync stages are called inline.
+    Async iterators produced by AMap are collected into a list before a sync stage
+    """
+    __slots__ = ('plan',)
+    is_async = True
+
+    def __init__(self, *items: Sequence[CT]) -> None:
+        super().__init__(*items)
+        # (stage, await the result, collect the async iterator argument)
+        plan, streaming = [], False
+        for func in reversed(self.stack):
+            stream = getattr(func, 'is_stream', False) is True
+            plan.append((func, is_async(func) and not stream, streaming and not stream))
+            streaming = stream
+        self._set(plan=tuple(plan))
+
+    async def __call__(self, arg: CArg) -> Any:
+        for func, awaits, collect in self.plan:
+            try:
+                if collect:
+                    arg = await _collect(arg)
+                result = func(arg)
+                if awaits:
+                    result = await result
+            except Exception as exc:
+                raise ComposeError(func, arg) from exc
+            arg = result
+        return arg
+
+
+class AMap(C):
+    """
+    map() over an iterable or async iterable with at most `concurrency` pending coroutines.
+    Returns an async iterator, results are yielded in the input order if `ordered`
+    """
+    __slots__ = ('concurrency', 'ordered', 'awaits')
+    is_async = True
+    is_stream = True
+
+    def __init__(self, func: CType, concurrency: int = 16, ordered: bool = True) -> None:
+        super().__init__(func)
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be positive, got {concurrency!r}")
+        self._set(concurrency=concurrency, ordered=ordered, awaits=is_async(func))
+
+    @property
+    def __name__(self) -> str:
+        return f"amap({self.func.__name__})"
+
+    def __reduce__(self):
+        return self.__class__, (self.func, self.concurrency, self.ordered)
+
+    def _key(self) -> Any:
+        return self.func, self.concurrency, self.ordered
+
+    async def _items(self, iterable: Union[Iterable, AsyncIterator]) -> AsyncIterator:
+        if hasattr(iterable, '__aiter__'):
+            async for item in iterable:
+                yield item
+        else:
+            for item in iterable:
+                yield item
+
+    async def _amap(self, iterable: Union[Iterable, AsyncIterator]) -> AsyncIterator:
+        if not self.awaits:
+            async for item in self._items(iterable):
+                yield self.func(item)
+            return
+
+        pending = deque()
+        items: Optional[AsyncIterator] = self._items(iterable)
+        try:
+            while True:
+                while items is not None and len(pending) < self.concurrency:
+                    try:
+                        item = await items.__anext__()
+                    except StopAsyncIteration:
+                        items = None
+                    else:
+                        pending.append(asyncio.ensure_future(self.func(item)))
+                if not pending:
+                    return
+                if self.ordered:
+                    done = [pending.popleft()]
+                    await done[0]
+                else:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        pending.remove(task)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    def __call__(self, iterable: Union[Iterable, AsyncIterator]) -> AsyncIterator:
+        return self._amap(iterable)
@@ -0,0 +1,172 @@
+"""
+Stage-by-stage evaluation of a composition over a batch of arguments
+
+NumPy is optional: vectorized kernels are used only when the batch is already
+a `numpy.ndarray`, so it is never imported here.
+"""
+import sys
+
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence
+
+from . import C, CArg, ComposeError, CType, Filter, IG, Map, _unwrap
+from .errors import DeadLetters, check_policy, tolerant_per_item
+
+Kernel = Callable[[Any], Any]
+
+NUMERIC = frozenset('biuf')
+INTEGER = frozenset('biu')
+
+
+def _to_int(batch: Any) -> Optional[Any]:
+    numpy = sys.modules['numpy']
+    if batch.dtype.kind in INTEGER:
+        if batch.dtype.kind == 'u' and batch.dtype.itemsize == 8 and batch.size and batch.max() >= 2 ** 63:
+            # int64 would wrap around
+            return None
+        return batch.astype(numpy.int64)
+    if batch.dtype.kind == 'f' and numpy.isfinite(batch).all() and (abs(batch) < 2 ** 63).all():
+        return numpy.trunc(batch).astype(numpy.int64)
+    return None
+
+
+def _to_float(batch: Any) -> Optional[Any]:
+    return batch.astype(sys.modules['numpy'].float64) if batch.dtype.kind in NUMERIC else None
+
+
+def _to_bool(batch: Any) -> Optional[Any]:
+    return batch.astype(bool) if batch.dtype.kind in NUMERIC else None
+
+
+def _to_str(batch: Any) -> Optional[Any]:
+    return batch.astype(str) if batch.dtype.kind in INTEGER else None
+
+
+def _sum(batch: Any) -> Optional[Any]:
+    return batch.sum(axis=1) if batch.ndim == 2 and batch.dtype.kind in NUMERIC else None
+
+
+# f(x) for every element of an array, None if not applicable
+ELEMENTWISE: Dict[Callable, Kernel] = {
+    int: _to_int,
+    float: _to_float,
+    bool: _to_bool,
+    str: _to_str,
+}
+
+# f(row) for every row of a 2-D array, None if not applicable
+ROWWISE: Dict[Callable, Kernel] = {
+    sum: _sum,
+}
+
+
+def _func(stage: CType) -> Any:
+    return stage.func if type(stage) is C else stage
+
+
+def _elementwise(func: CType, batch: Any) -> Optional[Any]:
+    try:
+        kernel = ELEMENTWISE.get(_func(func))
+    except TypeError:  # unhashable
+        return None
+    return kernel and kernel(batch)
+
+
+def _getter(stage: IG, batch: Any) -> Optional[Any]:
+    if len(stage.args) != 1:
+        return None
+    key, = stage.args
+    names = batch.dtype.names
+    if names is not None and batch.ndim == 1:
+        return batch[key] if key in names else None
+    if isinstance(key, int) and batch.ndim > 1 and -batch.shape[1] <= key < batch.shape[1]:
+        return batch[:, key]
+    return None
+
+
+def _filter(stage: Filter, batch: Any) -> Optional[Any]:
+    if batch.ndim != 2:
+        return None
+    mask = _elementwise(stage.func.args[0], batch)
+    if mask is None or mask.dtype.kind not in NUMERIC:
+        return None
+    return [row[selected] for row, selected in zip(batch, mask.astype(bool))]
+
+
+def vectorized(stage: CType, batch: Any) -> Optional[Any]:
+    """
+    Result of a vectorized kernel for `stage` over an array, None if there is no kernel
+    """
+    if type(stage) is IG:
+        return _getter(stage, batch)
+    # items are the rows: scalars of a 1-D array, scalars of the rows for Map over a 2-D one
+    if type(stage) is Map:
+        return _elementwise(stage.func.args[0], batch) if batch.ndim == 2 else None
+    if type(stage) is Filter:
+        return _filter(stage, batch)
+    result = _elementwise(stage, batch) if batch.ndim == 1 else None
+    if result is None and batch.ndim == 2:
+        try:
+            kernel = ROWWISE.get(_func(stage))
+        except TypeError:
+            return None
+        result = kernel and kernel(batch)
+    return result
+
+
+def per_item(stage: CType, batch: Iterable[CArg]) -> list:
+    func = _unwrap(stage)
+    result = []
+    append = result.append
+    for arg in batch:
+        try:
+            append(func(arg))
+        except Exception as exc:
+            raise ComposeError(stage, arg) from exc
+    return result
+
+
+def apply_batch(
+    stack: Sequence[CType],
+    batch: Iterable[CArg],
+    on_error: str = 'raise',
+    default: Any = None,
+    dead_letters: Optional[DeadLetters] = None,
+) -> Any:
+    """
+    Apply stages one by one to the whole batch.
+
+    With an error policy, failed arguments are left out of the next stages;
+    with 'default' their results are `default`, at their original positions
+    """
+    check_policy(on_error)
+    if dead_letters is None:
+        dead_letters = DeadLetters()
+    numpy = sys.modules.get('numpy')
+    # original positions of the remaining arguments once some failed with 'default'
+    positions, size = None, 0
+    for stage in reversed(stack):
+        result = None
+        if numpy is not None and isinstance(batch, numpy.ndarray):
+            try:
+                result = vectorized(stage, batch)
+            except Exception:
+                # the per-item path raises the ComposeError
+                result = None
+        if result is not None:
+            batch = result
+        elif on_error == 'raise':
+            batch = per_item(stage, batch)
+        else:
+            batch, failed = tolerant_per_item(stage, batch, on_error, dead_letters)
+            if failed and on_error == 'default':
+                if positions is None:
+                    size = len(batch) + len(failed)
+                    positions = range(size)
+                failed = set(failed)
+                positions = [x for i, x in enumerate(positions) if i not in failed]
+    if positions is not None:
+        results = [default] * size
+        for position, value in zip(positions, batch):
+            results[position] = value
+        batch = results
+    return batch
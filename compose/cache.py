@@ -0,0 +1,89 @@
+"""
+Memoizing stages
+"""
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, NamedTuple, Optional
+
+from . import C, CArg, CType
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: Optional[int]
+
+
+class Counters:
+    __slots__ = ('hits', 'misses', 'evictions')
+
+    def __init__(self) -> None:
+        self.hits = self.misses = self.evictions = 0
+
+
+class Cached(C):
+    """
+    Memoized function with LRU eviction.
+
+    `maxsize=None` disables eviction, entries older than `ttl` seconds are recomputed.
+    `key` maps the argument to a hashable cache key, the argument itself by default.
+    Exceptions are not cached
+    """
+    __slots__ = ('maxsize', 'ttl', 'key', 'cache', 'counters')
+
+    def __init__(
+        self,
+        func: CType,
+        maxsize: Optional[int] = 128,
+        ttl: Optional[float] = None,
+        key: Optional[CType] = None,
+    ) -> None:
+        super().__init__(func)
+        if maxsize is not None and maxsize < 1:
+            raise ValueError(f"maxsize must be positive or None, got {maxsize!r}")
+        if key is not None and not callable(key):
+            raise ValueError(f"{key!r} must be callable")
+        self._set(maxsize=maxsize, ttl=ttl, key=key, cache=OrderedDict(), counters=Counters())
+
+    @property
+    def __name__(self) -> str:
+        return f"cached({self.func.__name__})"
+
+    def __reduce__(self):
+        return self.__class__, (self.func, self.maxsize, self.ttl, self.key)
+
+    def _key(self) -> Any:
+        return self.func, self.maxsize, self.ttl, self.key
+
+    def clear(self) -> None:
+        self.cache.clear()
+        self._set(counters=Counters())
+
+    def info(self) -> CacheInfo:
+        counters = self.counters
+        return CacheInfo(counters.hits, counters.misses, counters.evictions, len(self.cache), self.maxsize)
+
+    def __call__(self, arg: CArg) -> Any:
+        key = arg if self.key is None else self.key(arg)
+        cache, counters = self.cache, self.counters
+        try:
+            value, expires = cache[key]
+        except KeyError:
+            pass
+        else:
+            if expires is None or monotonic() < expires:
+                cache.move_to_end(key)
+                counters.hits += 1
+                return value
+            del cache[key]
+            counters.evictions += 1
+
+        counters.misses += 1
+        value = self.func(arg)
+        cache[key] = value, (None if self.ttl is None else monotonic() + self.ttl)
+        if self.maxsize is not None and len(cache) > self.maxsize:
+            cache.popitem(last=False)
+            counters.evictions += 1
+        return value
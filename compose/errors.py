@@ -0,0 +1,176 @@
+"""
+Error policies: failed items are skipped, replaced or collected instead of aborting the iteration
+"""
+from collections import deque
+from functools import partial
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import C, CArg, ComposeError, CType, Filter, Map, _name, _setattr, _unwrap
+
+POLICIES = ('raise', 'skip', 'default', 'collect')
+
+
+def check_policy(on_error: str) -> str:
+    if on_error not in POLICIES:
+        raise ValueError(f"Unknown error policy {on_error!r}, expected one of {', '.join(POLICIES)}")
+    return on_error
+
+
+class DeadLetters:
+    """
+    Failures handled by error policies and their counters.
+
+    `errors` keeps a ComposeError with the stage and its input for every failure
+    of the 'collect' policy, the oldest ones are dropped beyond `maxlen`.
+    `skipped` counts the items dropped by 'skip' and 'collect'
+    """
+    __slots__ = ('errors', 'skipped', 'defaulted', 'collected')
+
+    def __init__(self, maxlen: Optional[int] = None) -> None:
+        self.errors = deque(maxlen=maxlen)
+        self.clear()
+
+    def clear(self) -> None:
+        self.errors.clear()
+        self.skipped = self.defaulted = self.collected = 0
+
+    def add(self, on_error: str, stage: CType, arg: CArg, exc: Exception) -> None:
+        """
+        Record a failure of `stage` handled with `on_error`
+        """
+        if on_error == 'default':
+            self.defaulted += 1
+            return
+        self.skipped += 1
+        if on_error == 'collect':
+            error = ComposeError(stage, arg)
+            error.__cause__ = exc
+            self.errors.append(error)
+            self.collected += 1
+
+    def counters(self) -> Dict[str, int]:
+        return {'skipped': self.skipped, 'defaulted': self.defaulted, 'collected': self.collected}
+
+    def __len__(self) -> int:
+        return len(self.errors)
+
+    def __iter__(self) -> Iterator[ComposeError]:
+        return iter(self.errors)
+
+    def __repr__(self) -> str:
+        return f"{_name(self)}({', '.join(f'{k}={v}' for k, v in self.counters().items())})"
+
+
+def tolerant_map(
+    func: CType, stage: CType, on_error: str, default: Any, dead_letters: DeadLetters,
+    iterable: Iterable[CArg],
+) -> Iterator[Any]:
+    for item in iterable:
+        try:
+            result = func(item)
+        except Exception as exc:
+            if on_error == 'raise':
+                raise
+            dead_letters.add(on_error, stage, item, exc)
+            if on_error == 'default':
+                yield default
+            continue
+        yield result
+
+
+def tolerant_filter(
+    func: CType, stage: CType, on_error: str, default: Any, dead_letters: DeadLetters,
+    iterable: Iterable[CArg],
+) -> Iterator[Any]:
+    for item in iterable:
+        try:
+            passed = func(item)
+        except Exception as exc:
+            if on_error == 'raise':
+                raise
+            dead_letters.add(on_error, stage, item, exc)
+            # the default is the result of the predicate
+            passed = on_error == 'default' and default
+        if passed:
+            yield item
+
+
+def tolerant_per_item(
+    stage: CType, batch: Iterable[CArg], on_error: str, dead_letters: DeadLetters,
+) -> Tuple[list, List[int]]:
+    """
+    Results of the items which did not fail and the indices of the failed ones
+    """
+    func = _unwrap(stage)
+    result, failed = [], []
+    append = result.append
+    for arg in batch:
+        try:
+            append(func(arg))
+        except Exception as exc:
+            if on_error == 'raise':
+                raise ComposeError(stage, arg) from exc
+            dead_letters.add(on_error, stage, arg, exc)
+            failed.append(len(result) + len(failed))
+    return result, failed
+
+
+def tolerant(func: CType, stage: CType, on_error: str, default: Any, dead_letters: DeadLetters) -> CType:
+
+    def tolerant(arg: CArg) -> Any:
+        try:
+            return func(arg)
+        except Exception as exc:
+            if on_error == 'raise':
+                raise ComposeError(stage, arg) from exc
+            dead_letters.add(on_error, stage, arg, exc)
+            return default
+
+    return tolerant
+
+
+class OnError(C):
+    """
+    Stage with an error policy: 'raise', 'skip', 'default' or 'collect'.
+
+    For Map and Filter the policy applies to every item: a failed item is
+    dropped ('skip', 'collect') or replaced with `default` ('default'; for
+    Filter it is the predicate result). Other pipelines return `default`
+    when they fail with any policy but 'raise', there is no item to drop.
+    Failures are counted by `dead_letters`, 'collect' also keeps them there
+    """
+    __slots__ = ('stage', 'on_error', 'default', 'dead_letters')
+
+    def __init__(
+        self, stage: CType, on_error: str = 'skip', default: Any = None,
+        dead_letters: Optional[DeadLetters] = None,
+    ) -> None:
+        if not callable(stage):
+            raise ValueError(f"{stage!r} must be callable")
+        check_policy(on_error)
+        if dead_letters is None:
+            dead_letters = DeadLetters()
+        if type(stage) in (Map, Filter):
+            function = stage.func.args[0]
+            if function is None:
+                function = bool
+            generator = tolerant_map if type(stage) is Map else tolerant_filter
+            func = partial(generator, _unwrap(function), function, on_error, default, dead_letters)
+        else:
+            func = tolerant(_unwrap(stage), stage, on_error, default, dead_letters)
+        super().__init__(func)
+        _setattr(self, 'stage', stage)
+        _setattr(self, 'on_error', on_error)
+        _setattr(self, 'default', default)
+        _setattr(self, 'dead_letters', dead_letters)
+
+    @property
+    def __name__(self) -> str:
+        return f"on_error({self.stage!r},{self.on_error})"
+
+    def __reduce__(self):
+        return self.__class__, (self.stage, self.on_error, self.default, self.dead_letters)
+
+    def _key(self) -> Any:
+        # stages with distinct collectors are distinct
+        return self.stage, self.on_error, self.default, self.dead_letters
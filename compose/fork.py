@@ -0,0 +1,297 @@
+"""
+Single pass over an iterable feeding several consumers
+"""
+from functools import lru_cache
+from typing import Any, Callable, List, Sequence, Tuple
+
+from . import C, Compose, ComposeError, CType, Filter, Map, Pipeline, _exec, _setattr, _unwrap, is_async
+from .stream import DropWhile, FlatMap, Scan, Skip, Take, TakeWhile
+
+# sinks consuming a whole iterable: (initial state, statements adding `{x}`, result)
+# `{a}` is the state, statements raise Done once the result is known
+SINKS = {
+    sum: ("0", ("{a} += {x}",), "{a}"),
+    list: ("[]", ("{a}.append({x})",), "{a}"),
+    tuple: ("[]", ("{a}.append({x})",), "tuple({a})"),
+    set: ("set()", ("{a}.add({x})",), "{a}"),
+    frozenset: ("set()", ("{a}.add({x})",), "frozenset({a})"),
+    dict: ("{}", ("key, value = {x}", "{a}[key] = value"), "{a}"),
+    min: ("empty", ("if {a} is empty or {x} < {a}: {a} = {x}",), "{a}"),
+    max: ("empty", ("if {a} is empty or {x} > {a}: {a} = {x}",), "{a}"),
+    any: ("False", ("if {x}:", "    {a} = True", "    raise Done"), "{a}"),
+    all: ("True", ("if not {x}:", "    {a} = False", "    raise Done"), "{a}"),
+}
+
+STEPS = (Map, Filter, Take, Skip, TakeWhile, DropWhile, Scan, FlatMap)
+
+
+class Done(Exception):
+    """
+    Raised by a consumer which needs no more items
+    """
+
+
+def _func(stage: CType) -> Any:
+    return stage.func if type(stage) is C else stage
+
+
+def _stack(pipeline: Pipeline) -> Tuple[CType, ...]:
+    stack = []
+    for stage in pipeline.stack if isinstance(pipeline, Compose) else (pipeline,):
+        stack.extend(_stack(stage) if isinstance(stage, Compose) else (stage,))
+    return tuple(stack)
+
+
+def plan(pipeline: Pipeline) -> Tuple[CType, Tuple[CType, ...]]:
+    """
+    Sink stage and iterator stages of a pipeline, in the order they are applied
+    """
+    sink, *stages = _stack(pipeline)
+    try:
+        known = _func(sink) in SINKS
+    except TypeError:  # unhashable
+        known = False
+    if not known:
+        names = ', '.join(x.__name__ for x in SINKS)
+        raise ValueError(f"{sink!r} cannot be fed by Fork, expected one of {names}")
+    for stage in stages:
+        if type(stage) not in STEPS:
+            raise ValueError(f"{stage!r} cannot be fed by Fork")
+    return sink, tuple(reversed(stages))
+
+
+def _guard(lines: List[str], indent: str, statement: str, stage: str, value: str) -> None:
+    lines += [
+        f"{indent}try:",
+        f"{indent}    {statement}",
+        f"{indent}except Exception as exc:",
+        f"{indent}    raise ComposeError({stage}, {value}) from exc",
+    ]
+
+
+def _chain(i: int, kinds: Tuple[type, ...], sink: Callable, state: List[str]) -> List[str]:
+    """
+    Statements of consumer `i` for `item`, stages dropping or repeating items open nested blocks
+    """
+    lines, post, value, indent = [], [], 'item', ''
+    for j, kind in enumerate(kinds):
+        f, s, c, n = f"f{i}_{j}", f"s{i}_{j}", f"c{i}_{j}", f"n{i}_{j}"
+        if kind is Map:
+            _guard(lines, indent, f"v{i}_{j} = {f}({value})", s, value)
+            value = f"v{i}_{j}"
+        elif kind is Filter:
+            _guard(lines, indent, f"passed = {f}({value})", s, value)
+            lines.append(f"{indent}if passed:")
+            indent += '    '
+        elif kind is Take:
+            # the counter never starts at 0 here, Take(0) is done before the first item
+            state.append(f"{n} = {c}")
+            lines.append(f"{indent}{n} -= 1")
+            post[:0] = [f"{indent}if not {n}:", f"{indent}    raise Done"]
+        elif kind is Skip:
+            state.append(f"{n} = {c}")
+            lines += [f"{indent}if {n}:", f"{indent}    {n} -= 1", f"{indent}else:"]
+            indent += '    '
+        elif kind is TakeWhile:
+            _guard(lines, indent, f"passed = {f}({value})", s, value)
+            lines += [f"{indent}if not passed:", f"{indent}    raise Done"]
+        elif kind is DropWhile:
+            state.append(f"{n} = True")
+            lines.append(f"{indent}if {n}:")
+            _guard(lines, indent + '    ', f"{n} = {f}({value})", s, value)
+            lines.append(f"{indent}if not {n}:")
+            indent += '    '
+        elif kind is Scan:
+            state.append(f"{n} = {c}")
+            _guard(lines, indent, f"{n} = {f}({n}, {value})", s, value)
+            value = n
+        else:  # FlatMap
+            # the items are read with next, a failing iterator is an error of the stage
+            _guard(lines, indent, f"items{i}_{j} = iter({f}({value}))", s, value)
+            lines += [
+                f"{indent}while True:",
+                f"{indent}    try:",
+                f"{indent}        v{i}_{j} = next(items{i}_{j})",
+                f"{indent}    except StopIteration:",
+                f"{indent}        break",
+                f"{indent}    except Exception as exc:",
+                f"{indent}        raise ComposeError({s}, {value}) from exc",
+            ]
+            indent += '    '
+            value = f"v{i}_{j}"
+    initial, statements, _ = SINKS[sink]
+    state.append(f"a{i} = {initial}")
+    lines += [
+        f"{indent}try:",
+        *(f"{indent}    {x.format(a=f'a{i}', x=value)}" for x in statements),
+        f"{indent}except Done:",
+        f"{indent}    raise",
+        f"{indent}except Exception as exc:",
+        f"{indent}    raise ComposeError(sink{i}, {value}) from exc",
+    ]
+    return lines + post
+
+
+@lru_cache(maxsize=256)
+def _factory(shapes: Tuple[Tuple[Callable, Tuple[type, ...]], ...]) -> Callable:
+    """
+    Generate a loop pushing every item through all consumers, e.g. for Fork(Sum << Map(f), Set):
+
+        def factory(ComposeError, Done, empty, sinks, stages, funcs, constants):
+            sink0, sink1, = sinks
+            s0_0, = stages[0]
+            f0_0, = funcs[0]
+            c0_0, = constants[0]
+            def fork(iterable):
+                a0 = 0
+                a1 = set()
+                active0 = active1 = True
+                remaining = 2
+                for item in iterable if remaining else ():
+                    if active0:
+                        try:
+                            try:
+                                v0_0 = f0_0(item)
+                            except Exception as exc:
+                                raise ComposeError(s0_0, item) from exc
+                            try:
+                                a0 += v0_0
+                            except Done:
+                                raise
+                            except Exception as exc:
+                                raise ComposeError(sink0, v0_0) from exc
+                        except Done:
+                            active0 = False
+                            remaining -= 1
+                    if active1:
+                        ...
+                    if not remaining:
+                        break
+                return (a0, a1, )
+            return fork
+
+    Consumers raise Done when they need no more items (Take, TakeWhile, any, all),
+    the source is not read once all of them are done. `c*` are the arguments of
+    stages (Take(n), Scan(f, init)...), `n*` and `a*` are the states of stages and sinks
+    """
+    size = len(shapes)
+    lines = [
+        "def factory(ComposeError, Done, empty, sinks, stages, funcs, constants):",
+        f"    {''.join(f'sink{i}, ' for i in range(size))}= sinks",
+    ]
+    for i, (_, kinds) in enumerate(shapes):
+        if kinds:
+            for prefix, source in (('s', 'stages'), ('f', 'funcs'), ('c', 'constants')):
+                lines.append(f"    {''.join(f'{prefix}{i}_{j}, ' for j in range(len(kinds)))}= {source}[{i}]")
+    body, state = [], []
+    for i, (sink, kinds) in enumerate(shapes):
+        body += [
+            f"            if active{i}:",
+            "                try:",
+            *(f"                    {x}" for x in _chain(i, kinds, sink, state)),
+            "                except Done:",
+            f"                    active{i} = False",
+            "                    remaining -= 1",
+        ]
+    lines += [
+        "    def fork(iterable):",
+        *(f"        {x}" for x in state),
+        f"        {' = '.join(f'active{i}' for i in range(size))} = True",
+        f"        remaining = {size}",
+    ]
+    for i, (_, kinds) in enumerate(shapes):
+        for j, kind in enumerate(kinds):
+            if kind is Take:
+                # Take(0) needs no items
+                lines += [
+                    f"        if active{i} and not c{i}_{j}:",
+                    f"            active{i} = False",
+                    "            remaining -= 1",
+                ]
+    lines += [
+        "        for item in iterable if remaining else ():",
+        *body,
+        "            if not remaining:",
+        "                break",
+    ]
+    for i, (sink, _) in enumerate(shapes):
+        if sink in (min, max):
+            lines += [
+                f"        if a{i} is empty:",
+                f"            error = ValueError('{sink.__name__}() arg is an empty sequence')",
+                f"            raise ComposeError(sink{i}, ()) from error",
+            ]
+    results = (SINKS[sink][2].format(a=f"a{i}") for i, (sink, _) in enumerate(shapes))
+    lines += [f"        return ({''.join(f'{x}, ' for x in results)})", "    return fork"]
+    return _exec('\n'.join(lines), f"<fork:{size}>")['factory']
+
+
+def _step_func(stage: CType) -> Any:
+    if type(stage) in (Take, Skip):
+        return None
+    function = stage.func.args[0]
+    if function is None:  # Filter(None)
+        return bool
+    # Scan functions take two arguments, they are called as is
+    return function if type(stage) is Scan else _unwrap(function)
+
+
+def _constant(stage: CType) -> Any:
+    if type(stage) in (Take, Skip):
+        return stage.func.args[0]
+    if type(stage) is Scan:
+        return stage.func.args[1]
+    return None
+
+
+def compile_fork(pipelines: Sequence[Pipeline]) -> Callable:
+    """
+    Single function computing the results of all pipelines
+    """
+    plans = [plan(x) for x in pipelines]
+    factory = _factory(tuple((_func(sink), tuple(map(type, stages))) for sink, stages in plans))
+    stages = tuple(stages for _, stages in plans)
+    return factory(
+        ComposeError,
+        Done,
+        object(),
+        tuple(sink for sink, _ in plans),
+        stages,
+        tuple(tuple(map(_step_func, x)) for x in stages),
+        tuple(tuple(map(_constant, x)) for x in stages),
+    )
+
+
+class Fork(C):
+    """
+    Results of several pipelines over the same iterable, read once.
+
+    Each item is pushed through all pipelines before the next one is read,
+    so memory does not depend on the input length and consumers never drift
+    apart. Reading stops once every pipeline needs no more items (e.g. Take).
+    A pipeline is a sink (sum, list, tuple, set, frozenset, dict, min, max,
+    any, all) after iterator stages: Map, Filter, Take, Skip, TakeWhile,
+    DropWhile, Scan and FlatMap. They are compiled into a single loop
+    """
+    __slots__ = ('pipelines',)
+
+    def __init__(self, *pipelines: Sequence[Pipeline]) -> None:
+        if not pipelines:
+            raise TypeError(f"{self.__class__.__name__} expected at least 1 argument, got 0")
+        for pipeline in pipelines:
+            if not callable(pipeline):
+                raise ValueError(f"All passed items must be callable, got {pipeline!r} instead")
+            if is_async(pipeline):
+                raise ValueError(f"Async pipelines are not supported, got {pipeline!r}")
+        super().__init__(compile_fork(pipelines))
+        _setattr(self, 'pipelines', pipelines)
+
+    @property
+    def __name__(self) -> str:
+        return f"fork({','.join(map(repr, self.pipelines))})"
+
+    def __reduce__(self):
+        return self.__class__, self.pipelines
+
+    def _key(self) -> Any:
+        return self.pipelines
@@ -0,0 +1,193 @@
+"""
+Memory-mapped file sources yielding memoryview slices, and stages splitting and decoding records.
+
+Lines and records are slices of the mapped file: pages are read on demand and
+nothing is copied until a record is split or decoded, so memory does not grow
+with the file. Fields are returned as bytes, a short copy costs no more than
+a memoryview slice, and only the fields passed to Decode become str.
+The mapping is closed once the last view is released
+"""
+import mmap
+
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+from . import _name
+from .stream import Stream, _positive
+
+Path = Union[str, bytes, int]
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+def _mapped(path: Path) -> Optional[mmap.mmap]:
+    # a file descriptor belongs to the caller and stays open, mmap keeps its own duplicate
+    with open(path, 'rb', closefd=not isinstance(path, int)) as f:
+        try:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped
+            return None
+
+
+def _close(mapped: mmap.mmap, view: memoryview) -> None:
+    view.release()
+    try:
+        mapped.close()
+    except BufferError:
+        # views are still alive, the mapping is closed with the last one
+        pass
+
+
+def read_lines(keepends: bool, path: Path) -> Iterator[memoryview]:
+    """
+    Lines of a file, without b'\\n' or b'\\r\\n' unless `keepends`
+    """
+    mapped = _mapped(path)
+    if mapped is None:
+        return
+    view, find, size, start = memoryview(mapped), mapped.find, len(mapped), 0
+    try:
+        while start < size:
+            end = find(b'\n', start)
+            if end < 0:
+                end = size
+            stop = end + 1
+            if keepends:
+                end = min(stop, size)
+            elif end > start and view[end - 1] == 13:
+                end -= 1
+            yield view[start:end]
+            start = stop
+    finally:
+        _close(mapped, view)
+
+
+def read_records(size: int, path: Path) -> Iterator[memoryview]:
+    """
+    Consecutive records of `size` bytes of a binary file
+    """
+    mapped = _mapped(path)
+    if mapped is None:
+        return
+    view, total = memoryview(mapped), len(mapped)
+    try:
+        if total % size:
+            raise ValueError(f"{path!r} has {total} bytes, not a multiple of the record size {size}")
+        for start in range(0, total, size):
+            yield view[start:start + size]
+    finally:
+        _close(mapped, view)
+
+
+def split(sep: bytes, fields: Optional[Tuple[int, ...]], record: Buffer) -> List[bytes]:
+    # memoryview has no split: the record is copied once, the fields are slices of the copy
+    parts = bytes(record).split(sep)
+    if fields is None:
+        return parts
+    try:
+        return [parts[i] for i in fields]
+    except IndexError:
+        raise IndexError(f"Record has {len(parts)} fields, fields {fields} expected") from None
+
+
+def columns(bounds: Tuple[Tuple[int, int], ...], record: Buffer) -> List[bytes]:
+    data = bytes(record)
+    if len(data) < bounds[-1][1]:
+        raise ValueError(f"Record has {len(data)} bytes, {bounds[-1][1]} expected")
+    return [data[start:end] for start, end in bounds]
+
+
+def decode(encoding: str, errors: str, data: Buffer) -> str:
+    return str(data, encoding, errors)
+
+
+class IOStage(Stream):
+    """
+    Base class for stages `f(*args, arg)`
+    """
+    __slots__ = ()
+
+    @property
+    def __name__(self) -> str:
+        return f"{_name(self).lower()}({','.join(map(repr, self.__reduce__()[1]))})"
+
+
+class Lines(IOStage):
+    """
+    Lines of the file at the path, as memoryview slices of the mapped file
+    """
+    __slots__ = ()
+    f = staticmethod(read_lines)
+
+    def __init__(self, keepends: bool = False) -> None:
+        super().__init__(keepends)
+
+
+class Records(IOStage):
+    """
+    Records of `size` bytes of the binary file at the path, as memoryview slices
+    """
+    __slots__ = ()
+    f = staticmethod(read_records)
+
+    def __init__(self, size: int) -> None:
+        super().__init__(_positive('size', size))
+
+
+class Split(IOStage):
+    """
+    Fields of a record separated by `sep`, only the fields with indices `fields` if given
+    """
+    __slots__ = ()
+    f = staticmethod(split)
+
+    def __init__(self, sep: bytes = b',', fields: Optional[Sequence[int]] = None) -> None:
+        if not sep:
+            raise ValueError("Empty separator")
+        super().__init__(sep, None if fields is None else tuple(fields))
+
+
+class Columns(IOStage):
+    """
+    Fixed-width fields of a record
+    """
+    __slots__ = ()
+    f = staticmethod(columns)
+
+    def __init__(self, widths: Sequence[int]) -> None:
+        bounds, start = [], 0
+        for width in widths:
+            bounds.append((start, start + _positive('width', width)))
+            start += width
+        if not bounds:
+            raise ValueError("Columns expected at least 1 width")
+        super().__init__(tuple(bounds))
+
+    def __reduce__(self):
+        return self.__class__, (tuple(end - start for start, end in self.func.args[0]),)
+
+
+class Decode(IOStage):
+    """
+    str of bytes or of a memoryview
+    """
+    __slots__ = ()
+    f = staticmethod(decode)
+
+    def __init__(self, encoding: str = 'utf-8', errors: str = 'strict') -> None:
+        super().__init__(encoding, errors)
+
+
+def read_delimited(
+    path: Path, sep: bytes = b',', fields: Optional[Sequence[int]] = None, keepends: bool = False,
+) -> Iterator[List[bytes]]:
+    """
+    Fields of every line of a delimited file, e.g. CSV without quoting
+    """
+    return map(Split(sep, fields).func, read_lines(keepends, path))
+
+
+def read_fixed(path: Path, widths: Sequence[int]) -> Iterator[List[bytes]]:
+    """
+    Fields of every line of a fixed-width file
+    """
+    return map(Columns(widths).func, read_lines(False, path))
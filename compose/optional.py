@@ -0,0 +1,160 @@
+"""
+Optional pipelines: a missing key or attribute, or a None value, gives a default instead of an error
+"""
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Callable, List, Tuple
+
+from . import AG, C, Compose, ComposeError, CType, IG, Pipeline, _exec, _setattr, _unwrap
+from .path import PG, WILDCARD, _missing, _parse, is_index
+
+# kinds of steps: 'item', 'index' and 'attr' get the constant of the step, 'call' calls it
+Step = Tuple[str, Any, CType]
+
+
+def lookup(obj: Any, key: Any) -> Any:
+    """
+    obj[key], or None if there is no such key. Mappings are read with `get`
+    """
+    if isinstance(obj, Mapping):
+        return obj.get(key)
+    if obj.__class__ in (list, tuple):
+        return obj[key] if key.__class__ is int and -len(obj) <= key < len(obj) else None
+    try:
+        return obj[key]
+    except (LookupError, TypeError):
+        return None
+
+
+def lookup_index(obj: Any, segment: str) -> Any:
+    """
+    Index segment of a path: the str key of a mapping if it has one, the int index otherwise
+    """
+    if isinstance(obj, Mapping) and segment in obj:
+        return obj[segment]
+    return lookup(obj, int(segment))
+
+
+def _segment(segment: str, stage: CType) -> Step:
+    if segment.startswith('@'):
+        return 'attr', segment[1:], stage
+    return 'index' if is_index(segment) else 'item', segment, stage
+
+
+def _steps(stage: Pipeline) -> List[Step]:
+    """
+    Steps of a stage in the order they are applied, getters are split into lookups
+    """
+    if isinstance(stage, Compose):
+        return [step for x in reversed(stage.stack) for step in _steps(x)]
+    if type(stage) is IG and len(stage.args) == 1:
+        return [('item', stage.args[0], stage)]
+    if type(stage) is AG and len(stage.args) == 1:
+        return [('attr', x, stage) for x in stage.args[0].split('.')]
+    if type(stage) is PG and stage.default is _missing:
+        segments = _parse(stage.args[0])
+        if WILDCARD not in segments:
+            return [_segment(x, stage) for x in segments]
+    return [('call', _unwrap(stage), stage)]
+
+
+@lru_cache(maxsize=256)
+def _factory(kinds: Tuple[str, ...]) -> Callable:
+    """
+    Generate an optional composition, e.g. for Int << IG('item.id'):
+
+        def factory(ComposeError, lookup, default, stages, f0, f1, f2):
+            s0, s1, s2, = stages
+            def optional(arg):
+                if arg is None:
+                    return default
+                try:
+                    _0 = arg.get(f0) if arg.__class__ is dict else lookup(arg, f0)
+                    if _0 is None:
+                        return default
+                    _1 = _0.get(f1) if _0.__class__ is dict else lookup(_0, f1)
+                    if _1 is None:
+                        return default
+                    _2 = f2(_1)
+                    if _2 is None:
+                        return default
+                except Exception as exc:
+                    bound = locals()
+                    if '_0' not in bound:
+                        raise ComposeError(s0, arg) from exc
+                    ...
+                return _2
+            return optional
+
+    `f*` are the keys, attribute names or functions of the steps in the order they are applied.
+    Missing keys and attributes are None, nothing is raised on the way to the default;
+    other errors are reported as ComposeError, as in Compose
+    """
+    size = len(kinds)
+    lines = [
+        f"def factory(ComposeError, lookup, default, stages, {', '.join(f'f{i}' for i in range(size))}):",
+        f"    {''.join(f's{i}, ' for i in range(size))}= stages",
+        "    def optional(arg):",
+        "        if arg is None:",
+        "            return default",
+        "        try:",
+    ]
+    handler = ["        except Exception as exc:", "            bound = locals()"]
+    value = 'arg'
+    for i, kind in enumerate(kinds):
+        if kind == 'item':
+            get = f"{value}.get(f{i}) if {value}.__class__ is dict else lookup({value}, f{i})"
+            lines.append(f"            _{i} = {get}")
+        elif kind == 'index':
+            lines.append(f"            _{i} = lookup_index({value}, f{i})")
+        elif kind == 'attr':
+            lines.append(f"            _{i} = getattr({value}, f{i}, None)")
+        else:
+            lines.append(f"            _{i} = f{i}({value})")
+        lines += [f"            if _{i} is None:", "                return default"]
+        if i < size - 1:
+            handler += [
+                f"            if '_{i}' not in bound:",
+                f"                raise ComposeError(s{i}, {value}) from exc",
+            ]
+        else:
+            handler.append(f"            raise ComposeError(s{i}, {value}) from exc")
+        value = f"_{i}"
+    lines += [*handler, f"        return {value}", "    return optional"]
+    return _exec('\n'.join(lines), f"<optional:{','.join(kinds)}>", {'lookup_index': lookup_index})['factory']
+
+
+class Opt(C):
+    """
+    Optional pipeline: Opt(Int << IG('item.id'))({'item': {}}) is None.
+
+    A missing key or attribute and a None argument or intermediate result
+    stop the pipeline, which returns `default`. Getters (IG, AG, PG without
+    wildcards) use non-raising lookups, `dict.get` for dicts, so records
+    without a field cost less than those with it. Other errors are raised
+    as ComposeError
+    """
+    __slots__ = ('pipeline', 'default')
+
+    def __init__(self, pipeline: Pipeline, default: Any = None) -> None:
+        if not callable(pipeline):
+            raise ValueError(f"{pipeline!r} must be callable")
+        steps = _steps(pipeline)
+        factory = _factory(tuple(kind for kind, _, _ in steps))
+        super().__init__(factory(
+            ComposeError, lookup, default, tuple(stage for _, _, stage in steps), *(x for _, x, _ in steps),
+        ))
+        _setattr(self, 'pipeline', pipeline)
+        _setattr(self, 'default', default)
+
+    @property
+    def __name__(self) -> str:
+        if self.default is None:
+            return f"opt({self.pipeline!r})"
+        return f"opt({self.pipeline!r},{self.default!r})"
+
+    def __reduce__(self):
+        return self.__class__, (self.pipeline, self.default)
+
+    def _key(self) -> Any:
+        return self.pipeline, self.default
@@ -0,0 +1,117 @@
+"""
+Ordering stages: top k items, sorting and merging of sorted streams, each key is computed once per item
+"""
+from heapq import merge, nlargest, nsmallest
+from typing import Any, Iterable, Iterator, List, Optional, Sequence
+
+from . import CType, Pipeline, _unwrap
+from .stream import Stream, _callable, _positive
+
+
+def _key(key: Optional[CType]) -> Optional[CType]:
+    return None if key is None else _unwrap(key)
+
+
+def top_k(k: int, key: Optional[CType], iterable: Iterable) -> list:
+    # a heap of the k largest (key, index, item) entries, O(n log k) and O(k) memory
+    return nlargest(k, iterable, key=_key(key))
+
+
+def bottom_k(k: int, key: Optional[CType], iterable: Iterable) -> list:
+    return nsmallest(k, iterable, key=_key(key))
+
+
+def sort_by(key: Optional[CType], reverse: bool, iterable: Iterable) -> list:
+    # sorted decorates every item with its key once and sorts the keys, stable
+    return sorted(iterable, key=_key(key), reverse=reverse)
+
+
+def merge_sorted(
+    streams: Sequence[Pipeline], key: Optional[CType], reverse: bool, arg: Any,
+) -> Iterator:
+    iterables = [stream(arg) for stream in streams] if streams else arg
+    return merge(*iterables, key=_key(key), reverse=reverse)
+
+
+class Ordering(Stream):
+    """
+    Base class for ordering stages, `key` is optional
+    """
+    __slots__ = ()
+
+    @property
+    def __name__(self) -> str:
+        args = (
+            getattr(x, '__name__', None) or repr(x)
+            for x in self.func.args if x is not None and x is not False
+        )
+        return f"{self.f.__name__}({','.join(args)})"
+
+
+class TopK(Ordering):
+    """
+    `k` largest items by `key`, largest first: sorted(items, key=key, reverse=True)[:k]
+    in O(n log k) time and O(k) memory
+    """
+    __slots__ = ()
+    f = staticmethod(top_k)
+
+    def __init__(self, k: int, key: Optional[CType] = None) -> None:
+        super().__init__(_positive('k', k, 0), _callable('key', key))
+
+
+class BottomK(Ordering):
+    """
+    `k` smallest items by `key`, smallest first: sorted(items, key=key)[:k]
+    """
+    __slots__ = ()
+    f = staticmethod(bottom_k)
+
+    def __init__(self, k: int, key: Optional[CType] = None) -> None:
+        super().__init__(_positive('k', k, 0), _callable('key', key))
+
+
+class SortBy(Ordering):
+    """
+    List of the items sorted by `key`, stable
+    """
+    __slots__ = ()
+    f = staticmethod(sort_by)
+
+    def __init__(self, key: Optional[CType] = None, reverse: bool = False) -> None:
+        super().__init__(_callable('key', key), reverse)
+
+
+class MergeSorted(Ordering):
+    """
+    Lazy merge of sorted iterables by `key`: the results of `streams` for the argument,
+    or the iterables of the argument itself without streams
+    """
+    __slots__ = ()
+    f = staticmethod(merge_sorted)
+
+    def __init__(
+        self, *streams: Sequence[Pipeline], key: Optional[CType] = None, reverse: bool = False,
+    ) -> None:
+        for stream in streams:
+            if not callable(stream):
+                raise ValueError(f"All passed items must be callable, got {stream!r} instead")
+        super().__init__(streams, _callable('key', key), reverse)
+
+    @property
+    def __name__(self) -> str:
+        streams, key, reverse = self.func.args
+        args = [*map(repr, streams)]
+        if key is not None:
+            args.append(f"key={key!r}")
+        if reverse:
+            args.append('reverse')
+        return f"merge_sorted({','.join(args)})"
+
+    def __reduce__(self):
+        streams, key, reverse = self.func.args
+        return _restore, (self.__class__, streams, key, reverse)
+
+
+def _restore(cls: type, streams: List[Pipeline], key: Optional[CType], reverse: bool) -> MergeSorted:
+    return cls(*streams, key=key, reverse=reverse)
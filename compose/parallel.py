@@ -0,0 +1,208 @@
+"""
+Process pool stages
+"""
+import os
+import sys
+import weakref
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from . import C, CArg, ComposeError, CType
+
+try:
+    from multiprocessing import resource_tracker
+    from multiprocessing.shared_memory import SharedMemory
+except ImportError:  # python 3.7
+    SharedMemory = None
+
+
+# chunks smaller than this are pickled as usual
+SHARED_THRESHOLD = 1 << 16
+
+# function of the ParallelMap served by the current worker process
+_worker_func = None
+
+
+class SharedChunk(NamedTuple):
+    """
+    Chunk of buffers stored in a shared memory block
+    """
+    name: str
+    # (start, stop, dtype, shape); dtype is None for bytes
+    layout: List[Tuple[int, int, Optional[str], Tuple[int, ...]]]
+
+
+def _init_worker(func: CType) -> None:
+    global _worker_func
+    _worker_func = func
+
+
+def _load(chunk: SharedChunk) -> list:
+    shm = SharedMemory(chunk.name)
+    try:
+        buf, items = shm.buf, []
+        for start, stop, dtype, shape in chunk.layout:
+            if dtype is None:
+                items.append(bytes(buf[start:stop]))
+            else:
+                numpy = __import__('numpy')
+                items.append(numpy.frombuffer(buf[start:stop], dtype=dtype).reshape(shape).copy())
+        del buf
+        return items
+    finally:
+        shm.close()
+
+
+def _run_chunk(index: int, chunk: Any) -> Tuple[int, list, Optional[Tuple[CArg, Exception]]]:
+    """
+    Results of the items up to the first failure, the failed item and its exception
+    """
+    items = _load(chunk) if isinstance(chunk, SharedChunk) else chunk
+    results = []
+    append = results.append
+    for item in items:
+        try:
+            append(_worker_func(item))
+        except Exception as exc:
+            # the executor would replace the cause of an error raised here with the remote traceback
+            return index, results, (item, exc)
+    return index, results, None
+
+
+def _dump(items: list) -> Optional[Any]:
+    """
+    Shared memory block with all `items` if they are bytes or numeric arrays
+    """
+    numpy = sys.modules.get('numpy')
+    layout, size = [], 0
+    for item in items:
+        if isinstance(item, (bytes, bytearray)):
+            dtype, shape, nbytes = None, (), len(item)
+        elif numpy is not None and isinstance(item, numpy.ndarray) and item.dtype.kind in 'biufc':
+            dtype, shape, nbytes = item.dtype.str, item.shape, item.nbytes
+        else:
+            return None
+        layout.append((size, size + nbytes, dtype, shape))
+        size += nbytes
+    if size < SHARED_THRESHOLD:
+        return None
+
+    shm = SharedMemory(create=True, size=size)
+    try:
+        buf = shm.buf
+        for item, (start, stop, dtype, _) in zip(items, layout):
+            buf[start:stop] = item if dtype is None else numpy.ascontiguousarray(item).view('u1').reshape(-1)
+        del buf
+    except BaseException:
+        _release(shm)
+        raise
+    return shm, SharedChunk(shm.name, layout)
+
+
+def _release(shm: Optional[Any]) -> None:
+    if shm is not None:
+        shm.close()
+        shm.unlink()
+
+
+class ParallelMap(C):
+    """
+    map() over a process pool.
+
+    Items are sent to workers in chunks of `chunksize`, chunks of bytes or numpy
+    arrays are passed through shared memory. At most two chunks per worker are
+    in flight, so the input is consumed lazily. The pool is started on the first
+    call and kept until `close()`.
+    """
+    __slots__ = ('workers', 'chunksize', 'ordered', 'shared', '_executor')
+
+    def __init__(
+        self,
+        func: CType,
+        workers: Optional[int] = None,
+        chunksize: int = 64,
+        ordered: bool = True,
+        shared: bool = True,
+    ) -> None:
+        super().__init__(func)
+        if chunksize < 1:
+            raise ValueError(f"chunksize must be positive, got {chunksize!r}")
+        self._set(
+            workers=workers or os.cpu_count() or 1,
+            chunksize=chunksize,
+            ordered=ordered,
+            shared=shared and SharedMemory is not None,
+            _executor=None,
+        )
+
+    @property
+    def __name__(self) -> str:
+        return f"parallel_map({self.func.__name__})"
+
+    def __reduce__(self):
+        return self.__class__, (self.func, self.workers, self.chunksize, self.ordered, self.shared)
+
+    def _key(self) -> Any:
+        return self.__reduce__()[1]
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            if self.shared:
+                # workers must share the tracker of the blocks created here
+                resource_tracker.ensure_running()
+            executor = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.func,))
+            weakref.finalize(self, executor.shutdown)
+            self._set(_executor=executor)
+        return self._executor
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._set(_executor=None)
+
+    def _chunks(self, iterable: Iterable[CArg]) -> Iterator[Tuple[Optional[Any], Any]]:
+        iterator = iter(iterable)
+        while True:
+            items = list(islice(iterator, self.chunksize))
+            if not items:
+                return
+            shared = self.shared and _dump(items)
+            yield shared or (None, items)
+
+    def _imap(self, iterable: Iterable[CArg]) -> Iterator[Any]:
+        executor, limit = self.executor, 2 * self.workers
+        pending, blocks = deque(), {}
+        chunks = enumerate(self._chunks(iterable))
+        try:
+            while True:
+                for index, (shm, chunk) in islice(chunks, limit - len(pending)):
+                    blocks[index] = shm
+                    pending.append(executor.submit(_run_chunk, index, chunk))
+                if not pending:
+                    return
+                if self.ordered:
+                    done = [pending.popleft()]
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.remove(future)
+                for future in done:
+                    index, results, failure = future.result()
+                    _release(blocks.pop(index))
+                    yield from results
+                    if failure is not None:
+                        item, exc = failure
+                        raise ComposeError(self.func, item) from exc
+        finally:
+            for future in pending:
+                future.cancel()
+            wait(pending)
+            for shm in blocks.values():
+                _release(shm)
+
+    def __call__(self, iterable: Iterable[CArg]) -> Iterator[Any]:
+        return self._imap(iterable)
@@ -0,0 +1,184 @@
+"""
+Compiled getters for dotted paths with mixed item and attribute access
+"""
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Callable, Iterator, Optional, Tuple
+
+from . import BaseGetter, C, CType, _exec, _setattr
+
+# segments: 'key', '0' or '-1' for an index, '@name' for an attribute, '*' for all items or values.
+# Indices of mappings are str keys when they have one: PG('years.2020') gets x['years']['2020']
+WILDCARD = '*'
+
+# errors meaning "no such segment", they are replaced with the default
+MISSING = (LookupError, TypeError, AttributeError)
+
+_missing = object()
+
+
+class PathError(LookupError):
+
+    def __init__(self, path: str, index: int, obj: Any) -> None:
+        self.path = path
+        self.index = index
+        self.obj = obj
+
+    @property
+    def segment(self) -> str:
+        return self.path.split('.')[self.index]
+
+    def __str__(self) -> str:
+        return f"{self.path!r}: cannot get {self.segment!r} from {self.obj.__class__.__name__}"
+
+    def __reduce__(self):
+        return self.__class__, (self.path, self.index, self.obj), {'__cause__': self.__cause__}
+
+
+def _fan(obj: Any) -> Iterator:
+    values = getattr(obj, 'values', None)
+    return iter(obj if values is None else values())
+
+
+def _parse(path: str) -> Tuple[str, ...]:
+    segments = tuple(path.split('.'))
+    for segment in segments:
+        if not segment or segment == '@':
+            raise ValueError(f"Empty segment in path {path!r}")
+    return segments
+
+
+def is_index(segment: str) -> bool:
+    return (segment[1:] if segment[0] == '-' else segment).isdigit()
+
+
+def get_index(obj: Any, segment: str) -> Any:
+    """
+    obj[segment] for mappings with such a key, obj[int(segment)] otherwise
+    """
+    if isinstance(obj, Mapping) and segment in obj:
+        return obj[segment]
+    return obj[int(segment)]
+
+
+def _access(segment: str, value: str) -> str:
+    if segment == WILDCARD:
+        return f"fan({value})"
+    if segment.startswith('@'):
+        name = segment[1:]
+        return f"{value}.{name}" if name.isidentifier() else f"getattr({value}, {name!r})"
+    if is_index(segment):
+        # lists and tuples first, mappings may have the segment as a str key
+        fallback = f"get_index({value}, {segment!r})"
+        return f"{value}[{int(segment)}] if {value}.__class__ in SEQUENCES else {fallback}"
+    return f"{value}[{segment!r}]"
+
+
+@lru_cache(maxsize=1024)
+def _factory(segments: Tuple[Any, ...], start: int, nested: bool, defaults: bool) -> Callable:
+    """
+    Generate a getter factory for `segments` up to the first wildcard, e.g. for 'a.0.@b':
+
+        def factory(fail, fan, rest, default):
+            def get(arg):
+                try:
+                    _0 = arg['a']
+                    _1 = _0[0] if _0.__class__ in SEQUENCES else get_index(_0, '0')
+                    _2 = _1.b
+                except MISSING as exc:
+                    bound = locals()
+                    if '_0' not in bound:
+                        raise fail(0, arg) from exc
+                    if '_1' not in bound:
+                        raise fail(1, _0) from exc
+                    raise fail(2, _1) from exc
+                return _2
+            return get
+
+    With a wildcard, the last access is `fan(...)` and the result is `list(_n)`,
+    or `[rest(x) for x in _n]` if the path continues after it.
+    Names are numbered by the segment position in the whole path, so the error reports it.
+    """
+    lines = ["def factory(fail, fan, rest, default):", "    def get(arg):", "        try:"]
+    handler = ["        except MISSING as exc:"]
+    if defaults:
+        handler.append("            return default")
+    else:
+        handler.append("            bound = locals()")
+    value = 'arg'
+    for i, segment in enumerate(segments, start):
+        lines.append(f"            _{i} = {_access(segment, value)}")
+        if not defaults:
+            if i < start + len(segments) - 1:
+                handler += [
+                    f"            if '_{i}' not in bound:",
+                    f"                raise fail({i}, {value}) from exc",
+                ]
+            else:
+                handler.append(f"            raise fail({i}, {value}) from exc")
+        value = f"_{i}"
+    if nested:
+        result = f"[rest(x) for x in {value}]"
+    else:
+        result = f"list({value})" if segments[-1] == WILDCARD else value
+    lines += [*handler, f"        return {result}", "    return get"]
+    namespace = _exec(
+        '\n'.join(lines),
+        f"<path:{'.'.join(segments)}>",
+        {'MISSING': MISSING, 'SEQUENCES': (list, tuple), 'get_index': get_index},
+    )
+    return namespace['factory']
+
+
+def compile_path(path: str, default: Any = _missing) -> CType:
+    """
+    Single function getting `path` from its argument
+    """
+    segments = _parse(path)
+
+    def fail(index: int, obj: Any) -> PathError:
+        return PathError(path, index, obj)
+
+    def build(start: int) -> Optional[CType]:
+        if start == len(segments):
+            return None
+        try:
+            stop = segments.index(WILDCARD, start) + 1
+        except ValueError:
+            stop = len(segments)
+        rest = build(stop)
+        factory = _factory(segments[start:stop], start, rest is not None, default is not _missing)
+        return factory(fail, _fan, rest, default)
+
+    return build(0)
+
+
+class PG(BaseGetter):
+    """
+    Path getter, compiled once into a single function:
+
+        PG('items.0.@name') == lambda x: x['items'][0].name
+        PG('items.*.id') == lambda x: [y['id'] for y in x['items']]
+
+    With `default`, it is returned instead of raising when a segment is missing.
+    Otherwise PathError reports the failing segment
+    """
+    __slots__ = ('default',)
+    getter = staticmethod(compile_path)
+
+    def __init__(self, path: str, default: Any = _missing) -> None:
+        C.__init__(self, self.getter(path, default))
+        _setattr(self, 'args', (path,))
+        _setattr(self, 'default', default)
+
+    def __reduce__(self):
+        return self.__class__, self._key() if self.default is not _missing else self.args
+
+    def _key(self) -> Any:
+        return self.args[0], self.default
+
+    @property
+    def __name__(self) -> str:
+        if self.default is _missing:
+            return f"PG({self.args[0]})"
+        return f"PG({self.args[0]},default={self.default!r})"
@@ -0,0 +1,247 @@
+"""
+Predicate combinators with optional adaptive ordering
+"""
+from functools import partial
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from . import C, CArg, CType, _setattr, _unwrap
+
+
+def _label(predicate: CType) -> str:
+    name = getattr(predicate, '__name__', None) or repr(predicate)
+    return f"({name})" if isinstance(predicate, (And, Or)) else name
+
+
+def conjunction(predicates: Sequence[CType]) -> CType:
+    """
+    Predicate which is true if all `predicates` are true, evaluated in the given order
+    """
+
+    funcs = tuple(map(_unwrap, predicates))
+
+    def conjunction(arg: CArg) -> bool:
+        for predicate in funcs:
+            if not predicate(arg):
+                return False
+        return True
+
+    conjunction.__name__ = '&'.join(map(_label, predicates))
+    return conjunction
+
+
+def disjunction(predicates: Sequence[CType]) -> CType:
+    """
+    Predicate which is true if any of `predicates` is true, evaluated in the given order
+    """
+
+    funcs = tuple(map(_unwrap, predicates))
+
+    def disjunction(arg: CArg) -> bool:
+        for predicate in funcs:
+            if predicate(arg):
+                return True
+        return False
+
+    disjunction.__name__ = '|'.join(map(_label, predicates))
+    return disjunction
+
+
+class Adaptive:
+    """
+    Combination which measures its predicates on the first `sample` arguments
+    and then evaluates them in the order with the lowest expected cost.
+
+    While sampling, every predicate is evaluated; errors of predicates after the
+    one deciding the result are not raised and count as non-decisive results
+    """
+    __slots__ = (
+        'predicates', 'combine', 'stop', 'sample', 'remaining', 'order', 'func', 'calls', 'passed', 'times',
+    )
+
+    def __init__(self, predicates: Tuple[CType, ...], combine: Callable, stop: bool, sample: int) -> None:
+        self.predicates = predicates
+        self.combine = combine
+        # result that stops the evaluation: False for And, True for Or
+        self.stop = stop
+        self.sample = sample
+        self.reset()
+
+    def reset(self) -> None:
+        size = len(self.predicates)
+        self.remaining = self.sample
+        self.order = tuple(range(size))
+        self.func = self.combine(self.predicates)
+        self.calls, self.passed, self.times = [0] * size, [0] * size, [0.0] * size
+
+    def _measure(self, arg: CArg) -> bool:
+        stop, result = self.stop, None
+        for index in self.order:
+            start = perf_counter()
+            try:
+                value = bool(self.predicates[index](arg))
+            except Exception:
+                if result is None:
+                    raise
+                value = not stop
+            finally:
+                self.times[index] += perf_counter() - start
+                self.calls[index] += 1
+            self.passed[index] += value
+            if value is stop and result is None:
+                result = stop
+        self.remaining -= 1
+        if not self.remaining:
+            self.learn()
+        return (not stop) if result is None else stop
+
+    def learn(self) -> None:
+        """
+        Order predicates by mean time per decisive result, cheapest first
+        """
+        def rank(index: int) -> float:
+            calls = self.calls[index]
+            if not calls:
+                return float('inf')
+            decisive = self.passed[index] if self.stop else calls - self.passed[index]
+            return self.times[index] / max(decisive, 1e-9)
+
+        self.order = tuple(sorted(range(len(self.predicates)), key=rank))
+        self.remaining = 0
+        self.func = self.combine([self.predicates[i] for i in self.order])
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                'predicate': _label(self.predicates[i]),
+                'calls': self.calls[i],
+                'passed': self.passed[i],
+                'time': self.times[i],
+                'cost': self.times[i] / self.calls[i] if self.calls[i] else 0.0,
+            }
+            for i in self.order
+        ]
+
+    def __call__(self, arg: CArg) -> bool:
+        if self.remaining:
+            return self._measure(arg)
+        return self.func(arg)
+
+
+class Combination(C):
+    """
+    Base class for And and Or
+    """
+    __slots__ = ('predicates', 'adaptive', 'sample')
+    combine = None
+    stop = None
+
+    def __init__(self, *predicates: Sequence[CType], adaptive: bool = False, sample: int = 1000) -> None:
+        if not predicates:
+            raise TypeError(f"{self.__class__.__name__} expected at least 1 argument, got 0")
+        if sample < 1:
+            raise ValueError(f"sample must be positive, got {sample!r}")
+        flat = []
+        for predicate in predicates:
+            if not callable(predicate):
+                raise ValueError(f"All passed items must be callable, got {predicate!r} instead")
+            if type(predicate) is self.__class__ and not predicate.adaptive:
+                flat.extend(predicate.predicates)
+            else:
+                flat.append(predicate)
+        predicates = tuple(flat)
+        if adaptive:
+            func = Adaptive(predicates, self.combine, self.stop, sample)
+        else:
+            func = self.combine(predicates)
+        super().__init__(func)
+        _setattr(self, 'predicates', predicates)
+        _setattr(self, 'adaptive', adaptive)
+        _setattr(self, 'sample', sample)
+
+    @property
+    def __name__(self) -> str:
+        return ('&' if self.stop is False else '|').join(map(_label, self.predicates))
+
+    def __reduce__(self):
+        return partial(self.__class__, adaptive=self.adaptive, sample=self.sample), self.predicates
+
+    def _key(self) -> Any:
+        return self.predicates, self.adaptive, self.sample
+
+    @property
+    def order(self) -> Tuple[CType, ...]:
+        """
+        Predicates in the order they are evaluated
+        """
+        if self.adaptive:
+            return tuple(self.predicates[i] for i in self.func.order)
+        return self.predicates
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """
+        Calls, passed arguments and time of every predicate measured while sampling, in the evaluation order
+        """
+        return self.func.stats() if self.adaptive else []
+
+    def learn(self) -> None:
+        """
+        Reorder predicates now using the arguments sampled so far
+        """
+        if self.adaptive:
+            self.func.learn()
+
+    def reset(self) -> None:
+        """
+        Forget the measurements and sample again
+        """
+        if self.adaptive:
+            self.func.reset()
+
+
+class And(Combination):
+    """
+    True if all predicates are true; stops at the first false one
+    """
+    __slots__ = ()
+    combine = staticmethod(conjunction)
+    stop = False
+
+
+class Or(Combination):
+    """
+    True if any predicate is true; stops at the first true one
+    """
+    __slots__ = ()
+    combine = staticmethod(disjunction)
+    stop = True
+
+
+def negation(predicate: CType) -> CType:
+
+    func = _unwrap(predicate)
+
+    def negation(arg: CArg) -> bool:
+        return not func(arg)
+
+    negation.__name__ = f"~{_label(predicate)}"
+    return negation
+
+
+class Not(C):
+    """
+    True if the predicate is false
+    """
+    __slots__ = ('predicate',)
+
+    def __init__(self, predicate: CType) -> None:
+        if not callable(predicate):
+            raise ValueError(f"{predicate!r} must be callable")
+        super().__init__(negation(predicate))
+        _setattr(self, 'predicate', predicate)
+
+    def __reduce__(self):
+        return self.__class__, (self.predicate,)
+
+    def _key(self) -> Any:
+        return self.predicate
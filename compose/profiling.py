@@ -0,0 +1,192 @@
+"""
+Per-stage profiling of compositions
+"""
+from array import array
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any, Dict, Iterator
+
+from . import C, CArg, ComposeT, CType, is_async
+
+# innermost running profiled call of the thread or task: [time of nested calls, parent frame, token].
+# Every task has its own context, concurrent awaits are not nested in each other
+_frame = ContextVar('compose_profile_frame', default=None)
+
+
+def _start() -> list:
+    frame = [0.0, _frame.get()]
+    frame.append(_frame.set(frame))
+    return frame
+
+
+def _stop(frame: list, start: float) -> float:
+    """
+    Exclusive time of the call started with `frame`
+    """
+    elapsed = perf_counter() - start
+    nested, parent, token = frame
+    _frame.reset(token)
+    if parent is not None:
+        parent[0] += elapsed
+    return elapsed - nested
+
+
+class StageStats:
+    """
+    Timings of a single stage, in seconds.
+    Time spent in nested profiled stages and iterators is excluded
+    """
+
+    def __init__(self) -> None:
+        self.errors = 0
+        self.times = array('d')
+        self.items = 0
+        self.iter_time = 0.0
+
+    @property
+    def calls(self) -> int:
+        return len(self.times)
+
+    @property
+    def total(self) -> float:
+        return sum(self.times)
+
+    def percentile(self, q: float) -> float:
+        if not self.times:
+            return 0.0
+        times = sorted(self.times)
+        return times[min(len(times) - 1, int(q * len(times)))]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'total': self.total,
+            'p50': self.percentile(0.5),
+            'p99': self.percentile(0.99),
+            'items': self.items,
+            'iter_time': self.iter_time,
+        }
+
+
+class Profile:
+    """
+    Stage timings keyed by the stage repr
+    """
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, StageStats] = {}
+
+    def probe(self, stage: CType) -> CType:
+        stats = self.stages.setdefault(repr(stage), StageStats())
+        probe = Probe(stage, self, stats)
+        return AsyncProbe(stage, self, stats) if is_async(stage) and not probe.is_stream else probe
+
+    def attach(self, composition: ComposeT) -> ComposeT:
+        """
+        Copy of the composition with its stages replaced with probes.
+        Compositions are immutable and may be shared (see intern), they are never changed in place
+        """
+        return type(composition)(*map(self.probe, composition.stack))
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {name: stats.as_dict() for name, stats in self.stages.items()}
+
+    def table(self) -> str:
+        header = ('stage', 'calls', 'errors', 'total', 'p50', 'p99', 'items', 'iter_time')
+        rows = [header]
+        for name, stats in self.as_dict().items():
+            rows.append((
+                name,
+                str(stats['calls']),
+                str(stats['errors']),
+                *(f"{stats[x] * 1e6:.1f}us" for x in ('total', 'p50', 'p99')),
+                str(stats['items']),
+                f"{stats['iter_time'] * 1e6:.1f}us",
+            ))
+        widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+        return '\n'.join(
+            '  '.join(x.ljust(w) if i == 0 else x.rjust(w) for i, (x, w) in enumerate(zip(row, widths)))
+            for row in rows
+        )
+
+    def __str__(self) -> str:
+        return self.table()
+
+
+class Probe(C):
+    """
+    Stage wrapper recording its timings into a Profile
+    """
+    __slots__ = ('profile', 'stats')
+
+    def __init__(self, func: CType, profile: Profile, stats: StageStats) -> None:
+        super().__init__(func)
+        self._set(profile=profile, stats=stats)
+
+    @property
+    def __name__(self) -> str:
+        return repr(self.func)
+
+    @property
+    def is_stream(self) -> bool:
+        return getattr(self.func, 'is_stream', False) is True
+
+    def __call__(self, arg: CArg) -> Any:
+        stats = self.stats
+        frame, start = _start(), perf_counter()
+        try:
+            result = self.func(arg)
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.times.append(_stop(frame, start))
+        if hasattr(type(result), '__next__'):
+            return ProbeIterator(result, stats)
+        return result
+
+
+class AsyncProbe(Probe):
+    __slots__ = ()
+    is_async = True
+
+    async def __call__(self, arg: CArg) -> Any:
+        stats = self.stats
+        frame, start = _start(), perf_counter()
+        try:
+            return await self.func(arg)
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.times.append(_stop(frame, start))
+
+
+class ProbeIterator:
+    """
+    Iterator recording the time spent producing each item
+    """
+    __slots__ = ('iterator', 'stats')
+
+    def __init__(self, iterator: Iterator, stats: StageStats) -> None:
+        self.iterator = iterator
+        self.stats = stats
+
+    def __iter__(self) -> Iterator:
+        return self
+
+    def __next__(self) -> Any:
+        stats = self.stats
+        frame, start = _start(), perf_counter()
+        try:
+            item = next(self.iterator)
+        except StopIteration:
+            raise
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.iter_time += _stop(frame, start)
+        stats.items += 1
+        return item
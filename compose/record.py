@@ -0,0 +1,189 @@
+"""
+Projection of several fields in one pass over shared pipeline prefixes
+"""
+from functools import lru_cache
+from itertools import tee
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from . import C, Compose, ComposeError, Pipeline, _exec, _setattr, _unwrap, is_async
+
+
+class _Node:
+    """
+    Trie node: the stage applied to the parent value and the fields ending here
+    """
+    __slots__ = ('stage', 'children', 'fields')
+
+    def __init__(self, stage: Optional[Pipeline]) -> None:
+        self.stage = stage
+        self.children: Dict[Any, _Node] = {}
+        self.fields: List[int] = []
+
+    def child(self, stage: Pipeline) -> '_Node':
+        try:
+            hash(stage)
+        except TypeError:
+            # unhashable stages are shared only with themselves
+            key = id(stage)
+        else:
+            key = stage
+        node = self.children.get(key)
+        if node is None:
+            node = self.children[key] = _Node(stage)
+        return node
+
+
+def _trie(pipelines: Tuple[Pipeline, ...]) -> _Node:
+    root = _Node(None)
+    for index, pipeline in enumerate(pipelines):
+        node = root
+        # stack[-1] is applied first
+        for stage in reversed(pipeline.stack if isinstance(pipeline, Compose) else (pipeline,)):
+            node = node.child(stage)
+        node.fields.append(index)
+    return root
+
+
+@lru_cache(maxsize=256)
+def _factory(parents: Tuple[int, ...], leaves: Tuple[int, ...], kind: str) -> Callable:
+    """
+    Generate a record factory for a trie flattened in depth-first order, e.g.
+    for {'id': Int << IG('item.id'), 'name': IG('item.name')}:
+
+        def factory(ComposeError, funcs, stages, keys, output):
+            f0, f1, f2, f3, = funcs
+            s0, s1, s2, s3, = stages
+            k0, k1, = keys
+            def record(arg):
+                try:
+                    _0 = f0(arg)
+                    if hasattr(_0.__class__, '__next__'):
+                        _0_0, _0_1, = tee(_0, 2)
+                    else:
+                        _0_0 = _0_1 = _0
+                    _1 = f1(_0_0)
+                    _2 = f2(_1)
+                    _3 = f3(_0_1)
+                except Exception as exc:
+                    bound = locals()
+                    if '_0' not in bound:
+                        raise ComposeError(s0, arg) from exc
+                    ...
+                    raise ComposeError(s3, _0_1) from exc
+                return {k0: _2, k1: _3}
+            return record
+
+    `parents[i]` is the node whose value is the argument of node `i`, -1 for the record argument.
+    `leaves[j]` is the node holding the value of field `j`.
+    A value used more than once is copied with tee if it is an iterator, e.g. the result of Map,
+    so that every use gets all of its items
+    """
+    size = len(parents)
+    # index -1 is the record argument
+    uses, taken = [0] * (size + 1), [0] * (size + 1)
+    for i in (*parents, *leaves):
+        uses[i] += 1
+
+    def name(i: int) -> str:
+        return 'arg' if i < 0 else f"_{i}"
+
+    def use(i: int) -> str:
+        if uses[i] < 2:
+            return name(i)
+        taken[i] += 1
+        return f"{name(i)}_{taken[i] - 1}"
+
+    def copy(i: int) -> List[str]:
+        if uses[i] < 2:
+            return []
+        copies = [f"{name(i)}_{k}" for k in range(uses[i])]
+        return [
+            f"            if hasattr({name(i)}.__class__, '__next__'):",
+            f"                {''.join(f'{x}, ' for x in copies)}= tee({name(i)}, {uses[i]})",
+            "            else:",
+            f"                {' = '.join(copies)} = {name(i)}",
+        ]
+
+    lines = [
+        "def factory(ComposeError, funcs, stages, keys, output):",
+        f"    {''.join(f'f{i}, ' for i in range(size))}= funcs",
+        f"    {''.join(f's{i}, ' for i in range(size))}= stages",
+        f"    {''.join(f'k{j}, ' for j in range(len(leaves)))}= keys",
+        "    def record(arg):",
+        "        try:",
+        *copy(-1),
+    ]
+    handler = ["        except Exception as exc:", "            bound = locals()"]
+    for i, parent in enumerate(parents):
+        value = use(parent)
+        lines += [f"            _{i} = f{i}({value})", *copy(i)]
+        if i < size - 1:
+            handler += [
+                f"            if '_{i}' not in bound:",
+                f"                raise ComposeError(s{i}, {value}) from exc",
+            ]
+        else:
+            handler.append(f"            raise ComposeError(s{i}, {value}) from exc")
+    values = [use(i) for i in leaves]
+    if kind == 'dict':
+        result = f"{{{', '.join(f'k{j}: {x}' for j, x in enumerate(values))}}}"
+    elif kind == 'tuple':
+        result = f"({''.join(f'{x}, ' for x in values)})"
+    else:
+        result = f"output({', '.join(values)})"
+    lines += [*handler, f"        return {result}", "    return record"]
+    return _exec('\n'.join(lines), f"<record:{len(leaves)}>", {'tee': tee})['factory']
+
+
+def compile_record(keys: Tuple[Any, ...], pipelines: Tuple[Pipeline, ...], output: type) -> Callable:
+    """
+    Single function computing every pipeline, each shared prefix once
+    """
+    parents, stages, leaves = [], [], [None] * len(pipelines)
+    todo = [(-1, node) for node in reversed(list(_trie(pipelines).children.values()))]
+    while todo:
+        parent, node = todo.pop()
+        index = len(stages)
+        parents.append(parent)
+        stages.append(node.stage)
+        for field in node.fields:
+            leaves[field] = index
+        todo.extend((index, child) for child in reversed(list(node.children.values())))
+    kind = 'dict' if output is dict else 'tuple' if output is tuple else 'call'
+    factory = _factory(tuple(parents), tuple(leaves), kind)
+    return factory(ComposeError, tuple(map(_unwrap, stages)), tuple(stages), keys, output)
+
+
+class Record(C):
+    """
+    Fields computed by pipelines over the same argument, in a single traversal:
+    stages shared by the beginnings of several pipelines are applied once.
+
+    `output` is dict (by default), tuple or a callable taking the values
+    positionally, e.g. a namedtuple class
+    """
+    __slots__ = ('fields', 'output')
+
+    def __init__(self, fields: Mapping[Any, Pipeline], output: Callable = dict) -> None:
+        fields = tuple(fields.items())
+        if not fields:
+            raise ValueError("Record expected at least 1 field")
+        keys, pipelines = zip(*fields)
+        for pipeline in pipelines:
+            if not callable(pipeline):
+                raise ValueError(f"All passed items must be callable, got {pipeline!r} instead")
+            if is_async(pipeline):
+                raise ValueError(f"Async pipelines are not supported, got {pipeline!r}")
+        super().__init__(compile_record(keys, pipelines, output))
+        _setattr(self, 'fields', fields)
+        _setattr(self, 'output', output)
+
+    @property
+    def __name__(self) -> str:
+        return f"record({','.join(str(key) for key, _ in self.fields)})"
+
+    def __reduce__(self):
+        return self.__class__, (dict(self.fields), self.output)
+
+    def _key(self) -> Any:
+        return self.fields, self.output
@@ -0,0 +1,168 @@
+"""
+Algebraic rewrites of composition stacks
+"""
+from functools import lru_cache
+from typing import Any, Callable, Iterator, List, Sequence, Tuple
+
+from . import C, Compose, CType, Filter, IG, Id, ListMap, Map, SetMap, _exec, _setattr, _unwrap
+from .predicate import conjunction
+
+Stack = List[CType]
+
+# f(f(x)) == f(x)
+IDEMPOTENT = frozenset((int, float, bool, str, list, tuple, set, frozenset, dict))
+
+
+def _func(stage: CType) -> Any:
+    """
+    Wrapped function of a plain `C` stage
+    """
+    return stage.func if type(stage) is C else None
+
+
+class Merged(C):
+    """
+    Compiled composition of several stages standing for them in a stack.
+    Its errors are those of the merged stages, see stage_error
+    """
+    __slots__ = ('stages',)
+    merged = True
+
+    def __init__(self, *stages: Sequence[CType]) -> None:
+        super().__init__(Compose(*stages).compile())
+        _setattr(self, 'stages', stages)
+
+    @property
+    def __name__(self) -> str:
+        return f"merged({','.join(map(repr, self.stages))})"
+
+    def __reduce__(self):
+        return self.__class__, self.stages
+
+    def _key(self) -> Any:
+        return self.stages
+
+
+@lru_cache(maxsize=64)
+def _nested(size: int) -> Callable:
+    """
+    Factory of `lambda x: f0(f1(...(x)))`, errors are raised as they are
+    """
+    call = 'x'
+    for i in reversed(range(size)):
+        call = f"f{i}({call})"
+    names = ', '.join(f"f{i}" for i in range(size))
+    return _exec(f"def factory({names}):\n    return lambda x: {call}", f"<nested:{size}>")['factory']
+
+
+def _runs(stack: Stack, match: Callable[[CType], bool]) -> Iterator[Tuple[bool, Stack]]:
+    """
+    Split the stack into groups of consecutive stages with the same `match` result
+    """
+    group, flag = [], None
+    for stage in stack:
+        current = match(stage)
+        if group and current != flag:
+            yield flag, group
+            group = []
+        group.append(stage)
+        flag = current
+    if group:
+        yield flag, group
+
+
+def flatten(stack: Stack) -> Stack:
+    """
+    Compose(f, Compose(g, h)) => Compose(f, g, h)
+    """
+    result = []
+    for stage in stack:
+        if type(stage) is Compose:
+            result.extend(flatten(stage.stack))
+        else:
+            result.append(stage)
+    return result
+
+
+def drop_identity(stack: Stack) -> Stack:
+    """
+    f << Id => f, Int << Int => Int
+    """
+    result = []
+    for stage in stack:
+        if stage is Id:
+            continue
+        if result and _func(stage) in IDEMPOTENT and _func(result[-1]) is _func(stage):
+            continue
+        result.append(stage)
+    return result or [Id]
+
+
+def merge_maps(stack: Stack) -> Stack:
+    """
+    Map(f) << Map(g) => Map(f << g)
+    """
+    result = []
+    for flag, group in _runs(stack, lambda x: type(x) is Map):
+        if flag and len(group) > 1:
+            # items fail with the errors of the original functions, as map(f) raises them
+            funcs = [x.func.args[0] for x in group]
+            merged = _nested(len(funcs))(*map(_unwrap, funcs))
+            names = (getattr(f, '__name__', None) or repr(f) for f in funcs)
+            merged.__name__ = merged.__qualname__ = f"<Compose: {','.join(names)}>"
+            group = [Map(merged)]
+        result.extend(group)
+    return result
+
+
+def merge_filters(stack: Stack) -> Stack:
+    """
+    Filter(p) << Filter(q) => Filter(q & p)
+    """
+    result = []
+    for flag, group in _runs(stack, lambda x: type(x) is Filter and x.func.args[0] is not None):
+        if flag and len(group) > 1:
+            group = [Filter(conjunction([x.func.args[0] for x in reversed(group)]))]
+        result.extend(group)
+    return result
+
+
+def merge_getters(stack: Stack) -> Stack:
+    """
+    IG('c') << IG('b') << IG('a') => Merged(IG('c'), IG('b'), IG('a'))
+    """
+    result = []
+    for flag, group in _runs(stack, lambda x: type(x) is IG and len(x.args) == 1):
+        if flag and len(group) > 1:
+            group = [Merged(*group)]
+        result.extend(group)
+    return result
+
+
+def collect_maps(stack: Stack) -> Stack:
+    """
+    List << Map(f) => ListMap(f), Set << Map(f) => SetMap(f)
+    """
+    collectors = {list: ListMap, set: SetMap}
+    result = []
+    for stage in stack:
+        if type(stage) is Map and result and _func(result[-1]) in collectors:
+            stage = collectors[_func(result.pop())](stage.func.args[0])
+        result.append(stage)
+    return result
+
+
+RULES = (flatten, drop_identity, merge_maps, merge_filters, merge_getters, collect_maps)
+
+
+def rewrite(stack: Sequence[CType]) -> Tuple[CType, ...]:
+    """
+    Apply RULES to the stack until nothing changes
+    """
+    stack = list(stack)
+    while True:
+        current = stack
+        for rule in RULES:
+            stack = rule(stack)
+        if len(stack) == len(current) and all(a is b for a, b in zip(stack, current)):
+            return tuple(stack)
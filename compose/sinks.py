@@ -0,0 +1,99 @@
+"""
+Sinks collecting numbers into compact typed buffers instead of lists of Python objects.
+
+An int in a list costs a pointer and a boxed object, about 36 bytes, an item
+of ToArray('q') costs 8. Items are pulled in chunks of CHUNK, so memory does not
+depend on the length of the stream beyond the result itself, and buffers grow
+geometrically. Results support the buffer protocol: memoryview(result),
+numpy.frombuffer(result), file.write(result)... do not copy them
+"""
+import struct
+
+from array import array, typecodes
+from itertools import islice
+from typing import Any, Iterable
+
+from .stream import Stream, _positive
+
+CHUNK = 4096
+
+
+def to_array(typecode: str, iterable: Iterable) -> array:
+    result, iterator = array(typecode), iter(iterable)
+    # array(typecode, iterable) appends item by item, fromlist converts a chunk at once
+    fromlist = result.fromlist
+    while True:
+        items = list(islice(iterator, CHUNK))
+        if not items:
+            return result
+        fromlist(items)
+
+
+def to_buffer(format: str, capacity: int, iterable: Iterable) -> memoryview:
+    itemsize, iterator = struct.calcsize(format), iter(iterable)
+    data, size = bytearray(capacity * itemsize), 0
+    while True:
+        items = list(islice(iterator, CHUNK))
+        if not items:
+            break
+        count = len(items)
+        end = (size + count) * itemsize
+        if end > len(data):
+            data.extend(bytes(max(end, 2 * len(data)) - len(data)))
+        struct.pack_into(f'{count}{format}', data, size * itemsize, *items)
+        size += count
+    # the bytearray is not exported yet, trimming does not copy
+    del data[size * itemsize:]
+    return memoryview(data).cast(format)
+
+
+def to_numpy(dtype: Any, iterable: Iterable) -> Any:
+    # numpy is optional, it is imported on the first call
+    return __import__('numpy').fromiter(iterable, dtype)
+
+
+class ToArray(Stream):
+    """
+    array.array of the items with the typecode, e.g. 'q' for int64 or 'd' for float64
+    """
+    __slots__ = ()
+    f = staticmethod(to_array)
+
+    def __init__(self, typecode: str) -> None:
+        if typecode not in typecodes or typecode == 'u':
+            expected = ', '.join(typecodes.replace('u', ''))
+            raise ValueError(f"Unknown typecode {typecode!r}, expected one of {expected}")
+        super().__init__(typecode)
+
+
+class ToBuffer(Stream):
+    """
+    memoryview of the items packed with the struct format into a bytearray,
+    `capacity` items are preallocated and the buffer doubles when it is full
+    """
+    __slots__ = ()
+    f = staticmethod(to_buffer)
+
+    def __init__(self, format: str, capacity: int = CHUNK) -> None:
+        try:
+            memoryview(b'').cast(format)
+        except (TypeError, ValueError):
+            expected = "a native format like 'q' or 'd'"
+            raise ValueError(f"Unsupported format {format!r}, expected {expected}") from None
+        super().__init__(format, _positive('capacity', capacity, 0))
+
+    @property
+    def __name__(self) -> str:
+        return f"to_buffer({self.func.args[0]!r})"
+
+
+class ToNumpy(Stream):
+    """
+    One-dimensional numpy array of the items, numpy.fromiter without an intermediate list.
+    Requires numpy
+    """
+    __slots__ = ()
+    f = staticmethod(to_numpy)
+
+    def __init__(self, dtype: Any) -> None:
+        super().__init__(dtype)
@@ -0,0 +1,181 @@
+"""
+JSON specs of pipelines and an on-disk cache of their generated code.
+
+A spec references callables by import path, so only load specs from trusted sources
+"""
+import hashlib
+import json
+import marshal
+import os
+import sys
+import tempfile
+
+from functools import lru_cache, partial
+from importlib import import_module
+from typing import Any, Dict, List, Optional, Sequence
+
+import compose
+
+from . import Compose, CType, Pipeline, Shift
+from .errors import DeadLetters
+
+VERSION = 1
+
+
+def _ref(obj: Any) -> str:
+    module, qualname = getattr(obj, '__module__', None), getattr(obj, '__qualname__', None)
+    if module is None or qualname is None or '<' in qualname:
+        raise ValueError(f"{obj!r} is not importable")
+    if _resolve(f"{module}:{qualname}") is not obj:
+        raise ValueError(f"{obj!r} is not importable as {module}:{qualname}")
+    return f"{module}:{qualname}"
+
+
+@lru_cache(maxsize=None)
+def _resolve(ref: str) -> Any:
+    module, _, qualname = ref.partition(':')
+    try:
+        obj = import_module(module)
+        for name in qualname.split('.'):
+            obj = getattr(obj, name)
+    except (ImportError, AttributeError) as exc:
+        raise ValueError(f"Cannot import {ref!r}") from exc
+    return obj
+
+
+def to_spec(obj: Any) -> Any:
+    """
+    JSON-compatible form of a pipeline, its arguments or an importable callable
+    """
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    if isinstance(obj, list):
+        return [to_spec(x) for x in obj]
+    if isinstance(obj, tuple):
+        return {'tuple': [to_spec(x) for x in obj]}
+    if isinstance(obj, dict):
+        return {'dict': [[to_spec(k), to_spec(v)] for k, v in obj.items()]}
+    if isinstance(obj, partial):
+        return {
+            'partial': to_spec(obj.func),
+            'args': [to_spec(x) for x in obj.args],
+            'kwargs': [[k, to_spec(v)] for k, v in sorted(obj.keywords.items())],
+        }
+    if isinstance(obj, DeadLetters):
+        # a collector holds the failures of a running process, its spec is an empty one
+        return {'call': to_spec(DeadLetters), 'args': [obj.errors.maxlen]}
+    if isinstance(obj, Shift):
+        func, args = obj.__reduce__()[:2]
+        return {'call': to_spec(func), 'args': [to_spec(x) for x in args]}
+    return {'ref': _ref(obj)}
+
+
+def _decode(node: Dict[str, Any]) -> Any:
+    """
+    Object of a spec node whose children are decoded already
+    """
+    if 'call' in node:
+        return node['call'](*node['args'])
+    if 'ref' in node:
+        return _resolve(node['ref'])
+    if 'tuple' in node:
+        return tuple(node['tuple'])
+    if 'dict' in node:
+        return {k: v for k, v in node['dict']}
+    if 'partial' in node:
+        return partial(node['partial'], *node['args'], **dict(node['kwargs']))
+    raise ValueError(f"Invalid spec {node!r}")
+
+
+def from_spec(spec: Any) -> Any:
+    """
+    Object described by `to_spec(obj)`
+    """
+    if isinstance(spec, list):
+        return [from_spec(x) for x in spec]
+    if isinstance(spec, dict):
+        return _decode({k: from_spec(v) for k, v in spec.items()})
+    return spec
+
+
+def _hook(node: Dict[str, Any]) -> Any:
+    return node if node.keys() == {'pipeline', 'version'} else _decode(node)
+
+
+def dumps(pipeline: Pipeline) -> str:
+    """
+    Canonical JSON spec, equal pipelines have equal specs
+    """
+    return json.dumps(
+        {'version': VERSION, 'pipeline': to_spec(pipeline)}, sort_keys=True, separators=(',', ':'),
+    )
+
+
+def loads(text: str) -> Pipeline:
+    """
+    Pipeline of a spec, objects are built while the JSON is parsed
+    """
+    data = json.loads(text, object_hook=_hook)
+    if data.get('version') != VERSION:
+        raise ValueError(f"Unsupported spec version {data.get('version')!r}")
+    return data['pipeline']
+
+
+def spec_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class CodeCache:
+    """
+    Generated code of pipelines stored in `directory`, one file per set of specs and Python version.
+
+    `load()` returns compiled pipelines; when their file exists, the generated
+    sources are not compiled again.
+
+    Only the sources of factories first generated inside `load()` are recorded.
+    Factories are cached per process: a pipeline built earlier in the same process,
+    e.g. by `dumps`, reuses its factory and nothing is generated for it. The file
+    is completed by the next process missing these sources
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, texts: Sequence[str]) -> str:
+        key = spec_hash(''.join(map(spec_hash, texts)))
+        return os.path.join(self.directory, f"{key}.{sys.implementation.cache_tag}.marshal")
+
+    def _read(self, path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, 'rb') as f:
+                return marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+    def _write(self, path: str, codes: Dict[str, Any]) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                marshal.dump(codes, f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def load(self, *texts: str) -> List[CType]:
+        """
+        Compiled functions of the pipelines, e.g. all pipelines of a worker at once
+        """
+        path = self.path(texts)
+        codes = self._read(path)
+        known = compose._codes = dict(codes or {})
+        used = compose._used = set()
+        try:
+            pipelines = [loads(text) for text in texts]
+            pipelines = [x.compile() if isinstance(x, Compose) else x for x in pipelines]
+        finally:
+            compose._codes = compose._used = None
+        if codes is None or not used <= codes.keys():
+            self._write(path, {**(codes or {}), **{source: known[source] for source in used}})
+        return pipelines
@@ -0,0 +1,228 @@
+"""
+Compositions specialized for the argument types seen on their first calls
+"""
+from typing import Any, Callable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from . import AG, C, CArg, Compose, ComposeError, CType, Filter, IG, Map, _exec, _unwrap
+
+# conversions returning an argument of exactly this type unchanged
+CONVERSIONS = {x: x for x in (int, float, complex, str, bytes, bool, tuple, frozenset)}
+
+
+class SpecializeInfo(NamedTuple):
+    # calls recorded before specializing
+    recorded: int
+    specialized: bool
+    hits: int
+    deopts: int
+    # (stage, hits, deopts) of every guarded stage
+    guards: Tuple[Tuple[str, int, int], ...]
+
+
+def _template(stage: CType, seen: Set[type]) -> Tuple[str, Optional[type]]:
+    """
+    Expression computing the stage from `{v}` with the function `{f}` and the key `{k}`,
+    and the argument type it is valid for, None if it is valid for any argument
+    """
+    if type(stage) is IG and len(stage.args) == 1:
+        return "{v}[{k}]", None
+    if type(stage) is AG and len(stage.args) == 1 and stage.args[0].isidentifier():
+        return f"{{v}}.{stage.args[0]}", None
+    if type(stage) in (Map, Filter):
+        return f"{stage.f.__name__}({{f}}, {{v}})", None
+    func = stage.func if type(stage) is C else None
+    if len(seen) == 1 and func in CONVERSIONS and CONVERSIONS[func] in seen:
+        return "{v}", CONVERSIONS[func]
+    return "{f}({v})", None
+
+
+def _function(stage: CType) -> CType:
+    if type(stage) in (Map, Filter):
+        return _unwrap(stage.func.args[0])
+    return _unwrap(stage)
+
+
+def _key(stage: CType) -> Any:
+    return stage.args[0] if type(stage) is IG and len(stage.args) == 1 else None
+
+
+def _build(
+    stack: Sequence[CType], types: List[Set[type]], hits: List[int], deopts: List[int],
+) -> Tuple[Callable, Tuple[str, ...]]:
+    """
+    Straight-line function for the stack, e.g. for Int << IG('id') seeing dicts with int values:
+
+        def factory(ComposeError, stages, funcs, keys, hits, deopts, t1):
+            s0, s1, = stages
+            f0, f1, = funcs
+            k0, k1, = keys
+            def specialized(arg):
+                try:
+                    _1 = arg[k1]
+                    if type(_1) is t1:
+                        hits[0] += 1
+                        _0 = _1
+                    else:
+                        deopts[0] += 1
+                        _0 = f0(_1)
+                except Exception as exc:
+                    ...
+                return _0
+            return specialized
+
+    A failed guard falls back to the generic stage call for this argument only.
+    Returns the function and the names of the guarded stages
+    """
+    size = len(stack)
+    guards = []
+    lines, handler = [], ["        except Exception as exc:", "            bound = locals()"]
+    value = 'arg'
+    for i in reversed(range(size)):
+        template, guard = _template(stack[i], types[size - 1 - i])
+        expr = template.format(v=value, f=f"f{i}", k=f"k{i}")
+        if guard is None:
+            lines.append(f"            _{i} = {expr}")
+        else:
+            lines += [
+                f"            if type({value}) is t{i}:",
+                f"                hits[{len(guards)}] += 1",
+                f"                _{i} = {expr}",
+                "            else:",
+                f"                deopts[{len(guards)}] += 1",
+                f"                _{i} = f{i}({value})",
+            ]
+            guards.append((i, guard))
+        if i:
+            handler += [
+                f"            if '_{i}' not in bound:",
+                f"                raise ComposeError(s{i}, {value}) from exc",
+            ]
+        else:
+            handler.append(f"            raise ComposeError(s{i}, {value}) from exc")
+        value = f"_{i}"
+    names = ''.join(f", t{i}" for i, _ in guards)
+    source = '\n'.join([
+        f"def factory(ComposeError, stages, funcs, keys, hits, deopts{names}):",
+        f"    {''.join(f's{i}, ' for i in range(size))}= stages",
+        f"    {''.join(f'f{i}, ' for i in range(size))}= funcs",
+        f"    {''.join(f'k{i}, ' for i in range(size))}= keys",
+        "    def specialized(arg):",
+        "        try:",
+        *lines,
+        *handler,
+        f"        return {value}",
+        "    return specialized",
+    ])
+    namespace = _exec(source, f"<specialized:{size}>")
+    hits[:] = deopts[:] = [0] * len(guards)
+    return namespace['factory'](
+        ComposeError, stack, tuple(map(_function, stack)), tuple(map(_key, stack)), hits, deopts,
+        *(guard for _, guard in guards),
+    ), tuple(repr(stack[i]) for i, _ in guards)
+
+
+class Specializer:
+    """
+    Records argument types of every stage, then replaces itself with a specialized function
+    """
+    __slots__ = ('stack', 'warmup', 'recorded', 'types', 'func', 'guards', 'hits', 'deopts')
+
+    def __init__(self, stack: Tuple[CType, ...], warmup: int) -> None:
+        self.stack = stack
+        self.warmup = warmup
+        self.reset()
+
+    def reset(self) -> None:
+        self.recorded = 0
+        self.types: List[Set[type]] = [set() for _ in self.stack]
+        self.func = None
+        self.guards: Tuple[str, ...] = ()
+        self.hits: List[int] = []
+        self.deopts: List[int] = []
+
+    def _record(self, arg: CArg) -> Any:
+        for types, func in zip(self.types, reversed(self.stack)):
+            types.add(type(arg))
+            try:
+                arg = func(arg)
+            except Exception as exc:
+                raise ComposeError(func, arg) from exc
+        return arg
+
+    def specialize(self) -> None:
+        self.func, self.guards = _build(self.stack, self.types, self.hits, self.deopts)
+
+    def __call__(self, arg: CArg) -> Any:
+        if self.func is not None:
+            return self.func(arg)
+        try:
+            return self._record(arg)
+        finally:
+            self.recorded += 1
+            if self.recorded >= self.warmup:
+                self.specialize()
+
+
+class Specialized(C):
+    """
+    Composition recording the argument types of its stages on the first `warmup` calls.
+
+    Then it is compiled into a single function where getters are inlined and
+    conversions of arguments already of the target type (e.g. Int of an int)
+    are skipped behind a type guard. A failed guard calls the generic stage
+    """
+    __slots__ = ('composition', 'warmup')
+
+    def __init__(self, composition: Compose, warmup: int = 100) -> None:
+        if warmup < 1:
+            raise ValueError(f"warmup must be positive, got {warmup!r}")
+        if not isinstance(composition, Compose):
+            composition = Compose(composition)
+        super().__init__(Specializer(composition.stack, warmup))
+        self._set(composition=composition, warmup=warmup)
+
+    @property
+    def __name__(self) -> str:
+        return f"specialized({self.composition!r})"
+
+    def __reduce__(self):
+        return self.__class__, (self.composition, self.warmup)
+
+    def _key(self) -> Any:
+        return self.composition, self.warmup
+
+    def __call__(self, arg: CArg) -> Any:
+        specialized = self.func.func
+        if specialized is None:
+            return self.func(arg)
+        return specialized(arg)
+
+    def specialize(self) -> None:
+        """
+        Specialize now for the types recorded so far
+        """
+        self.func.specialize()
+
+    def compile(self) -> CType:
+        """
+        The specialized function itself, specialized now if the warmup is not over
+        """
+        if self.func.func is None:
+            self.func.specialize()
+        return self.func.func
+
+    def reset(self) -> None:
+        """
+        Drop the specialized function and record types again
+        """
+        self.func.reset()
+
+    def info(self) -> SpecializeInfo:
+        specializer = self.func
+        return SpecializeInfo(
+            recorded=specializer.recorded,
+            specialized=specializer.func is not None,
+            hits=sum(specializer.hits),
+            deopts=sum(specializer.deopts),
+            guards=tuple(zip(specializer.guards, specializer.hits, specializer.deopts)),
+        )
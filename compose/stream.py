@@ -0,0 +1,164 @@
+"""
+Lazy stages over iterables, memory does not grow with the stream length
+"""
+from collections import deque
+from itertools import chain, dropwhile, islice, takewhile
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence
+
+from . import CType, IterCompose, P
+
+
+def chunk(n: int, iterable: Iterable) -> Iterator[tuple]:
+    iterator = iter(iterable)
+    while True:
+        items = tuple(islice(iterator, n))
+        if not items:
+            return
+        yield items
+
+
+def take(n: int, iterable: Iterable) -> Iterator:
+    # islice stops without pulling the item after the n-th one
+    return islice(iterable, n)
+
+
+def skip(n: int, iterable: Iterable) -> Iterator:
+    return islice(iterable, n, None)
+
+
+def flat_map(func: CType, iterable: Iterable) -> Iterator:
+    return chain.from_iterable(map(func, iterable))
+
+
+def scan(func: Callable[[Any, Any], Any], init: Any, iterable: Iterable) -> Iterator:
+    acc = init
+    for item in iterable:
+        acc = func(acc, item)
+        yield acc
+
+
+def window(n: int, step: int, iterable: Iterable) -> Iterator[tuple]:
+    iterator = iter(iterable)
+    items = deque(islice(iterator, n), maxlen=n)
+    need = min(n, step)
+    while len(items) == n:
+        yield tuple(items)
+        if step > n:
+            items.clear()
+            for _ in islice(iterator, step - n):
+                pass
+        count = 0
+        for item in islice(iterator, need):
+            items.append(item)
+            count += 1
+        if count < need:
+            return
+
+
+def _positive(name: str, value: int, minimum: int = 1) -> int:
+    if value < minimum:
+        raise ValueError(f"{name} must be {'positive' if minimum else 'non-negative'}, got {value!r}")
+    return value
+
+
+def _callable(name: str, func: Optional[CType]) -> Optional[CType]:
+    if func is not None and not callable(func):
+        raise ValueError(f"{name} must be callable, got {func!r}")
+    return func
+
+
+class Stream(IterCompose):
+    """
+    Base class for generator stages, `f(*args, iterable)`
+    """
+    __slots__ = ()
+
+    def __init__(self, *args: Sequence[Any]) -> None:
+        P.__init__(self, self.f, *args)
+
+    @property
+    def __name__(self) -> str:
+        args = (getattr(x, '__name__', None) or repr(x) for x in self.func.args)
+        return f"{self.f.__name__}({','.join(args)})"
+
+
+class Chunk(Stream):
+    """
+    Tuples of `n` consecutive items, the last one may be shorter
+    """
+    __slots__ = ()
+    f = staticmethod(chunk)
+
+    def __init__(self, n: int) -> None:
+        super().__init__(_positive('n', n))
+
+
+class Take(Stream):
+    """
+    First `n` items; the upstream is not asked for more
+    """
+    __slots__ = ()
+    f = staticmethod(take)
+
+    def __init__(self, n: int) -> None:
+        super().__init__(_positive('n', n, 0))
+
+
+class Skip(Stream):
+    """
+    All items but the first `n`
+    """
+    __slots__ = ()
+    f = staticmethod(skip)
+
+    def __init__(self, n: int) -> None:
+        super().__init__(_positive('n', n, 0))
+
+
+class FlatMap(Stream):
+    """
+    Items of the iterables returned by `func`
+    """
+    __slots__ = ()
+    f = staticmethod(flat_map)
+
+    def __init__(self, func: CType) -> None:
+        super().__init__(func)
+
+
+class Scan(Stream):
+    """
+    Running values of `acc = func(acc, item)` starting from `init`, `init` itself is not yielded
+    """
+    __slots__ = ()
+    f = staticmethod(scan)
+
+    def __init__(self, func: Callable[[Any, Any], Any], init: Any) -> None:
+        super().__init__(func, init)
+
+
+class TakeWhile(Stream):
+    __slots__ = ()
+    f = takewhile
+
+    def __init__(self, func: CType) -> None:
+        super().__init__(func)
+
+
+class DropWhile(Stream):
+    __slots__ = ()
+    f = dropwhile
+
+    def __init__(self, func: CType) -> None:
+        super().__init__(func)
+
+
+class Window(Stream):
+    """
+    Tuples of `n` items starting every `step` items, incomplete windows are dropped
+    """
+    __slots__ = ()
+    f = staticmethod(window)
+
+    def __init__(self, n: int, step: int = 1) -> None:
+        super().__init__(_positive('n', n), _positive('step', step))
@@ -0,0 +1,240 @@
+"""
+Aggregates over sliding and tumbling windows, updated incrementally as items enter and leave
+"""
+from collections import deque
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+from . import CType, _unwrap
+from .stream import Stream, _callable, _positive
+
+AGGREGATES = ('sum', 'count', 'mean', 'min', 'max')
+
+
+class Running:
+    """
+    Sum, count or mean of the values in a window.
+
+    Sliding windows keep their entries to subtract the values leaving them,
+    the total is recomputed every `size` removals so that float rounding
+    errors do not accumulate over long streams; O(1) amortized
+    """
+    __slots__ = ('kind', 'entries', 'count', 'total', 'removed')
+
+    def __init__(self, kind: str, sliding: bool) -> None:
+        self.kind = kind
+        self.entries = deque() if sliding else None
+        self.clear()
+
+    def add(self, key: Any, value: Any) -> None:
+        if self.entries is not None:
+            self.entries.append((key, value))
+        self.count += 1
+        if self.kind != 'count':
+            self.total += value
+
+    def expire(self, bound: Any) -> None:
+        """
+        Remove the values with keys up to `bound`
+        """
+        entries = self.entries
+        while entries and entries[0][0] <= bound:
+            _, value = entries.popleft()
+            self.count -= 1
+            if self.kind != 'count':
+                self.total -= value
+                self.removed += 1
+                if self.removed >= len(entries):
+                    self.total = sum(value for _, value in entries)
+                    self.removed = 0
+
+    def clear(self) -> None:
+        if self.entries is not None:
+            self.entries.clear()
+        self.count = self.total = self.removed = 0
+
+    def result(self) -> Any:
+        if self.kind == 'sum':
+            return self.total
+        if self.kind == 'count':
+            return self.count
+        return self.total / self.count if self.count else None
+
+
+class Extreme:
+    """
+    Minimum or maximum of the values in a window.
+
+    Sliding windows keep a monotonic deque of the values which may still
+    become the extreme one after older values leave, O(1) amortized
+    """
+    __slots__ = ('kind', 'entries', 'sliding')
+
+    def __init__(self, kind: str, sliding: bool) -> None:
+        self.kind = kind
+        self.entries = deque()
+        self.sliding = sliding
+
+    def add(self, key: Any, value: Any) -> None:
+        entries = self.entries
+        if self.kind == 'max':
+            while entries and entries[-1][1] <= value:
+                entries.pop()
+        else:
+            while entries and entries[-1][1] >= value:
+                entries.pop()
+        if self.sliding or not entries:
+            entries.append((key, value))
+
+    def expire(self, bound: Any) -> None:
+        entries = self.entries
+        while entries and entries[0][0] <= bound:
+            entries.popleft()
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def result(self) -> Any:
+        return self.entries[0][1] if self.entries else None
+
+
+def _accumulator(agg: str, sliding: bool) -> Any:
+    return (Extreme if agg in ('min', 'max') else Running)(agg, sliding)
+
+
+def sliding(n: int, agg: str, value: Optional[CType], iterable: Iterable) -> Iterator:
+    acc, get = _accumulator(agg, True), _unwrap(value) if value is not None else None
+    for index, item in enumerate(iterable):
+        acc.add(index, item if get is None else get(item))
+        acc.expire(index - n)
+        if index >= n - 1:
+            yield acc.result()
+
+
+def tumbling(n: int, agg: str, value: Optional[CType], iterable: Iterable) -> Iterator:
+    acc, get = _accumulator(agg, False), _unwrap(value) if value is not None else None
+    count = 0
+    for item in iterable:
+        acc.add(count, item if get is None else get(item))
+        count += 1
+        if count == n:
+            yield acc.result()
+            acc.clear()
+            count = 0
+    if count:
+        yield acc.result()
+
+
+def _timestamps(time: CType, iterable: Iterable) -> Iterator[Tuple[Any, Any]]:
+    get, last = _unwrap(time), None
+    for item in iterable:
+        timestamp = get(item)
+        if last is not None and timestamp < last:
+            raise ValueError(f"Timestamps must not decrease, got {timestamp!r} after {last!r}")
+        last = timestamp
+        yield timestamp, item
+
+
+def sliding_time(
+    span: Any, agg: str, time: CType, value: Optional[CType], iterable: Iterable,
+) -> Iterator[tuple]:
+    acc, get = _accumulator(agg, True), _unwrap(value) if value is not None else None
+    for timestamp, item in _timestamps(time, iterable):
+        acc.add(timestamp, item if get is None else get(item))
+        acc.expire(timestamp - span)
+        yield timestamp, acc.result()
+
+
+def tumbling_time(
+    span: Any, agg: str, time: CType, value: Optional[CType], iterable: Iterable,
+) -> Iterator[tuple]:
+    acc, get = _accumulator(agg, False), _unwrap(value) if value is not None else None
+    start = None
+    for timestamp, item in _timestamps(time, iterable):
+        if start is not None and timestamp >= start + span:
+            yield start, acc.result()
+            acc.clear()
+            start = None
+        if start is None:
+            start = timestamp - timestamp % span
+        acc.add(timestamp, item if get is None else get(item))
+    if start is not None:
+        yield start, acc.result()
+
+
+def _aggregate(agg: str) -> str:
+    if agg not in AGGREGATES:
+        raise ValueError(f"Unknown aggregate {agg!r}, expected one of {', '.join(AGGREGATES)}")
+    return agg
+
+
+def _span(span: Any) -> Any:
+    if not span > 0:
+        raise ValueError(f"span must be positive, got {span!r}")
+    return span
+
+
+class WindowAggregate(Stream):
+    """
+    Base class for window aggregates, `value` extracts the aggregated value of an item
+    """
+    __slots__ = ()
+
+    @property
+    def __name__(self) -> str:
+        args = (
+            x if isinstance(x, str) else getattr(x, '__name__', None) or repr(x)
+            for x in self.func.args if x is not None
+        )
+        return f"{self.f.__name__}({','.join(map(str, args))})"
+
+
+class SlidingWindow(WindowAggregate):
+    """
+    Aggregate of the last `n` items for every item from the n-th one:
+    'sum', 'count', 'mean', 'min' or 'max', O(1) amortized per item
+    """
+    __slots__ = ()
+    f = staticmethod(sliding)
+
+    def __init__(self, n: int, agg: str, value: Optional[CType] = None) -> None:
+        super().__init__(_positive('n', n), _aggregate(agg), _callable('value', value))
+
+
+class TumblingWindow(WindowAggregate):
+    """
+    Aggregate of every `n` consecutive items, the last window may be shorter
+    """
+    __slots__ = ()
+    f = staticmethod(tumbling)
+
+    def __init__(self, n: int, agg: str, value: Optional[CType] = None) -> None:
+        super().__init__(_positive('n', n), _aggregate(agg), _callable('value', value))
+
+
+class SlidingTimeWindow(WindowAggregate):
+    """
+    (timestamp, aggregate) for every item, over the items whose `time` is
+    within `span` before its own: (timestamp - span, timestamp].
+    Timestamps must not decrease
+    """
+    __slots__ = ()
+    f = staticmethod(sliding_time)
+
+    def __init__(self, span: Any, agg: str, time: CType, value: Optional[CType] = None) -> None:
+        if not callable(time):
+            raise ValueError(f"time must be callable, got {time!r}")
+        super().__init__(_span(span), _aggregate(agg), time, _callable('value', value))
+
+
+class TumblingTimeWindow(WindowAggregate):
+    """
+    (start, aggregate) for every window [start, start + span) containing items,
+    windows start at multiples of `span`. Timestamps must not decrease
+    """
+    __slots__ = ()
+    f = staticmethod(tumbling_time)
+
+    def __init__(self, span: Any, agg: str, time: CType, value: Optional[CType] = None) -> None:
+        if not callable(time):
+            raise ValueError(f"time must be callable, got {time!r}")
+        super().__init__(_span(span), _aggregate(agg), time, _callable('value', value))
@@ -0,0 +1,109 @@
+import pickle
+import pytest
+import statistics
+import compose as cp
+
+from compose import spec
+
+DATA = [{'g': i % 3, 'x': i, 'y': i * 7 % 5 if i % 4 else None} for i in range(20)]
+
+
+def test_aggregate():
+    f = cp.Aggregate(
+        sum=cp.IG('x'), count=True, min=cp.IG('x'), max=cp.IG('x'),
+        mean=cp.IG('x'), var=cp.IG('x'), distinct=cp.IG('g'),
+    )
+    xs = range(20)
+    assert f(iter(DATA)) == {
+        'sum': sum(xs),
+        'count': 20,
+        'min': 0,
+        'max': 19,
+        'mean': statistics.mean(xs),
+        'var': statistics.variance(xs),
+        'distinct': 3,
+    }
+    assert list(f(DATA)) == ['sum', 'count', 'min', 'max', 'mean', 'var', 'distinct']
+
+
+def test_identity_and_count():
+    assert cp.Aggregate(sum=True, count=True)([1, 2, 3]) == {'sum': 6, 'count': 3}
+    assert cp.Aggregate(count=cp.IG('y'))(DATA) == {'count': 15}
+    assert cp.Aggregate(max=True, min=True)([3, 1, 2]) == {'max': 3, 'min': 1}
+
+
+def test_stable_variance():
+    values = [1e9 + x for x in (4, 7, 13, 16)]
+    assert cp.Aggregate(var=True)(values) == {'var': 30.0}
+
+
+def test_empty():
+    f = cp.Aggregate(sum=True, count=True, min=True, mean=True, var=True, distinct=True)
+    assert f([]) == {'sum': 0, 'count': 0, 'min': None, 'mean': None, 'var': None, 'distinct': 0}
+    assert cp.Aggregate(var=True)([5]) == {'var': None}
+
+
+def test_shared_extractor():
+    calls = []
+
+    def x(item):
+        calls.append(item)
+        return item['x']
+
+    cp.Aggregate(sum=cp.C(x), mean=cp.C(x), var=cp.C(x))(DATA)
+    assert len(calls) == len(DATA)
+
+
+def test_pipeline():
+    f = cp.Aggregate(sum=True, max=True) << cp.Map(int) << cp.IG('values')
+    assert f({'values': '3141'}) == {'sum': 9, 'max': 4}
+
+
+def test_group_by():
+    f = cp.GroupBy(cp.IG('g'), cp.Aggregate(count=True, sum=cp.IG('x'), mean=cp.IG('x')))
+    assert f(DATA) == {
+        g: {'count': len(xs), 'sum': sum(xs), 'mean': statistics.mean(xs)}
+        for g in range(3)
+        for xs in [[x['x'] for x in DATA if x['g'] == g]]
+    }
+
+
+def test_error():
+    f = cp.Aggregate(sum=cp.IG('x'))
+    with pytest.raises(cp.ComposeError) as info:
+        f([{'x': 1}, {'y': 2}])
+    assert info.value.func is f
+    assert info.value.arg == {'y': 2}
+    assert isinstance(info.value.origin, KeyError)
+
+
+def test_source_error():
+    def source():
+        yield {'x': 1}
+        raise OSError('source')
+
+    # errors of the iterable are not errors of the aggregate
+    with pytest.raises(OSError):
+        cp.Aggregate(sum=cp.IG('x'))(source())
+    with pytest.raises(cp.ComposeError) as info:
+        (cp.Aggregate(sum=True) << cp.Map(int))(['1', '2', 'x'])
+    assert type(info.value.__cause__) is ValueError
+
+
+def test_invalid():
+    with pytest.raises(TypeError, match='at least 1 aggregate'):
+        cp.Aggregate()
+    with pytest.raises(ValueError, match="Unknown aggregate 'median'"):
+        cp.Aggregate(median=True)
+    with pytest.raises(ValueError, match='sum expected a callable or True, got 1'):
+        cp.Aggregate(sum=1)
+    with pytest.raises(ValueError, match='Aggregate expected'):
+        cp.GroupBy(cp.Id, cp.Id)
+
+
+def test_name_pickle_spec():
+    f = cp.GroupBy(cp.IG('g'), cp.Aggregate(sum=cp.IG('x'), count=True))
+    assert repr(f) == 'group_by(IG(g),aggregate(sum=IG(x),count))'
+    for copy in (pickle.loads(pickle.dumps(f)), spec.loads(spec.dumps(f))):
+        assert copy == f
+        assert list(copy(DATA)[0]) == ['sum', 'count']
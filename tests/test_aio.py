@@ -0,0 +1,122 @@
+import asyncio
+import pytest
+import compose as cp
+
+from compose.aio import AMap, AsyncCompose
+
+
+async def tenfold(x):
+    await asyncio.sleep(0)
+    return x * 10
+
+
+async def fail(x):
+    raise KeyError(x)
+
+
+async def arange(n):
+    for x in range(n):
+        yield x
+
+
+def test_is_async():
+    assert cp.is_async(tenfold)
+    assert cp.is_async(cp.C(tenfold))
+    assert cp.is_async(cp.P(tenfold))
+    assert cp.is_async(AMap(abs))
+    assert not cp.is_async(cp.Int)
+    assert not cp.is_async(cp.Compose(cp.Int))
+
+
+def test_pipeline(subtests):
+    for f in (cp.Int << cp.C(tenfold), cp.C(tenfold) << cp.Int, cp.Compose(cp.Int) << cp.C(tenfold)):
+        with subtests.test(repr(f)):
+            assert isinstance(f, AsyncCompose)
+            assert asyncio.run(f(4)) == 40
+
+
+def test_pipeline_sync():
+    assert type(cp.Int << cp.Str) is cp.Compose
+
+
+def test_call():
+    f = cp.Int << cp.C(tenfold) << cp.IG('a')
+    assert repr(f) == '<AsyncCompose: int,tenfold,IG(a)>'
+    assert asyncio.run(f({'a': 7})) == 70
+
+
+def test_compile():
+    f = cp.Int << cp.C(tenfold) << cp.IG('a')
+    with pytest.raises(TypeError, match='async'):
+        f.compile()
+    with pytest.raises(TypeError, match='async'):
+        cp.FastCompose(cp.Int, cp.C(tenfold))
+    # nested async compositions are called as they are
+    g = cp.Compose(cp.List, cp.Map(f))
+    assert [asyncio.run(x) for x in g.compile()([{'a': 1}])] == [10]
+
+
+def test_error():
+    f = cp.Int << cp.C(fail) << cp.IG('a')
+    with pytest.raises(cp.ComposeError) as excinfo:
+        asyncio.run(f({'a': 5}))
+
+    assert repr(excinfo.value.func) == 'fail'
+    assert excinfo.value.arg == 5
+    assert isinstance(excinfo.value.origin, KeyError)
+
+
+def test_amap_collect():
+    f = cp.Sum << AMap(tenfold, concurrency=2) << cp.Map(int)
+    assert isinstance(f, AsyncCompose)
+    assert asyncio.run(f('1234')) == 100
+
+
+def test_amap_chain():
+    f = cp.List << AMap(tenfold) << AMap(tenfold)
+    assert asyncio.run(f(range(4))) == [0, 100, 200, 300]
+
+
+def test_amap_async_iterable():
+    f = cp.List << AMap(tenfold)
+    assert asyncio.run(f(arange(3))) == [0, 10, 20]
+
+
+def test_amap_unordered():
+    f = cp.Set << AMap(tenfold, ordered=False)
+    assert asyncio.run(f(range(5))) == {0, 10, 20, 30, 40}
+
+
+def test_amap_sync_func():
+    f = cp.List << AMap(abs)
+    assert asyncio.run(f([-1, 2])) == [1, 2]
+
+
+def test_amap_concurrency():
+    running, peak = 0, 0
+
+    async def track(x):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001)
+        running -= 1
+        return x
+
+    f = cp.List << AMap(track, concurrency=3)
+    assert asyncio.run(f(range(10))) == list(range(10))
+    assert peak == 3
+
+
+def test_amap_error():
+    f = cp.List << AMap(fail)
+    with pytest.raises(cp.ComposeError) as excinfo:
+        asyncio.run(f([1, 2]))
+
+    assert excinfo.value.func is cp.List
+    assert isinstance(excinfo.value.origin, KeyError)
+
+
+def test_amap_concurrency_required():
+    with pytest.raises(ValueError, match='concurrency must be positive, got 0'):
+        AMap(tenfold, concurrency=0)
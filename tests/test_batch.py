@@ -0,0 +1,123 @@
+import pytest
+import compose as cp
+
+from unittest.mock import Mock
+
+from compose.batch import vectorized
+
+
+@pytest.fixture
+def np():
+    return pytest.importorskip('numpy')
+
+
+def test_apply_batch():
+    f = cp.Sum << cp.Map(int) << cp.IG('item.x')
+    batch = [{'item': {'x': '471'}}, {'item': {'x': '1'}}]
+    assert f.apply_batch(batch) == [f(x) for x in batch] == [12, 1]
+
+
+def test_apply_batch_stage_order():
+    calls = []
+    a = Mock(name='a', side_effect=lambda x: calls.append(('a', x)) or x)
+    b = Mock(name='b', side_effect=lambda x: calls.append(('b', x)) or x)
+    assert cp.Compose(a, b).apply_batch([1, 2]) == [1, 2]
+    assert calls == [('b', 1), ('b', 2), ('a', 1), ('a', 2)]
+
+
+def test_apply_batch_error():
+    f = cp.Int << cp.IG('id')
+    with pytest.raises(cp.ComposeError) as excinfo:
+        f.apply_batch([{'id': '1'}, {}])
+
+    assert repr(excinfo.value.func) == 'IG(id)'
+    assert excinfo.value.arg == {}
+    assert isinstance(excinfo.value.origin, KeyError)
+
+
+def test_int(np):
+    batch = np.array([1.5, -2.7, 3.0])
+    result = cp.Compose(cp.Int).apply_batch(batch)
+    assert isinstance(result, np.ndarray)
+    assert result.tolist() == [1, -2, 3]
+
+
+def test_int_nan(np):
+    with pytest.raises(cp.ComposeError) as excinfo:
+        cp.Compose(cp.Int).apply_batch(np.array([1.5, np.nan]))
+
+    assert isinstance(excinfo.value.origin, ValueError)
+
+
+def test_str(np):
+    result = cp.Compose(cp.Str).apply_batch(np.arange(3))
+    assert result.tolist() == ['0', '1', '2']
+
+
+def test_sum_map(np):
+    batch = np.array([[1.5, 2.7], [3.1, -4.9]])
+    f = cp.Sum << cp.Map(int)
+    assert f.apply_batch(batch).tolist() == [f(x) for x in batch] == [3, -1]
+
+
+def test_record_getter(np):
+    batch = np.array([(1, 2.5), (3, 4.5)], dtype=[('a', 'i8'), ('b', 'f8')])
+    stage = cp.IG('b')
+    assert vectorized(stage, batch).tolist() == [2.5, 4.5]
+    assert (cp.Int << stage).apply_batch(batch).tolist() == [2, 4]
+
+
+def test_column_getter(np):
+    batch = np.arange(6).reshape(3, 2)
+    assert vectorized(cp.IG(1), batch).tolist() == [1, 3, 5]
+    assert vectorized(cp.IG(2), batch) is None
+
+
+def test_filter_mask(np):
+    batch = np.array([[0, 1, 2], [3, 0, 0]])
+    f = cp.List << cp.Filter(bool)
+    assert f.apply_batch(batch) == [f(x) for x in batch] == [[1, 2], [3]]
+
+
+def test_unknown_stage(np):
+    batch = np.arange(3)
+    assert vectorized(cp.C(abs), batch) is None
+    assert cp.Compose(cp.C(lambda x: x * 2)).apply_batch(batch) == [0, 2, 4]
+
+
+def _per_item(f, batch):
+    try:
+        return [f(x) for x in batch]
+    except cp.ComposeError:
+        return cp.ComposeError
+
+
+def _batched(f, batch):
+    try:
+        result = f.apply_batch(batch)
+    except cp.ComposeError:
+        return cp.ComposeError
+    return [x.tolist() if hasattr(x, 'tolist') else x for x in result]
+
+
+@pytest.mark.parametrize('shape', [(4, 2), (2, 2, 2)])
+@pytest.mark.parametrize('f', [
+    cp.Compose(cp.Int),
+    cp.Compose(cp.Str),
+    cp.Compose(cp.C(float)),
+    cp.Sum << cp.Map(int),
+    cp.List << cp.Map(str),
+    cp.Compose(cp.Sum),
+])
+def test_rows(np, shape, f):
+    batch = np.arange(1, 9).reshape(shape)
+    expected = _per_item(f, batch)
+    if expected is not cp.ComposeError:
+        expected = [x.tolist() if hasattr(x, 'tolist') else x for x in expected]
+    assert _batched(f, batch) == expected
+
+
+def test_int_uint64(np):
+    batch = np.array([2 ** 64 - 1, 1], dtype=np.uint64)
+    assert list(cp.Compose(cp.Int).apply_batch(batch)) == [2 ** 64 - 1, 1]
+    assert cp.Compose(cp.Int).apply_batch(np.array([2, 1], dtype=np.uint64)).tolist() == [2, 1]
@@ -0,0 +1,97 @@
+import pickle
+import pytest
+import compose as cp
+
+from unittest.mock import Mock, patch
+
+
+def test_cached():
+    func = Mock(name='func', side_effect=lambda x: x * 2)
+    f = cp.Cached(func)
+    assert [f(1), f(2), f(1), f(1)] == [2, 4, 2, 2]
+    assert func.call_count == 2
+    assert f.info() == cp.cache.CacheInfo(hits=2, misses=2, evictions=0, size=2, maxsize=128)
+
+
+def test_name():
+    assert repr(cp.Cached(int)) == 'cached(int)'
+    assert repr(cp.Str << (cp.Int << cp.IG('id')).cached()) == '<Compose: str,cached(<Compose: int,IG(id)>)>'
+
+
+def test_lru():
+    func = Mock(name='func', side_effect=str)
+    f = cp.Cached(func, maxsize=2)
+    for x in (1, 2, 1, 3, 1, 2):
+        f(x)
+    # 2 is evicted by 3, then 3 by 2
+    assert [c.args[0] for c in func.call_args_list] == [1, 2, 3, 2]
+    assert f.info() == cp.cache.CacheInfo(hits=2, misses=4, evictions=2, size=2, maxsize=2)
+
+
+@patch('compose.cache.monotonic')
+def test_ttl(mock_time):
+    func = Mock(name='func', side_effect=str)
+    f = cp.Cached(func, ttl=10)
+    mock_time.return_value = 100
+    f(1)
+    mock_time.return_value = 109
+    f(1)
+    assert func.call_count == 1
+    mock_time.return_value = 110
+    f(1)
+    assert func.call_count == 2
+    assert f.info() == cp.cache.CacheInfo(hits=1, misses=2, evictions=1, size=1, maxsize=128)
+
+
+def test_key():
+    func = Mock(name='func', side_effect=lambda x: int(x['item']['id']))
+    f = cp.Cached(func, key=cp.IG('item.id'))
+    assert f({'item': {'id': '5', 'v': 1}}) == 5
+    assert f({'item': {'id': '5', 'v': 2}}) == 5
+    assert func.call_count == 1
+
+
+def test_unhashable():
+    with pytest.raises(TypeError):
+        cp.Cached(len)([1])
+
+
+def test_exception_not_cached():
+    func = Mock(name='func', side_effect=[ValueError('x'), 7])
+    f = cp.Cached(func)
+    with pytest.raises(ValueError):
+        f(1)
+    assert f(1) == 7
+    assert f.info().size == 1
+
+
+def test_compose_cached():
+    f = (cp.Int << cp.IG('id')).cached(maxsize=None, key=cp.IG('id'))
+    assert isinstance(f, cp.Cached)
+    assert f({'id': '3'}) == 3
+    with pytest.raises(cp.ComposeError):
+        f({'id': 'x'})
+
+
+def test_clear():
+    f = cp.Cached(str)
+    f(1)
+    f.clear()
+    assert f.info() == cp.cache.CacheInfo(hits=0, misses=0, evictions=0, size=0, maxsize=128)
+
+
+def test_invalid(subtests):
+    with subtests.test('maxsize'):
+        with pytest.raises(ValueError, match='maxsize must be positive or None, got 0'):
+            cp.Cached(str, maxsize=0)
+    with subtests.test('key'):
+        with pytest.raises(ValueError, match='must be callable'):
+            cp.Cached(str, key='id')
+
+
+def test_pickle():
+    f = cp.Cached(int, maxsize=5, ttl=1.5, key=str)
+    f('1')
+    g = pickle.loads(pickle.dumps(f))
+    assert (g.func, g.maxsize, g.ttl, g.key) == (int, 5, 1.5, str)
+    assert g.info().size == 0
@@ -0,0 +1,69 @@
+import pytest
+import compose as cp
+
+from unittest.mock import Mock
+
+from .base import sentinel
+
+
+def test_compile_result():
+    f = cp.Sum << cp.Map(int) << cp.IG(1) << cp.IG('item.x')
+    g = f.compile()
+    arg = {'item': {'x': ['742', '153', '98'], 'f': 7}}
+    assert g(arg) == f(arg) == 9
+
+
+def test_compile_call_order():
+    value = sentinel.batch('x y z arg')
+    x = Mock(name='x', spec=cp.C, return_value=value.x)
+    y = Mock(name='y', spec=cp.C, return_value=value.y)
+    z = Mock(name='z', spec=cp.C, return_value=value.z)
+
+    f = cp.Compose(x, y, z).compile()
+    assert f(value.arg) is value.x
+    z.assert_called_once_with(value.arg)
+    y.assert_called_once_with(value.z)
+    x.assert_called_once_with(value.y)
+
+
+def test_compile_single():
+    assert cp.Compose(cp.Int).compile()('124') == 124
+
+
+def test_compile_error():
+    exc = RuntimeError('some runtime error')
+    v = sentinel.batch('arg z')
+    x = Mock(name='x', side_effect=exc)
+    z = Mock(name='z', return_value=v.z)
+    f = cp.Compose(cp.Str, x, z)
+
+    for func in (f, f.compile()):
+        with pytest.raises(cp.ComposeError) as excinfo:
+            func(v.arg)
+
+        assert excinfo.value.func is x
+        assert excinfo.value.arg is v.z
+        assert excinfo.value.origin is exc
+
+
+def test_compile_name():
+    f = cp.List << cp.Map(int)
+    assert f.compile().__name__ == '<Compose: list,map(int)>'
+    g = cp.List << cp.Filter(None)
+    assert g.compile().__name__ == '<Compose: list,filter(None)>'
+    assert g.compile()([0, 1, '', 'a']) == g([0, 1, '', 'a']) == [1, 'a']
+
+
+def test_compile_error_stage():
+    f = (cp.Int << cp.IG('item.id')).compile()
+    with pytest.raises(cp.ComposeError) as excinfo:
+        f({'item': {}})
+
+    assert repr(excinfo.value.func) == 'IG(id)'
+    assert excinfo.value.arg == {}
+    assert isinstance(excinfo.value.origin, KeyError)
+
+
+def test_compile_nested():
+    f = cp.Compose(cp.Int, cp.Compose(cp.IG(0), cp.Str)).compile()
+    assert f(57) == 5
@@ -6,7 +6,7 @@ import compose as cp
 from uuid import uuid4
 from unittest.mock import patch, MagicMock, Mock
 
-from .base import sentinel
+from .base import sentinel, NamedMock
 
 
 def test_create_other_other():
@@ -129,8 +129,9 @@ def test_call_result():
 def test_eq():
     a = cp.Compose(int)
     b = cp.Compose(str)
-    a.stack = MagicMock(name='stack.a')
-    b.stack = MagicMock(name='stack.b')
+    # bypass immutability
+    object.__setattr__(a, '_stack', MagicMock(name='stack.a'))
+    object.__setattr__(b, '_stack', MagicMock(name='stack.b'))
 
     a.stack.__eq__.return_value = True
     assert a == b
@@ -154,3 +155,72 @@ def test_pickle(subtests):
     for protocol in range(pickle.HIGHEST_PROTOCOL):
         with subtests.test(f"protocol={protocol}"):
             assert c == pickle.loads(pickle.dumps(c, protocol))
+
+
+def test_immutable(subtests):
+    c = cp.Compose(int)
+    with subtests.test('set'):
+        with pytest.raises(AttributeError, match='Compose is immutable'):
+            c.stack = (str,)
+    with subtests.test('del'):
+        with pytest.raises(AttributeError, match='Compose is immutable'):
+            del c.stack
+    with subtests.test('new'):
+        with pytest.raises(AttributeError):
+            c.value = 1
+    assert not hasattr(c, '__dict__')
+
+
+def test_hash():
+    a = cp.Int << cp.IG('x') << cp.P(max, 7)
+    b = cp.Int << cp.IG('x') << cp.P(max, 7)
+    assert a is not b
+    assert a == b
+    assert hash(a) == hash(b)
+    assert {a: 1}[b] == 1
+    assert len({a, b, cp.Str << cp.IG('x')}) == 2
+
+
+def test_hash_unhashable():
+    c = cp.Compose(cp.P(sorted, key=[]))
+    with pytest.raises(TypeError):
+        hash(c)
+
+
+def test_incremental():
+    stages = [cp.C(NamedMock(name=f"func.{i}", return_value=i)) for i in range(500)]
+    f = stages[0]
+    for stage in stages[1:]:
+        f = f << stage
+    g = stages[-1]
+    for stage in reversed(stages[:-1]):
+        g = stage << g
+    assert f._stack is None
+    assert repr(f) == repr(cp.Compose(*stages))
+    assert f.stack == g.stack == tuple(stages)
+    assert f._parts is None
+    assert f(None) == 0
+
+
+def test_incremental_nested():
+    a, b, c, d = (cp.C(NamedMock(name=f"func.{x}")) for x in 'abcd')
+    left, right = a << b, c << d
+    assert (left << right).stack == (a, b, c, d)
+    assert (right << left).stack == (c, d, a, b)
+    assert right.stack == (c, d)
+    assert (left << right).stack == (a, b, c, d)
+
+
+def test_incremental_snapshot():
+    a, b = cp.C(str), cp.C(int)
+    f = a << b
+    g = f << cp.Id
+    probed, _ = f.profile()
+    assert g.stack == (a, b, cp.Id)
+    assert f.stack == (a, b)
+    assert g('7') == probed('7') == '7'
+
+
+def test_pipeline_not_callable():
+    with pytest.raises(ValueError, match='All passed items must be callable, got 1 instead'):
+        cp.Compose.pipeline(cp.Id, 1)
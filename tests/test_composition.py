@@ -1,4 +1,5 @@
 import pickle
+import pytest
 import compose as cp
 
 from unittest.mock import patch, Mock, MagicMock
@@ -58,3 +59,32 @@ def test_pickle(subtests):
     for protocol in range(pickle.HIGHEST_PROTOCOL):
         with subtests.test(f"protocol={protocol}"):
             assert f == pickle.loads(pickle.dumps(f, protocol))
+
+
+def test_immutable():
+    f = cp.C(int)
+    with pytest.raises(AttributeError, match='C is immutable'):
+        f.func = str
+    assert not hasattr(f, '__dict__')
+
+
+def test_hash(subtests):
+    equal = [
+        (cp.C(int), cp.C(int)),
+        (cp.IG('a', 1), cp.IG('a', 1)),
+        (cp.AG('a.b'), cp.AG('a.b')),
+        (cp.P(sorted, reverse=True, key=abs), cp.P(sorted, key=abs, reverse=True)),
+        (cp.Map(int), cp.Map(int)),
+        (cp.Filter(cp.IG(0)), cp.Filter(cp.IG(0))),
+    ]
+    for a, b in equal:
+        with subtests.test(repr(a)):
+            assert a is not b
+            assert a == b
+            assert hash(a) == hash(b)
+
+
+def test_not_equal(subtests):
+    for a, b in [(cp.IG('a'), cp.AG('a')), (cp.Map(int), cp.Filter(int)), (cp.P(max, 1), cp.P(max, 2))]:
+        with subtests.test(repr(a)):
+            assert a != b
@@ -0,0 +1,103 @@
+import pickle
+import pytest
+import compose as cp
+
+ITEMS = ['1', 'x', '3', None]
+
+
+def test_map_skip():
+    f = cp.Map(int, on_error='skip')
+    assert isinstance(f, cp.OnError)
+    assert list(f(ITEMS)) == [1, 3]
+    assert f.dead_letters.counters() == {'skipped': 2, 'defaulted': 0, 'collected': 0}
+    assert not f.dead_letters
+
+
+def test_map_default():
+    f = cp.List << cp.Map(int, on_error='default', default=0)
+    assert f(ITEMS) == [1, 0, 3, 0]
+
+
+def test_map_collect():
+    dead_letters = cp.DeadLetters()
+    f = cp.Sum << cp.Map(cp.Int << cp.IG('x'), on_error='collect', dead_letters=dead_letters)
+    assert f([{'x': '1'}, {}, {'x': '2'}]) == 3
+    error, = dead_letters
+    assert isinstance(error, cp.ComposeError)
+    assert error.func == cp.Int << cp.IG('x')
+    assert error.arg == {}
+    # the cause reports the failed stage of the pipeline
+    assert repr(error.origin.func) == 'IG(x)'
+    assert dead_letters.skipped == dead_letters.collected == 1
+
+
+def test_map_raise():
+    f = cp.Map(int, on_error='raise')
+    assert type(f) is cp.Map
+    with pytest.raises(ValueError):
+        list(f(ITEMS))
+
+
+def test_source_errors():
+    def source():
+        yield '1'
+        raise OSError('disk')
+
+    with pytest.raises(OSError):
+        list(cp.Map(int, on_error='skip')(source()))
+
+
+def test_filter():
+    f = cp.Filter(lambda x: int(x) > 1, on_error='collect')
+    assert list(f(ITEMS)) == ['3']
+    assert [x.arg for x in f.dead_letters] == ['x', None]
+    assert list(cp.Filter(lambda x: int(x) > 1, on_error='default', default=True)(ITEMS)) == ['x', '3', None]
+
+
+def test_compose():
+    f = (cp.Int << cp.IG('x')).on_error('default', default=-1)
+    assert [f({'x': '1'}), f({}), f({'x': 'a'})] == [1, -1, -1]
+    assert f.dead_letters.defaulted == 2
+    with pytest.raises(cp.ComposeError) as info:
+        cp.OnError(cp.Int, 'raise')('a')
+    assert info.value.func is cp.Int
+
+
+def test_apply_batch():
+    f = cp.Int << cp.IG('x')
+    batch = [{'x': '1'}, {'x': 'a'}, {}, {'x': '4'}]
+    dead_letters = cp.DeadLetters(maxlen=1)
+    assert f.apply_batch(batch, on_error='skip') == [1, 4]
+    assert f.apply_batch(batch, on_error='default', default=0) == [1, 0, 0, 4]
+    assert f.apply_batch(batch, on_error='collect', dead_letters=dead_letters) == [1, 4]
+    assert dead_letters.collected == 2
+    # stage by stage: IG fails on {} before Int fails on 'a'
+    error, = dead_letters
+    assert error.func is cp.Int
+    assert error.arg == 'a'
+
+
+def test_apply_batch_stages():
+    f = cp.C(lambda x: 10 // x) << cp.Int
+    assert f.apply_batch(iter(['5', 'a', '0', '2', 'b']), on_error='default') == [2, None, None, 5, None]
+    with pytest.raises(cp.ComposeError):
+        f.apply_batch(['a'])
+
+
+def test_invalid():
+    with pytest.raises(ValueError, match="Unknown error policy 'ignore'"):
+        cp.Map(int, on_error='ignore')
+    with pytest.raises(ValueError, match='Unknown error policy'):
+        (cp.Int << cp.Str).apply_batch([], on_error='ignore')
+
+
+def test_eq_pickle():
+    dead_letters = cp.DeadLetters()
+    f = cp.Map(int, on_error='skip', dead_letters=dead_letters)
+    assert f == cp.Map(int, on_error='skip', dead_letters=dead_letters)
+    assert f != cp.Map(int, on_error='skip')
+    assert repr(f) == 'on_error(map(int),skip)'
+    list(f(ITEMS))
+    copy = pickle.loads(pickle.dumps(f))
+    assert list(copy(ITEMS)) == [1, 3]
+    assert copy.dead_letters.skipped == 4
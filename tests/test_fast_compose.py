@@ -0,0 +1,78 @@
+import pickle
+import pytest
+import compose as cp
+
+from unittest.mock import Mock
+
+from .base import sentinel
+
+
+def test_call():
+    f = cp.FastCompose(cp.Sum, cp.Map(int), cp.Str)
+    assert repr(f) == "<FastCompose: sum,map(int),str>"
+    assert f(763) == 16
+
+
+def test_filter_none():
+    f = cp.FastCompose(cp.List, cp.Filter(None))
+    assert repr(f) == "<FastCompose: list,filter(None)>"
+    assert f([0, 1, None, 2]) == [1, 2]
+
+
+def test_pipeline_keeps_class(subtests):
+    fast = cp.FastCompose(cp.Int)
+    for f in (
+        fast << cp.IG('id'),
+        cp.Str << fast,
+        fast << cp.Compose(cp.IG('id')),
+        cp.Compose(cp.Str) << fast,
+    ):
+        with subtests.test(repr(f)):
+            assert isinstance(f, cp.FastCompose)
+
+
+def test_error(subtests):
+    exc = RuntimeError('some runtime error')
+    v = sentinel.batch('arg z')
+    x = Mock(name='x', side_effect=exc)
+    z = Mock(name='z', return_value=v.z)
+    f = cp.FastCompose(cp.Str, x, z)
+
+    with pytest.raises(cp.ComposeError) as excinfo:
+        f(v.arg)
+
+    assert excinfo.value.func is x
+    assert excinfo.value.arg is v.z
+    assert excinfo.value.origin is exc
+    # stages are not replayed
+    z.assert_called_once_with(v.arg)
+    x.assert_called_once_with(v.z)
+
+
+def test_error_first_stage():
+    f = cp.FastCompose(cp.Int) << cp.IG('item.id')
+    with pytest.raises(cp.ComposeError) as excinfo:
+        f({})
+
+    assert repr(excinfo.value.func) == 'IG(item)'
+    assert excinfo.value.arg == {}
+
+
+def test_error_last_stage():
+    f = cp.FastCompose(cp.Int) << cp.IG('item.id')
+    with pytest.raises(cp.ComposeError) as excinfo:
+        f({'item': {'id': 'x'}})
+
+    assert excinfo.value.func is cp.Int
+    assert excinfo.value.arg == 'x'
+    assert isinstance(excinfo.value.origin, ValueError)
+
+
+def test_pickle(subtests):
+    f = cp.FastCompose(round, float)
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        with subtests.test(f"protocol={protocol}"):
+            g = pickle.loads(pickle.dumps(f, protocol))
+            assert isinstance(g, cp.FastCompose)
+            assert g == f
+            assert g('2.6') == 3
@@ -0,0 +1,121 @@
+import pickle
+import pytest
+import compose as cp
+
+from itertools import count
+from unittest.mock import Mock
+
+
+def test_fork():
+    f = cp.Fork(cp.Sum << cp.Map(int), cp.Set << cp.Map(len), cp.C(max) << cp.Map(int))
+    assert f(iter(['1', '22', '3', '44'])) == (70, {1, 2}, 44)
+
+
+def test_single_pass():
+    source = Mock(side_effect=['1', '2', '3'])
+    items = iter(lambda: source() if source.call_count < 3 else None, None)
+    assert cp.Fork(cp.Sum << cp.Map(int), cp.List)(items) == (6, ['1', '2', '3'])
+    assert source.call_count == 3
+
+
+def test_lockstep():
+    calls = []
+    a = cp.C(lambda x: calls.append(('a', x)) or x)
+    b = cp.C(lambda x: calls.append(('b', x)) or x)
+    cp.Fork(cp.List << cp.Map(a), cp.List << cp.Map(b))([1, 2])
+    assert calls == [('a', 1), ('b', 1), ('a', 2), ('b', 2)]
+
+
+def test_stages():
+    items = [0, 1, 2, 3, 4]
+    results = cp.Fork(
+        cp.List << cp.Take(2) << cp.Filter(None),
+        cp.C(tuple) << cp.Skip(3),
+        cp.List << cp.TakeWhile(lambda x: x < 2),
+        cp.List << cp.DropWhile(lambda x: x < 3),
+        cp.List << cp.Scan(lambda a, b: a + b, 0),
+        cp.Dict << cp.Map(lambda x: (x, -x)) << cp.FlatMap(range),
+        cp.Set << cp.Compose(cp.Map(abs), cp.Map(lambda x: x - 2)),
+        cp.C(frozenset),
+        cp.C(min),
+    )(items)
+    assert results == (
+        [1, 2],
+        (3, 4),
+        [0, 1],
+        [3, 4],
+        [0, 1, 3, 6, 10],
+        {0: 0, 1: -1, 2: -2, 3: -3},
+        {0, 1, 2},
+        frozenset(items),
+        0,
+    )
+
+
+def test_early_stop():
+    items = count()
+    assert cp.Fork(cp.List << cp.Take(3), cp.C(any) << cp.Map(lambda x: x > 5))(items) == ([0, 1, 2], True)
+    # 0..6 are read, 6 decides `any`
+    assert next(items) == 7
+    assert cp.Fork(cp.C(all), cp.C(any))([]) == (True, False)
+    items = iter([1, 2])
+    assert cp.Fork(cp.List << cp.Take(0))(items) == ([],)
+    assert next(items) == 1
+
+
+def test_nested():
+    f = cp.Fork(
+        cp.List << cp.Take(3) << cp.FlatMap(range),
+        cp.List << cp.FlatMap(range) << cp.Take(2),
+        cp.Sum << cp.Filter(None) << cp.FlatMap(range) << cp.Skip(1),
+    )
+    assert f(iter([2, 3, 1])) == ([0, 1, 0], [0, 1, 0, 1, 2], 3)
+
+    def pair(x):
+        return [x, x * 10]
+
+    def shifted(x):
+        return [x, x + 100]
+
+    pipelines = (
+        cp.List << cp.FlatMap(pair) << cp.FlatMap(shifted),
+        cp.List << cp.Take(5) << cp.FlatMap(pair) << cp.FlatMap(shifted),
+    )
+    assert cp.Fork(*pipelines)(iter([1, 2])) == tuple(f([1, 2]) for f in pipelines)
+    assert pipelines[0]([1, 2]) == [1, 10, 101, 1010, 2, 20, 102, 1020]
+
+
+def test_error():
+    with pytest.raises(cp.ComposeError) as info:
+        cp.Fork(cp.List, cp.Sum << cp.Map(int))(['1', 'x'])
+    assert info.value.func == cp.Map(int)
+    assert info.value.arg == 'x'
+
+    def failing(n):
+        yield n
+        raise KeyError(n)
+
+    with pytest.raises(cp.ComposeError) as info:
+        cp.Fork(cp.List << cp.FlatMap(failing))([3])
+    assert (info.value.func, info.value.arg) == (cp.FlatMap(failing), 3)
+    assert isinstance(info.value.origin, KeyError)
+    with pytest.raises(cp.ComposeError) as info:
+        cp.Fork(cp.C(max))([])
+    assert isinstance(info.value.origin, ValueError)
+
+
+def test_invalid():
+    with pytest.raises(ValueError, match='len cannot be fed by Fork, expected one of sum, list'):
+        cp.Fork(cp.C(len))
+    with pytest.raises(ValueError, match=r'window\(2,1\) cannot be fed by Fork'):
+        cp.Fork(cp.List << cp.Window(2))
+    with pytest.raises(TypeError):
+        cp.Fork()
+
+
+def test_name_pickle():
+    f = cp.Fork(cp.Sum << cp.Map(int), cp.List)
+    assert repr(f) == 'fork(<Compose: sum,map(int)>,list)'
+    copy = pickle.loads(pickle.dumps(f))
+    assert copy == f
+    assert copy(['1', '2']) == (3, ['1', '2'])
@@ -0,0 +1,48 @@
+import gc
+import pytest
+import compose as cp
+
+
+@pytest.fixture
+def interning():
+    cp.set_interning(True)
+    yield
+    cp.set_interning(False)
+
+
+def test_disabled():
+    assert cp.IG('item.id') is not cp.IG('item.id')
+    assert (cp.Int << cp.IG('x')) is not (cp.Int << cp.IG('x'))
+
+
+def test_dotted_getter(interning):
+    assert cp.IG('item.id') is cp.IG('item.id')
+
+
+def test_pipeline(interning):
+    a = cp.Int << cp.IG('x')
+    assert a is cp.Int << cp.IG('x')
+    assert a is not cp.Str << cp.IG('x')
+
+
+def test_class(interning):
+    assert type(cp.FastCompose(cp.Int) << cp.IG('x')) is cp.FastCompose
+    assert type(cp.Int << cp.IG('x')) is cp.Compose
+
+
+def test_intern():
+    a, b = cp.Compose(cp.Int, cp.IG('y')), cp.Compose(cp.Int, cp.IG('y'))
+    assert cp.intern(a) is a
+    assert cp.intern(b) is a
+
+
+def test_intern_unhashable():
+    c = cp.Compose(cp.P(sorted, key=[]))
+    assert cp.intern(c) is c
+
+
+def test_weak():
+    key = (cp.Compose, (cp.Int, cp.IG('weak')))
+    cp.intern(cp.Compose(cp.Int, cp.IG('weak')))
+    gc.collect()
+    assert key not in cp._interned
@@ -0,0 +1,89 @@
+import gc
+import os
+import pickle
+import pytest
+import compose as cp
+
+from compose import io
+
+
+@pytest.fixture
+def csv(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_bytes(b'a,1,x\r\nb,2,y\nc,3,z')
+    return str(path)
+
+
+def test_lines(csv):
+    lines = list(io.read_lines(False, csv))
+    assert all(isinstance(x, memoryview) for x in lines)
+    assert [bytes(x) for x in lines] == [b'a,1,x', b'b,2,y', b'c,3,z']
+    assert [bytes(x) for x in io.Lines(keepends=True)(csv)] == [b'a,1,x\r\n', b'b,2,y\n', b'c,3,z']
+
+
+def test_lines_empty(tmp_path):
+    path = tmp_path / 'empty'
+    path.write_bytes(b'')
+    assert list(io.Lines()(str(path))) == []
+    path.write_bytes(b'\n\nx\n')
+    assert [bytes(x) for x in io.Lines()(str(path))] == [b'', b'', b'x']
+
+
+def test_file_descriptor(csv):
+    fd = os.open(csv, os.O_RDONLY)
+    try:
+        assert [bytes(x) for x in io.Lines()(fd)] == [b'a,1,x', b'b,2,y', b'c,3,z']
+        # the descriptor is not closed
+        assert os.fstat(fd).st_size == 18
+    finally:
+        os.close(fd)
+
+
+def test_views_outlive_reader(csv):
+    lines = list(io.Lines()(csv))
+    gc.collect()
+    assert bytes(lines[-1]) == b'c,3,z'
+
+
+def test_records(tmp_path):
+    path = tmp_path / 'data.bin'
+    path.write_bytes(bytes(range(12)))
+    assert [bytes(x) for x in io.Records(4)(str(path))] == [bytes(range(i, i + 4)) for i in (0, 4, 8)]
+    with pytest.raises(ValueError, match='not a multiple of the record size 5'):
+        list(io.Records(5)(str(path)))
+    with pytest.raises(ValueError, match='size must be positive'):
+        io.Records(0)
+
+
+def test_split_decode(csv):
+    f = cp.List << cp.Map(cp.Int << cp.IG(0) << io.Split(fields=[1])) << io.Lines()
+    assert f(csv) == [1, 2, 3]
+    f = cp.List << cp.Map(io.Decode() << cp.IG(2) << io.Split(b',')) << io.Lines()
+    assert f(csv) == ['x', 'y', 'z']
+    with pytest.raises(IndexError, match=r'Record has 3 fields, fields \(5,\) expected'):
+        io.Split(fields=[5])(b'a,b,c')
+    with pytest.raises(ValueError, match='Empty separator'):
+        io.Split(b'')
+
+
+def test_readers(csv, tmp_path):
+    assert list(io.read_delimited(csv, fields=[2, 0])) == [[b'x', b'a'], [b'y', b'b'], [b'z', b'c']]
+    path = tmp_path / 'fixed.txt'
+    path.write_bytes(b'  1abc\n 22de \n')
+    assert list(io.read_fixed(str(path), (3, 3))) == [[b'  1', b'abc'], [b' 22', b'de ']]
+    with pytest.raises(ValueError, match='Record has 2 bytes, 6 expected'):
+        io.Columns((3, 3))(b'ab')
+
+
+def test_decode():
+    assert io.Decode()(memoryview('żółw'.encode())) == 'żółw'
+    assert io.Decode('ascii', 'replace')(b'a\xff') == 'a�'
+
+
+def test_name_pickle():
+    stages = [io.Lines(), io.Records(8), io.Split(b';', [1]), io.Columns((2, 3)), io.Decode('latin-1')]
+    assert list(map(repr, stages)) == [
+        'lines(False)', 'records(8)', "split(b';',(1,))", 'columns((2, 3))', "decode('latin-1','strict')",
+    ]
+    for stage in stages:
+        assert pickle.loads(pickle.dumps(stage)) == stage
@@ -0,0 +1,65 @@
+import pickle
+import pytest
+import compose as cp
+
+from types import MappingProxyType, SimpleNamespace
+
+
+def test_missing():
+    f = cp.Opt(cp.Int << cp.IG('item.id'))
+    assert f({'item': {'id': '7'}}) == 7
+    missing = (
+        {'item': {}}, {}, {'item': None}, {'item': {'id': None}}, None, {'item': ['id']}, {'item': 'id'},
+    )
+    for arg in missing:
+        assert f(arg) is None
+    assert (cp.Int << cp.IG('item.id')).optional(-1)({}) == -1
+
+
+def test_getters():
+    obj = SimpleNamespace(a=SimpleNamespace(b=[1, 2]), c=None)
+    assert cp.Opt(cp.IG(-1) << cp.AG('a.b'))(obj) == 2
+    assert cp.Opt(cp.IG(2) << cp.AG('a.b'))(obj) is None
+    assert cp.Opt(cp.AG('c.d'))(obj) is None
+    assert cp.Opt(cp.AG('x'), 0)(obj) == 0
+    assert cp.Opt(cp.PG('x.0.@real'))({'x': (5,)}) == 5
+    assert cp.Opt(cp.PG('x.1.@real'))({'x': (5,)}) is None
+    assert cp.Opt(cp.PG('x.2020'))({'x': {'2020': 1}}) == 1
+    # wildcard paths are called as a whole
+    assert cp.Opt(cp.PG('x.*.y'))({'x': [{'y': 1}]}) == [1]
+    assert cp.Opt(cp.IG(1))('ab') == 'b'
+    assert cp.Opt(cp.IG(5))('ab') is None
+
+
+def test_get_attribute():
+    class Row(list):
+        def get(self, key):
+            raise AssertionError('not a mapping')
+
+    f = cp.Opt(cp.IG(0) << cp.IG('rows'))
+    assert f({'rows': Row([1])}) == 1
+    assert f({'rows': Row()}) is None
+    assert cp.Opt(cp.IG('x'))(MappingProxyType({'x': 1})) == 1
+
+
+def test_errors():
+    f = cp.Opt(cp.Int << cp.IG('id'))
+    with pytest.raises(cp.ComposeError) as info:
+        f({'id': 'x'})
+    assert (info.value.func, info.value.arg) == (cp.Int, 'x')
+    with pytest.raises(ValueError):
+        cp.Opt(1)
+
+
+def test_nested():
+    f = cp.Opt(cp.Sum << cp.Map(cp.Opt(cp.Int << cp.IG('v'), 0)) << cp.IG('items'))
+    assert f({'items': [{'v': '1'}, {}, {'v': '2'}]}) == 3
+    assert f({}) is None
+
+
+def test_name_pickle():
+    f = cp.Opt(cp.Int << cp.IG('id'), 0)
+    assert repr(f) == "opt(<Compose: int,IG(id)>,0)"
+    assert repr(cp.Opt(cp.IG('id'))) == "opt(IG(id))"
+    assert pickle.loads(pickle.dumps(f)) == f
+    assert f != cp.Opt(cp.Int << cp.IG('id'))
@@ -0,0 +1,75 @@
+import pickle
+import random
+import pytest
+import compose as cp
+
+ROWS = [{'id': x, 'score': str(x * 7919 % 100)} for x in range(200)]
+SCORE = cp.Int << cp.IG('score')
+
+
+def counting(calls):
+    def key(row):
+        calls.append(row)
+        return int(row['score'])
+    return key
+
+
+@pytest.mark.parametrize('k', [0, 1, 10, 500])
+def test_top_bottom(k):
+    def score(x):
+        return int(x['score'])
+
+    assert cp.TopK(k, key=SCORE)(iter(ROWS)) == sorted(ROWS, key=score, reverse=True)[:k]
+    assert cp.BottomK(k, key=SCORE)(iter(ROWS)) == sorted(ROWS, key=score)[:k]
+    assert (cp.TopK(k) << cp.Map(SCORE))(ROWS) == sorted(map(score, ROWS), reverse=True)[:k]
+
+
+def test_sort_by():
+    random.seed(0)
+    items = [random.randint(0, 9) for _ in range(100)]
+    assert cp.SortBy()(iter(items)) == sorted(items)
+    # stable, ties keep their order
+    assert cp.SortBy(SCORE, reverse=True)(ROWS) == sorted(ROWS, key=lambda x: int(x['score']), reverse=True)
+
+
+@pytest.mark.parametrize('stage', [
+    lambda key: cp.TopK(5, key=key),
+    lambda key: cp.BottomK(5, key=key),
+    lambda key: cp.SortBy(key),
+    lambda key: cp.List << cp.MergeSorted(cp.IG(slice(0, 100)), cp.IG(slice(100, None)), key=key),
+])
+def test_key_once(stage):
+    calls = []
+    stage(counting(calls))(ROWS)
+    # merge does not need the keys of the last remaining stream
+    assert len({row['id'] for row in calls}) == len(calls) > len(ROWS) // 2
+
+
+def test_merge_sorted():
+    f = cp.MergeSorted(cp.IG('a'), cp.IG('b'), key=cp.Int)
+    assert list(f({'a': ['1', '5', '10'], 'b': ['2', '30']})) == ['1', '2', '5', '10', '30']
+    assert list(cp.MergeSorted(reverse=True)([[5, 1], [4, 3, 2]])) == [5, 4, 3, 2, 1]
+    assert list(cp.MergeSorted()([])) == []
+
+
+def test_errors():
+    with pytest.raises(ValueError, match='k must be'):
+        cp.TopK(-1)
+    with pytest.raises(ValueError, match='key'):
+        cp.SortBy('score')
+    with pytest.raises(ValueError):
+        cp.MergeSorted(1)
+    with pytest.raises(cp.ComposeError):
+        cp.TopK(2, key=SCORE)([{'score': 'x'}, {'score': '1'}])
+
+
+def test_name_pickle():
+    assert repr(cp.TopK(10, key=SCORE)) == "top_k(10,<Compose: int,IG(score)>)"
+    assert repr(cp.SortBy()) == "sort_by()"
+    assert repr(cp.MergeSorted(cp.IG('a'), key=cp.Int, reverse=True)) == "merge_sorted(IG(a),key=int,reverse)"
+    stages = (
+        cp.TopK(3, key=SCORE), cp.BottomK(2), cp.SortBy(SCORE, True), cp.MergeSorted(cp.IG('a'), key=cp.Int),
+    )
+    for f in stages:
+        assert pickle.loads(pickle.dumps(f)) == f
+    assert cp.TopK(3) != cp.BottomK(3)
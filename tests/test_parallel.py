@@ -0,0 +1,104 @@
+import pickle
+import pytest
+import compose as cp
+
+from compose.parallel import ParallelMap, SharedMemory
+
+
+def checksum(data):
+    return sum(data[::997])
+
+
+def total(array):
+    return int(array.sum())
+
+
+@pytest.fixture
+def pmap():
+    instances = []
+
+    def factory(*args, **kwargs):
+        instances.append(ParallelMap(*args, **kwargs))
+        return instances[-1]
+
+    yield factory
+    for instance in instances:
+        instance.close()
+
+
+def test_ordered(pmap):
+    f = cp.List << pmap(abs, workers=2, chunksize=3)
+    assert repr(f) == '<Compose: list,parallel_map(abs)>'
+    assert f(range(-10, 10)) == [abs(x) for x in range(-10, 10)]
+
+
+def test_unordered(pmap):
+    f = pmap(abs, workers=2, chunksize=2, ordered=False)
+    assert sorted(f(range(-10, 10))) == sorted(abs(x) for x in range(-10, 10))
+
+
+def test_lazy(pmap):
+    f = pmap(abs, workers=1, chunksize=2)
+    items = iter(range(100))
+    assert next(f(items)) == 0
+    # two chunks in flight
+    assert next(items) == 4
+
+
+@pytest.mark.skipif(SharedMemory is None, reason='shared_memory is not available')
+def test_shared_bytes(pmap):
+    data = [bytes([x]) * 50000 for x in range(10)]
+    f = pmap(checksum, workers=2, chunksize=4)
+    assert list(f(data)) == list(map(checksum, data))
+
+
+@pytest.mark.skipif(SharedMemory is None, reason='shared_memory is not available')
+def test_shared_arrays(pmap):
+    np = pytest.importorskip('numpy')
+    data = [np.full((100, 100), x, dtype='i4') for x in range(10)]
+    f = pmap(total, workers=2, chunksize=4)
+    assert list(f(data)) == list(map(total, data))
+
+
+def test_error(pmap):
+    f = pmap(int, workers=2, chunksize=2)
+    results = f(['1', '2', '3', 'x', '5'])
+    assert [next(results) for _ in range(3)] == [1, 2, 3]
+    with pytest.raises(cp.ComposeError) as excinfo:
+        next(results)
+    assert (excinfo.value.func, excinfo.value.arg) == (int, 'x')
+    assert isinstance(excinfo.value.origin, ValueError)
+
+
+@pytest.mark.skipif(SharedMemory is None, reason='shared_memory is not available')
+def test_dump_error_releases(monkeypatch):
+    np = pytest.importorskip('numpy')
+    from compose import parallel
+
+    names = []
+
+    class Recorded(SharedMemory):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            names.append(self.name)
+
+    def fail(item):
+        raise ValueError('not viewable')
+
+    monkeypatch.setattr(parallel, 'SharedMemory', Recorded)
+    monkeypatch.setattr(np, 'ascontiguousarray', fail)
+    with pytest.raises(ValueError):
+        parallel._dump([np.zeros(parallel.SHARED_THRESHOLD, 'u1')])
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(names[0])
+
+
+def test_chunksize():
+    with pytest.raises(ValueError, match='chunksize must be positive, got 0'):
+        ParallelMap(abs, chunksize=0)
+
+
+def test_pickle():
+    f = ParallelMap(abs, workers=3, chunksize=5, ordered=False)
+    g = pickle.loads(pickle.dumps(f))
+    assert (g.func, g.workers, g.chunksize, g.ordered) == (abs, 3, 5, False)
@@ -0,0 +1,95 @@
+import pickle
+import pytest
+import compose as cp
+
+from types import SimpleNamespace
+
+DATA = {
+    'items': [
+        {'id': 1, 'owner': SimpleNamespace(name='a')},
+        {'id': 2, 'owner': SimpleNamespace(name='b')},
+    ],
+    'index': {'x': {'id': 3}, 'y': {'id': 4}},
+}
+
+
+def test_path(subtests):
+    for path, expected in [
+        ('items', DATA['items']),
+        ('items.0.id', 1),
+        ('items.-1.owner.@name', 'b'),
+        ('items.*.id', [1, 2]),
+        ('items.*.owner.@name', ['a', 'b']),
+        ('index.*.id', [3, 4]),
+        ('index.*', [{'id': 3}, {'id': 4}]),
+        ('items.*.owner.@name.*', [['a'], ['b']]),
+    ]:
+        with subtests.test(path=path):
+            assert cp.PG(path)(DATA) == expected
+
+
+def test_digit_keys():
+    data = {'years': {'2020': 'a', 7: 'b'}, 'rows': ({'0': 'c'},), 'text': 'xyz'}
+    assert cp.PG('years.2020')(data) == 'a'
+    assert cp.PG('years.7')(data) == 'b'
+    assert cp.PG('rows.0.0')(data) == 'c'
+    assert cp.PG('text.-1')(data) == 'z'
+    assert cp.PG('years.2021', default=None)(data) is None
+    with pytest.raises(cp.PathError) as info:
+        cp.PG('years.2021')(data)
+    assert info.value.segment == '2021'
+    assert isinstance(info.value.__cause__, KeyError)
+
+
+def test_error(subtests):
+    for path, index, obj, cause in [
+        ('items.5.id', 1, DATA['items'], IndexError),
+        ('items.0.key', 2, DATA['items'][0], KeyError),
+        ('items.*.owner.@age', 3, DATA['items'][0]['owner'], AttributeError),
+        ('index.*.id.*', 3, 3, TypeError),
+    ]:
+        with subtests.test(path=path):
+            with pytest.raises(cp.PathError) as info:
+                cp.PG(path)(DATA)
+            assert info.value.index == index
+            assert info.value.segment == path.split('.')[index]
+            assert info.value.obj is obj
+            assert isinstance(info.value.__cause__, cause)
+
+
+def test_error_message():
+    with pytest.raises(cp.ComposeError) as info:
+        (cp.Int << cp.PG('items.0.key'))(DATA)
+    assert str(info.value.origin) == "'items.0.key': cannot get 'key' from dict"
+
+
+def test_default():
+    assert cp.PG('items.5.id', default=None)(DATA) is None
+    assert cp.PG('items.*.owner.@age', default=0)(DATA) == [0, 0]
+    assert cp.PG('items.0.id', default=0)(DATA) == 1
+    assert cp.PG('items.0.id', default=0)(None) == 0
+
+
+def test_invalid():
+    for path in ('', 'a..b', 'a.@'):
+        with pytest.raises(ValueError, match='Empty segment'):
+            cp.PG(path)
+
+
+def test_name():
+    assert repr(cp.PG('items.*.id')) == 'PG(items.*.id)'
+    assert repr(cp.Int << cp.PG('a.b', default=1)) == '<Compose: int,PG(a.b,default=1)>'
+
+
+def test_equal_and_pickle():
+    assert cp.PG('a.0') == cp.PG('a.0')
+    assert cp.PG('a.0') != cp.PG('a.0', default=None)
+    for f in (cp.PG('items.*.id'), cp.PG('items.5.id', default=None)):
+        g = pickle.loads(pickle.dumps(f))
+        assert g == f
+        assert g(DATA) == f(DATA)
+
+
+def test_compiled():
+    f = (cp.Int << cp.PG('a.b')).compile()
+    assert f({'a': {'b': '5'}}) == 5
@@ -0,0 +1,54 @@
+import pickle
+import compose as cp
+
+
+def _roundtrip(obj, subtests):
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        with subtests.test(f"protocol={protocol}"):
+            data = pickle.dumps(obj, protocol)
+            yield pickle.loads(data), data
+
+
+def test_item_getter(subtests):
+    f = cp.IG(1, 2)
+    for g, data in _roundtrip(f, subtests):
+        assert isinstance(g, cp.IG)
+        assert g.args == (1, 2)
+        assert g('abc') == ('b', 'c')
+        assert b'itemgetter' not in data
+
+
+def test_attr_getter(subtests):
+    f = cp.AG('real')
+    for g, _ in _roundtrip(f, subtests):
+        assert g.args == ('real',)
+        assert g(5) == 5
+
+
+def test_deep_getter(subtests):
+    f = cp.Int << cp.IG('item.id')
+    for g, _ in _roundtrip(f, subtests):
+        assert repr(g) == repr(f)
+        assert g({'item': {'id': '7'}}) == 7
+
+
+def test_partial(subtests):
+    f = cp.P(sorted, reverse=True)
+    for g, _ in _roundtrip(f, subtests):
+        assert isinstance(g, cp.P)
+        assert g([2, 3, 1]) == [3, 2, 1]
+
+
+def test_iter(subtests):
+    for f in (cp.Map(int), cp.Filter(bool), cp.SetMap(int)):
+        for g, _ in _roundtrip(f, subtests):
+            assert type(g) is type(f)
+            assert repr(g) == repr(f)
+
+
+def test_compose_error(subtests):
+    exc = cp.ComposeError(cp.Int, 'x')
+    exc.__cause__ = ValueError('x')
+    for e, _ in _roundtrip(exc, subtests):
+        assert repr(e) == repr(exc)
+        assert isinstance(e.origin, ValueError)
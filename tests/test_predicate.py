@@ -0,0 +1,93 @@
+import pickle
+import pytest
+import compose as cp
+
+from time import sleep
+from unittest.mock import Mock
+
+
+def predicate(name, func):
+    mock = Mock(name=name, side_effect=func)
+    mock.__name__ = name
+    return cp.C(mock)
+
+
+def test_operators():
+    even, positive = cp.C(lambda x: x % 2 == 0), cp.C(lambda x: x > 0)
+    assert [x for x in range(-3, 4) if (even & positive)(x)] == [2]
+    assert [x for x in range(-3, 4) if (even | positive)(x)] == [-2, 0, 1, 2, 3]
+    assert [x for x in range(-3, 4) if (~even)(x)] == [-3, -1, 1, 3]
+    assert list(cp.Filter(even & ~positive)(range(-3, 4))) == [-2, 0]
+
+
+def test_short_circuit():
+    p, q = predicate('p', lambda x: x > 1), predicate('q', lambda x: x > 2)
+    assert [(p & q)(x) for x in range(4)] == [False, False, False, True]
+    assert q.func.call_count == 2
+    assert [(p | q)(x) for x in range(4)] == [False, False, True, True]
+    assert q.func.call_count == 4
+
+
+def test_flatten():
+    p, q, r = (predicate(x, bool) for x in 'pqr')
+    assert (p & q & r).predicates == (p, q, r)
+    assert (p | q | r).predicates == (p, q, r)
+    assert repr(p & (q | r)) == 'p&(q|r)'
+    assert repr(cp.Filter(~(p & q))) == 'filter(~(p&q))'
+
+
+def test_adaptive():
+    slow = predicate('slow', lambda x: sleep(0.0005) or x % 2 == 0)
+    fast = predicate('fast', lambda x: x % 10 == 0)
+    f = cp.And(slow, fast, adaptive=True, sample=20)
+    assert f.order == (slow, fast)
+    assert [x for x in range(100) if f(x)] == list(range(0, 100, 10))
+    assert f.order == (fast, slow)
+    stats = f.stats()
+    assert [x['predicate'] for x in stats] == ['fast', 'slow']
+    assert [(x['calls'], x['passed']) for x in stats] == [(20, 2), (20, 10)]
+    assert stats[1]['cost'] > stats[0]['cost']
+    # after sampling slow is called only for multiples of 10
+    assert slow.func.call_count == 20 + 8
+
+    f.reset()
+    assert f.order == (slow, fast)
+    assert f.stats()[0]['calls'] == 0
+
+
+def test_adaptive_or():
+    slow = predicate('slow', lambda x: sleep(0.0005) or x % 10 == 0)
+    fast = predicate('fast', lambda x: x % 2 == 0)
+    f = cp.Or(slow, fast, adaptive=True, sample=10)
+    assert [x for x in range(20) if not f(x)] == list(range(1, 20, 2))
+    assert f.order == (fast, slow)
+
+
+def test_adaptive_errors():
+    guard = predicate('guard', lambda x: x is not None)
+    length = predicate('length', lambda x: len(x) > 1)
+    f = cp.And(guard, length, adaptive=True, sample=4)
+    assert [f(x) for x in (None, 'ab', None, 'a')] == [False, True, False, False]
+    # errors after the decision do not count as rejections
+    assert f.order == (guard, length)
+    with pytest.raises(TypeError):
+        cp.And(length, guard, adaptive=True)(None)
+
+
+def test_invalid():
+    with pytest.raises(TypeError, match='And expected at least 1 argument, got 0'):
+        cp.And()
+    with pytest.raises(ValueError, match='must be callable'):
+        cp.Or(cp.Id, 1)
+    with pytest.raises(ValueError, match='sample must be positive'):
+        cp.And(cp.Id, sample=0)
+
+
+def test_equal_and_pickle():
+    p, q = cp.C(bool), cp.C(callable)
+    assert p & q == cp.And(p, q)
+    assert p & q != p | q
+    for f in (p & q, cp.Or(p, q, adaptive=True, sample=5), ~p):
+        g = pickle.loads(pickle.dumps(f))
+        assert g == f
+        assert g(0) == f(0)
@@ -0,0 +1,126 @@
+import asyncio
+import pytest
+import compose as cp
+
+from unittest.mock import patch
+
+from compose.aio import AMap
+
+
+async def tenfold(x):
+    return x * 10
+
+
+async def wrap(x):
+    return [x]
+
+
+def test_profile():
+    f, profile = (cp.Sum << cp.Map(int) << cp.IG('a')).profile()
+    assert f({'a': '123'}) == 6
+    assert f({'a': '45'}) == 9
+
+    stats = profile.as_dict()
+    assert list(stats) == ['sum', 'map(int)', 'IG(a)']
+    assert [stats[x]['calls'] for x in stats] == [2, 2, 2]
+    assert stats['map(int)']['items'] == 5
+    assert stats['sum']['items'] == 0
+    assert all(stats[x]['errors'] == 0 for x in stats)
+
+
+def test_copy():
+    f = cp.FastCompose(cp.Int) << cp.IG('a')
+    stack = f.stack
+    probed, profile = f.profile()
+    assert isinstance(probed, cp.FastCompose)
+    assert all(isinstance(x, cp.profiling.Probe) for x in probed.stack)
+    assert probed({'a': '7'}) == f({'a': '7'}) == 7
+    assert f.stack == stack
+    assert all(not isinstance(x, cp.profiling.Probe) for x in f.stack)
+    assert profile.stages['int'].calls == 1
+
+
+def test_interned():
+    cp.set_interning(True)
+    try:
+        f, g = cp.Int << cp.IG('a'), cp.Int << cp.IG('a')
+        assert f is g
+        probed, profile = f.profile()
+        g({'a': '1'})
+        assert profile.stages['int'].calls == 0
+        probed({'a': '1'})
+        assert profile.stages['int'].calls == 1
+    finally:
+        cp.set_interning(False)
+
+
+def test_errors():
+    f, profile = (cp.Int << cp.IG('a')).profile()
+    with pytest.raises(cp.ComposeError) as excinfo:
+        f({})
+
+    assert repr(excinfo.value.func) == 'IG(a)'
+    stats = profile.as_dict()
+    assert stats['IG(a)']['errors'] == 1
+    assert stats['int']['calls'] == 0
+
+
+def test_exclusive_time():
+    ticks = iter(range(100))
+    f, profile = (cp.List << cp.Map(int)).profile()
+    with patch('compose.profiling.perf_counter', side_effect=lambda: next(ticks)):
+        f('12')
+
+    stats = profile.stages
+    # map: 0..1 (call), list: 2..9, items: 3..4, 5..6, 7..8 (StopIteration)
+    assert list(stats['map(int)'].times) == [1]
+    assert stats['map(int)'].iter_time == 3
+    assert stats['map(int)'].items == 2
+    assert list(stats['list'].times) == [7 - 3]
+
+
+def test_shared_profile():
+    profile = cp.Profile()
+    (f, _), (g, _) = (cp.Int << cp.IG('a')).profile(profile), (cp.Str << cp.IG('a')).profile(profile)
+    f({'a': 1})
+    g({'a': 1})
+    assert profile.stages['IG(a)'].calls == 2
+
+
+def test_async():
+    f, profile = (cp.List << AMap(tenfold) << cp.C(wrap)).profile()
+    assert asyncio.run(f(1)) == [10]
+    stats = profile.as_dict()
+    assert stats['wrap']['calls'] == 1
+    assert stats['amap(tenfold)']['calls'] == 1
+
+
+def test_async_concurrent():
+    async def sleep(x):
+        await asyncio.sleep(x / 100)
+        return x
+
+    async def main():
+        return await asyncio.gather(f(3), f(1))
+
+    f, profile = (cp.Int << cp.C(sleep)).profile()
+    assert asyncio.run(main()) == [3, 1]
+    # concurrent calls are not nested in each other, their times are not subtracted
+    assert profile.stages['sleep'].calls == 2
+    assert profile.stages['sleep'].total >= 0.039
+
+
+def test_table():
+    f, profile = (cp.Int << cp.IG('a')).profile()
+    f({'a': '1'})
+    lines = str(profile).splitlines()
+    assert lines[0].split() == ['stage', 'calls', 'errors', 'total', 'p50', 'p99', 'items', 'iter_time']
+    assert [x.split()[:3] for x in lines[1:]] == [['int', '1', '0'], ['IG(a)', '1', '0']]
+
+
+def test_percentile():
+    stats = cp.profiling.StageStats()
+    assert stats.percentile(0.5) == 0
+    stats.times.extend(range(100))
+    assert stats.percentile(0.5) == 50
+    assert stats.percentile(0.99) == 99
@@ -0,0 +1,82 @@
+import pickle
+import pytest
+import compose as cp
+
+from collections import namedtuple
+from unittest.mock import Mock
+
+DOC = {'item': {'id': '7', 'name': 'x', 'tags': ['a', 'b'], 'meta': {'n': 1}}}
+
+
+def fields():
+    return {
+        'id': cp.Int << cp.IG('item.id'),
+        'name': cp.IG('item.name'),
+        'tags': cp.List << cp.IG('item.tags'),
+        'count': cp.C(len) << cp.IG('item.tags'),
+        'n': cp.IG('item.meta.n'),
+        'doc': cp.Id,
+    }
+
+
+def test_dict():
+    record = cp.Record(fields())
+    assert record(DOC) == {'id': 7, 'name': 'x', 'tags': ['a', 'b'], 'count': 2, 'n': 1, 'doc': DOC}
+    assert record(DOC) == {key: f(DOC) for key, f in fields().items()}
+
+
+def test_output():
+    Row = namedtuple('Row', 'id name')
+    f = {'id': cp.Int << cp.IG('item.id'), 'name': cp.IG('item.name')}
+    assert cp.Record(f, tuple)(DOC) == (7, 'x')
+    assert cp.Record(f, Row)(DOC) == Row(7, 'x')
+    assert cp.Record({'id': cp.IG('item.id')}, tuple)(DOC) == ('7',)
+
+
+def test_shared_prefix():
+    item = Mock(name='item', side_effect=lambda x: x['item'])
+    tags = Mock(name='tags', side_effect=lambda x: x['tags'])
+    item.__name__ = tags.__name__ = 'mock'
+    first, last = cp.IG(0) << cp.C(tags) << cp.C(item), cp.IG(-1) << cp.C(tags) << cp.C(item)
+    record = cp.Record({'first': first, 'last': last, 'id': cp.IG('id') << cp.C(item)})
+    assert record(DOC) == {'first': 'a', 'last': 'b', 'id': '7'}
+    assert item.call_count == tags.call_count == 1
+
+
+def test_shared_iterator():
+    record = cp.Record({'a': cp.Sum << cp.Map(int), 'b': cp.List << cp.Map(int)})
+    assert record('123') == {'a': 6, 'b': [1, 2, 3]}
+    record = cp.Record({'a': cp.Sum << cp.Take(2), 'b': cp.List << cp.Take(2), 'c': cp.List})
+    assert record(iter([1, 2, 3])) == {'a': 3, 'b': [1, 2], 'c': [1, 2, 3]}
+
+
+def test_unhashable():
+    stage = cp.P(sorted, key=[].count)
+    record = cp.Record({'a': stage, 'b': cp.List << cp.P(sorted, key=[].count)}, tuple)
+    assert record('ba') == (['b', 'a'], ['b', 'a'])
+
+
+def test_error():
+    record = cp.Record(fields())
+    with pytest.raises(cp.ComposeError) as info:
+        record({'item': {'id': '7', 'name': 'x'}})
+    assert info.value.func == cp.IG('tags')
+    assert info.value.arg == {'id': '7', 'name': 'x'}
+    with pytest.raises(cp.ComposeError) as info:
+        record({'item': {'id': 'x'}})
+    assert info.value.func == cp.Int
+
+
+def test_invalid():
+    with pytest.raises(ValueError, match='at least 1 field'):
+        cp.Record({})
+    with pytest.raises(ValueError, match='must be callable'):
+        cp.Record({'a': 1})
+
+
+def test_name_and_pickle():
+    record = cp.Record(fields())
+    assert repr(cp.List << cp.Map(record)) == '<Compose: list,map(record(id,name,tags,count,n,doc))>'
+    copy = pickle.loads(pickle.dumps(record))
+    assert copy == record
+    assert copy(DOC) == record(DOC)
@@ -0,0 +1,107 @@
+import compose as cp
+
+from compose.rewrite import rewrite
+
+from .base import sentinel
+
+
+def test_optimize():
+    f = cp.List << cp.Map(int) << cp.Map(cp.IG(0)) << cp.Filter(bool) << cp.Filter(cp.IG(0)) << cp.IG('a.b.c')
+    g = f.optimize()
+    assert isinstance(g, cp.Compose)
+    assert len(g.stack) == 3
+    arg = {'a': {'b': {'c': [('1',), ('0',), ('3',), ('',)]}}}
+    assert g(arg) == f(arg) == [1, 0, 3]
+
+
+def test_optimize_verbose(capsys):
+    f = cp.Set << cp.Map(int)
+    f.optimize(verbose=True)
+    assert capsys.readouterr().out == "<Compose: set,map(int)> => <Compose: set_map(int)>\n"
+    g = cp.Set << cp.Map(cp.Int) << cp.Map(cp.IG(0))
+    g.optimize(verbose=True)
+    assert capsys.readouterr().out.endswith(" => <Compose: set_map(<Compose: int,IG(0)>)>\n")
+
+
+def test_flatten():
+    f = cp.Compose(cp.Int, cp.Compose(cp.Str, cp.Sum))
+    assert rewrite(f.stack) == (cp.Int, cp.Str, cp.Sum)
+
+
+def test_identity():
+    assert rewrite((cp.Int, cp.Id, cp.Int, cp.Str)) == (cp.Int, cp.Str)
+    assert rewrite((cp.Id, cp.Id)) == (cp.Id,)
+
+
+def test_idempotent_distinct():
+    assert rewrite((cp.Int, cp.Str, cp.Int)) == (cp.Int, cp.Str, cp.Int)
+
+
+def test_merge_maps():
+    stack = rewrite((cp.Map(int), cp.Map(float), cp.Map(cp.IG(0))))
+    assert len(stack) == 1
+    assert isinstance(stack[0], cp.Map)
+    assert list(stack[0]([('1.5',), ('20',)])) == [1, 20]
+
+
+def test_merge_filters():
+    calls = []
+
+    def p(x):
+        calls.append(('p', x))
+        return x > 1
+
+    def q(x):
+        calls.append(('q', x))
+        return x < 3
+
+    stack = rewrite((cp.Filter(p), cp.Filter(q)))
+    assert len(stack) == 1
+    assert repr(stack[0]) == 'filter(q&p)'
+    assert list(stack[0]([1, 2, 5])) == [2]
+    assert calls == [('q', 1), ('p', 1), ('q', 2), ('p', 2), ('q', 5)]
+
+
+def test_merge_getters():
+    value = sentinel['value']
+    stack = rewrite(cp.IG('a.b.c').stack)
+    assert len(stack) == 1
+    assert stack[0]({'a': {'b': {'c': value}}}) is value
+
+
+def test_collect_maps():
+    list_map, = rewrite((cp.List, cp.Map(int)))
+    set_map, = rewrite((cp.Set, cp.Map(int)))
+    assert isinstance(list_map, cp.ListMap)
+    assert isinstance(set_map, cp.SetMap)
+    assert list_map('3013') == [3, 0, 1, 3]
+    assert set_map('3013') == {0, 1, 3}
+
+
+def test_unchanged():
+    stack = (cp.Dict, cp.Map(cp.IG(0, 2)))
+    assert rewrite(stack) == stack
+
+
+def error(f, arg):
+    try:
+        f(arg)
+    except cp.ComposeError as exc:
+        # lazy stages fail in the consumer, their argument is a fresh iterator
+        arg = type(exc.arg) if isinstance(exc.arg, map) else exc.arg
+        return exc.func, arg, type(exc.origin), getattr(exc.origin, 'args', None)
+
+
+def test_errors_unchanged():
+    cases = [
+        (cp.Int << cp.IG('a.b.c'), {'a': {'c': 1}}),
+        (cp.Int << cp.IG('a.b.c'), {'a': {'b': {'c': 'x'}}}),
+        (cp.Sum << cp.Map(int) << cp.Map(cp.IG(0)), [('1',), ('x',)]),
+        (cp.Sum << cp.Map(int) << cp.Map(cp.Int << cp.IG(0)), [('1',), ()]),
+    ]
+    for f, arg in cases:
+        expected = error(f, arg)
+        assert expected is not None
+        for g in (f.optimize(), cp.FastCompose(*f.optimize().stack)):
+            assert len(g.stack) < len(f.stack)
+            assert error(g, arg) == expected
@@ -0,0 +1,57 @@
+import pickle
+import pytest
+import compose as cp
+
+from array import array
+from compose import sinks
+
+
+@pytest.mark.parametrize('length', [0, 1, sinks.CHUNK, 3 * sinks.CHUNK + 5])
+def test_to_array(length):
+    f = cp.ToArray('q') << cp.Map(int)
+    result = f(str(x) for x in range(length))
+    assert result == array('q', range(length))
+    assert memoryview(result).format == 'q'
+    assert (cp.ToArray('d') << cp.Filter(None))(iter([0, 1.5, 2])) == array('d', [1.5, 2])
+
+
+@pytest.mark.parametrize('capacity', [0, 1, 100, 10 ** 5])
+def test_to_buffer(capacity):
+    length = 2 * sinks.CHUNK + 1
+    result = cp.ToBuffer('q', capacity)(iter(range(length)))
+    assert isinstance(result, memoryview)
+    assert (result.format, result.itemsize, len(result)) == ('q', 8, length)
+    assert result.tolist() == list(range(length))
+    assert result.obj.__class__ is bytearray and len(result.obj) == 8 * length
+    assert cp.ToBuffer('d')([]).tolist() == []
+    assert cp.ToBuffer('?')([1, 0]).tolist() == [True, False]
+
+
+def test_errors():
+    with pytest.raises(ValueError, match='typecode'):
+        cp.ToArray('x')
+    with pytest.raises(ValueError, match='format'):
+        cp.ToBuffer('2q')
+    with pytest.raises(ValueError, match='capacity'):
+        cp.ToBuffer('q', -1)
+    with pytest.raises(OverflowError):
+        cp.ToArray('b')([1000])
+    with pytest.raises(TypeError):
+        cp.ToArray('q')(['1'])
+
+
+def test_to_numpy():
+    np = pytest.importorskip('numpy')
+    result = (cp.ToNumpy(np.int64) << cp.Map(int))(iter('123'))
+    assert result.dtype == np.int64 and result.tolist() == [1, 2, 3]
+    # zero-copy views of the other sinks
+    assert np.frombuffer(cp.ToBuffer('d')([1, 2.5]), dtype=np.float64).tolist() == [1, 2.5]
+    assert np.frombuffer(cp.ToArray('q')([7]), dtype=np.int64).tolist() == [7]
+
+
+def test_name_pickle():
+    assert repr(cp.ToArray('q') << cp.Map(int)) == "<Compose: to_array('q'),map(int)>"
+    assert repr(cp.ToBuffer('d', 10)) == "to_buffer('d')"
+    for f in (cp.ToArray('q'), cp.ToBuffer('d', 10), cp.ToNumpy('int64')):
+        assert pickle.loads(pickle.dumps(f)) == f
+    assert cp.ToBuffer('d', 10) != cp.ToBuffer('d', 20)
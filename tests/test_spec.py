@@ -0,0 +1,106 @@
+import json
+import marshal
+import os
+import pytest
+import compose as cp
+
+from operator import add
+from unittest.mock import patch
+
+from compose import spec
+
+PIPELINES = [
+    cp.Sum << cp.Map(int) << cp.IG(1) << cp.IG('item.x'),
+    cp.P(sorted, key=abs, reverse=True) << cp.PG('a.*.b', default=0),
+    cp.Record({'a': cp.Int << cp.IG('x'), 'b': cp.Str << cp.IG('y')}, tuple),
+    cp.AG('real'),
+    cp.Filter(cp.C(bool) & ~cp.C(callable)),
+    cp.Window(3, 2) << cp.Scan(add, 0),
+    (cp.Int << cp.IG('id')).cached(maxsize=5),
+    cp.IG(('a', 1), 'x'),
+    cp.Id,
+]
+
+
+def test_roundtrip(subtests):
+    for pipeline in PIPELINES:
+        with subtests.test(pipeline=pipeline):
+            text = spec.dumps(pipeline)
+            assert spec.loads(text) == pipeline
+            assert spec.from_spec(json.loads(json.dumps(spec.to_spec(pipeline)))) == pipeline
+
+
+def test_error_policy():
+    dead_letters = cp.DeadLetters(maxlen=2)
+    f = cp.Map(int, on_error='collect', dead_letters=dead_letters)
+    list(f('1x2'))
+    g = spec.loads(spec.dumps(f))
+    assert (g.stage, g.on_error) == (f.stage, f.on_error)
+    assert g.dead_letters is not dead_letters and g.dead_letters.errors.maxlen == 2
+    assert list(g('1y')) == [1] and g.dead_letters.collected == 1 and dead_letters.collected == 1
+    assert spec.dumps(g) == spec.dumps(f)
+
+
+def test_canonical():
+    assert spec.dumps(cp.P(sorted, key=abs, reverse=True)) == spec.dumps(cp.P(sorted, reverse=True, key=abs))
+    assert spec.dumps(cp.Int << cp.IG('a.b')) == spec.dumps(cp.Compose(cp.Int, cp.IG('b'), cp.IG('a')))
+    assert json.loads(spec.dumps(cp.IG('a')))['pipeline'] == {'call': {'ref': 'compose:IG'}, 'args': ['a']}
+
+
+def test_not_importable():
+    with pytest.raises(ValueError, match='is not importable'):
+        spec.dumps(cp.C(lambda x: x))
+
+
+def test_invalid():
+    with pytest.raises(ValueError, match='Unsupported spec version 2'):
+        spec.loads('{"pipeline": null, "version": 2}')
+    with pytest.raises(ValueError, match='Invalid spec'):
+        spec.loads('{"pipeline": {"x": 1}, "version": 1}')
+    with pytest.raises(ValueError, match="Cannot import 'compose:Missing'"):
+        spec.loads('{"pipeline": {"ref": "compose:Missing"}, "version": 1}')
+
+
+def fresh_process():
+    for factory in (cp._factory, cp.path._factory, cp.record._factory):
+        factory.cache_clear()
+
+
+def test_code_cache(tmp_path):
+    texts = [spec.dumps(x) for x in PIPELINES[:3]]
+    fresh_process()
+    cache = spec.CodeCache(str(tmp_path))
+    first = cache.load(*texts)
+    assert os.path.exists(cache.path(texts))
+    assert first[0]({'item': {'x': [0, '12']}}) == 3
+
+    fresh_process()
+    with patch.object(cp, 'compile', create=True, side_effect=AssertionError):
+        second = spec.CodeCache(str(tmp_path)).load(*texts)
+    assert second[0]({'item': {'x': [0, '12']}}) == 3
+    assert second[1]({'a': [{'b': 2}, {}]}) == [2, 0]
+    assert second[2]({'x': '7', 'y': 8}) == (7, '8')
+
+
+def test_code_cache_sources(tmp_path):
+    texts = [spec.dumps(x) for x in PIPELINES[:3]]
+
+    def filenames(directory):
+        cache = spec.CodeCache(str(directory))
+        cache.load(*texts)
+        with open(cache.path(texts), 'rb') as f:
+            return sorted(code.co_filename for code in marshal.load(f).values())
+
+    fresh_process()
+    expected = ['<compose:2>', '<compose:5>', '<path:a.*>', '<path:b>', '<record:2>']
+    assert filenames(tmp_path / 'fresh') == expected
+    # factories generated before load() are not recorded
+    assert filenames(tmp_path / 'warm') == []
+
+
+def test_codes_not_retained(tmp_path):
+    for i in range(10):
+        cp.PG(f'a.b{i}')
+    assert cp._codes is None
+    spec.CodeCache(str(tmp_path)).load(spec.dumps(cp.PG('x.y')))
+    assert cp._codes is None and cp._used is None
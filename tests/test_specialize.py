@@ -0,0 +1,69 @@
+import pickle
+import pytest
+import compose as cp
+
+from types import SimpleNamespace
+
+
+def test_specialize():
+    f = (cp.Int << cp.IG('item.id')).specialize(warmup=2)
+    assert isinstance(f, cp.Specialized)
+    assert [f({'item': {'id': x}}) for x in (1, 2, 3, '4', 5)] == [1, 2, 3, 4, 5]
+    info = f.info()
+    assert info.recorded == 2
+    assert info.specialized
+    assert (info.hits, info.deopts) == (2, 1)
+    assert info.guards == (('int', 2, 1),)
+    assert f.compile()({'item': {'id': 6}}) == 6
+    assert f.info().hits == 3
+
+
+def test_inline():
+    obj = SimpleNamespace(values={'x': ['7', '8']})
+    f = (cp.Sum << cp.Map(cp.Int) << cp.IG('x') << cp.AG('values')).specialize(warmup=1)
+    assert f(obj) == 15
+    assert f(obj) == 15
+    assert f.info().guards == ()
+
+
+def test_polymorphic():
+    mixed, ints = cp.Compose(cp.Int).specialize(warmup=2), cp.Compose(cp.Int).specialize(warmup=2)
+    assert [mixed(x) for x in ('1', 2, 3)] == [ints(x) for x in (1, 2, 3)] == [1, 2, 3]
+    assert mixed.info().guards == ()
+    assert ints.info().guards == (('int', 1, 0),)
+
+
+def test_error():
+    f = (cp.Int << cp.IG('item.id')).specialize(warmup=1)
+    for _ in range(2):
+        with pytest.raises(cp.ComposeError) as info:
+            f({'item': {}})
+        assert info.value.func == cp.IG('id')
+        assert info.value.arg == {}
+    assert f.info().specialized
+    with pytest.raises(cp.ComposeError) as info:
+        f({'item': {'id': 'x'}})
+    assert info.value.func is cp.Int
+
+
+def test_reset():
+    f = cp.Compose(cp.Int).specialize(warmup=1)
+    f(1)
+    assert f.info().specialized
+    f.reset()
+    assert not f.info().specialized
+    f.specialize()
+    assert f.info().guards == ()
+
+
+def test_invalid():
+    with pytest.raises(ValueError, match='warmup must be positive'):
+        cp.Compose(cp.Int).specialize(warmup=0)
+
+
+def test_name_and_pickle():
+    f = (cp.Int << cp.IG('id')).specialize()
+    assert repr(f) == 'specialized(<Compose: int,IG(id)>)'
+    g = pickle.loads(pickle.dumps(f))
+    assert g == f
+    assert g({'id': '1'}) == 1
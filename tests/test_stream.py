@@ -0,0 +1,82 @@
+import pickle
+import pytest
+import compose as cp
+
+from itertools import count
+from operator import add
+from unittest.mock import Mock
+
+
+def test_chunk():
+    assert list(cp.Chunk(2)(range(5))) == [(0, 1), (2, 3), (4,)]
+    assert list(cp.Chunk(3)([])) == []
+
+
+def test_take():
+    func = Mock(name='func', side_effect=lambda x: x * 2)
+    f = cp.List << cp.Take(3) << cp.Map(func)
+    assert f(count()) == [0, 2, 4]
+    assert func.call_count == 3
+    assert list(cp.Take(0)(cp.Map(func)(count()))) == []
+    assert func.call_count == 3
+
+
+def test_skip():
+    assert list(cp.Skip(2)(range(5))) == [2, 3, 4]
+    assert list(cp.Take(2)(cp.Skip(3)(count()))) == [3, 4]
+
+
+def test_flat_map():
+    assert list(cp.FlatMap(range)([1, 2, 3])) == [0, 0, 1, 0, 1, 2]
+
+
+def test_scan():
+    assert list(cp.Scan(add, 10)([1, 2, 3])) == [11, 13, 16]
+    assert list(cp.Scan(add, 0)([])) == []
+
+
+def test_while():
+    assert list(cp.TakeWhile(bool)([1, 2, 0, 3])) == [1, 2]
+    assert list(cp.DropWhile(bool)([1, 2, 0, 3])) == [0, 3]
+
+
+def test_window(subtests):
+    cases = [
+        ((3, 1), [(0, 1, 2), (1, 2, 3), (2, 3, 4), (3, 4, 5)]),
+        ((2, 2), [(0, 1), (2, 3), (4, 5)]),
+        ((2, 3), [(0, 1), (3, 4)]),
+        ((7, 1), []),
+        ((6, 4), [(0, 1, 2, 3, 4, 5)]),
+    ]
+    for args, expected in cases:
+        with subtests.test(args=args):
+            assert list(cp.Window(*args)(range(6))) == expected
+
+
+def test_lazy():
+    f = cp.Take(2) << cp.Window(3) << cp.FlatMap(iter) << cp.Chunk(2) << cp.Skip(1)
+    assert list(f(count())) == [(1, 2, 3), (2, 3, 4)]
+
+
+def test_invalid(subtests):
+    for stage, args, message in [
+        (cp.Chunk, (0,), 'n must be positive, got 0'),
+        (cp.Take, (-1,), 'n must be non-negative, got -1'),
+        (cp.Skip, (-1,), 'n must be non-negative, got -1'),
+        (cp.Window, (2, 0), 'step must be positive, got 0'),
+    ]:
+        with subtests.test(stage=stage):
+            with pytest.raises(ValueError, match=message):
+                stage(*args)
+
+
+def test_name():
+    f = cp.Window(3, 2) << cp.Scan(add, 0) << cp.Take(5) << cp.FlatMap(range) << cp.TakeWhile(bool)
+    assert repr(f) == '<Compose: window(3,2),scan(add,0),take(5),flat_map(range),takewhile(bool)>'
+
+
+def test_pickle():
+    for stage in (cp.Chunk(2), cp.Scan(add, 0), cp.Window(3, 2), cp.DropWhile(bool)):
+        assert pickle.loads(pickle.dumps(stage)) == stage
+    assert cp.Window(3) == cp.Window(3, 1)
+    assert cp.Take(2) != cp.Skip(2)
@@ -0,0 +1,85 @@
+import pickle
+import random
+import pytest
+import compose as cp
+
+AGGREGATES = {
+    'sum': sum,
+    'count': len,
+    'mean': lambda x: sum(x) / len(x),
+    'min': min,
+    'max': max,
+}
+
+
+@pytest.mark.parametrize('agg', AGGREGATES)
+def test_sliding(agg):
+    random.seed(agg)
+    items = [random.randint(-50, 50) for _ in range(200)]
+    for n in (1, 3, 20):
+        expected = [AGGREGATES[agg](items[i - n + 1:i + 1]) for i in range(n - 1, len(items))]
+        assert list(cp.SlidingWindow(n, agg)(iter(items))) == expected
+
+
+@pytest.mark.parametrize('agg', AGGREGATES)
+def test_tumbling(agg):
+    items = list(range(10))
+    assert list(cp.TumblingWindow(4, agg)(items)) == [AGGREGATES[agg](items[i:i + 4]) for i in (0, 4, 8)]
+
+
+def test_float_drift():
+    items = [0.1, 1e16, -1e16, 0.3] * 1000 + [0.5] * 10
+    *_, last = cp.SlidingWindow(5, 'sum')(items)
+    assert last == pytest.approx(2.5)
+
+
+def test_value():
+    f = cp.List << cp.SlidingWindow(2, 'mean', cp.IG('x'))
+    assert f([{'x': 1}, {'x': 3}, {'x': 8}]) == [2, 5.5]
+    assert list(cp.SlidingWindow(3, 'count')('abcd')) == [3, 3]
+    assert list(cp.SlidingWindow(3, 'sum')([1, 2])) == []
+
+
+def test_sliding_time():
+    items = [{'t': t, 'v': v} for t, v in [(0, 1), (1, 5), (2, 3), (5, 2), (6, 8), (10, 1)]]
+    f = cp.SlidingTimeWindow(3, 'max', cp.IG('t'), cp.IG('v'))
+    assert list(f(items)) == [(0, 1), (1, 5), (2, 5), (5, 2), (6, 8), (10, 1)]
+    f = cp.SlidingTimeWindow(5, 'count', cp.IG('t'))
+    assert [x for _, x in f(items)] == [1, 2, 3, 3, 3, 2]
+
+
+def test_tumbling_time():
+    items = [{'t': t, 'v': v} for t, v in [(1, 1), (4, 5), (5, 3), (17, 2), (19.5, 8)]]
+    f = cp.TumblingTimeWindow(5, 'sum', cp.IG('t'), cp.IG('v'))
+    assert list(f(items)) == [(0, 6), (5, 3), (15, 10)]
+
+
+def test_time_order():
+    with pytest.raises(ValueError, match='Timestamps must not decrease, got 1 after 2'):
+        list(cp.SlidingTimeWindow(3, 'sum', cp.Id)([2, 1]))
+
+
+def test_invalid():
+    with pytest.raises(ValueError, match="Unknown aggregate 'median'"):
+        cp.SlidingWindow(3, 'median')
+    with pytest.raises(ValueError, match='n must be positive'):
+        cp.TumblingWindow(0, 'sum')
+    with pytest.raises(ValueError, match='span must be positive'):
+        cp.SlidingTimeWindow(0, 'sum', cp.Id)
+    with pytest.raises(ValueError, match='time must be callable'):
+        cp.TumblingTimeWindow(1, 'sum', 't')
+
+
+def test_name_pickle():
+    stages = [
+        cp.SlidingWindow(3, 'sum'),
+        cp.TumblingWindow(2, 'max', cp.IG('x')),
+        cp.SlidingTimeWindow(60, 'mean', cp.IG('t'), cp.IG('x')),
+        cp.TumblingTimeWindow(60, 'min', cp.AG('t')),
+    ]
+    assert list(map(repr, stages)) == [
+        'sliding(3,sum)', 'tumbling(2,max,IG(x))',
+        'sliding_time(60,mean,IG(t),IG(x))', 'tumbling_time(60,min,AG(t))',
+    ]
+    for stage in stages:
+        assert pickle.loads(pickle.dumps(stage)) == stage